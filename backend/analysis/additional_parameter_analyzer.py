@@ -38,6 +38,9 @@ PARAMETER_MAP = {
 class AdditionalParameterAnalyzer(BaseAnalyzer):
     """Analyzer for calculating basic statistics of additional parameters."""
     
+    result_key = "additional_parameters"
+    collects_results = True
+    
     def __init__(self, parameter_type: str):
         """
         Initialize the analyzer.
@@ -3,12 +3,17 @@ Base analyzer class for pluggable analysis modules.
 """
 from abc import ABC, abstractmethod
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 
 class BaseAnalyzer(ABC):
     """Abstract base class for climate data analyzers."""
     
+    # Key under which the result is stored in the analysis response
+    result_key: Optional[str] = None
+    # Whether results of several analyzers are collected into a list under result_key
+    collects_results: bool = False
+    
     def __init__(self, config=None):
         """
         Initialize the analyzer with optional configuration.
@@ -0,0 +1,104 @@
+"""
+Rank calendar days of a location by how well they match user preferences.
+
+All candidate days are scored at once on (years x 366) day-of-year matrices
+of the location's full daily series. Each year's value is compared with the
+ideal, so the score reflects how often a day meets the preferences and not
+only whether its average does.
+"""
+import warnings
+from typing import Any, Dict, List
+
+import numpy as np
+
+from config import config
+from .grid import LEAP_YEAR_DAYS_BEFORE_MONTH, Series, day_of_year, day_of_year_matrix_for_series
+
+# Preference -> (NASA parameter, span of the preference slider in the frontend).
+# A difference of one full span (or more) from the ideal scores zero.
+PREFERENCES = {
+    "temperature": ("T2M", 25.0),
+    "rain": ("PRECTOTCORR", 50.0),
+    "wind_speed": ("WS2M", 20.0),
+    "humidity": ("RH2M", 100.0),
+}
+
+
+def candidate_slots(start_month: int, start_day: int, end_month: int, end_day: int) -> np.ndarray:
+    """
+    Day-of-year slot indices (0-365) from a start to an end calendar day, inclusive.
+
+    The range wraps around the end of the year when the end precedes the start.
+    """
+    start = int(day_of_year(start_month, start_day)) - 1
+    end = int(day_of_year(end_month, end_day)) - 1
+    return np.arange(start, end + 1) if start <= end else np.r_[np.arange(start, 366), np.arange(0, end + 1)]
+
+
+def slot_to_month_day(slot: int) -> tuple[int, int]:
+    """Calendar month and day of a day-of-year slot index (0-365)."""
+    month = int(np.searchsorted(LEAP_YEAR_DAYS_BEFORE_MONTH, slot, side="right"))
+    return month, slot - int(LEAP_YEAR_DAYS_BEFORE_MONTH[month - 1]) + 1
+
+
+def rank_days(series: Series, ideals: Dict[str, float], slots: np.ndarray,
+              start_year: int, end_year: int, top_n: int) -> List[Dict[str, Any]]:
+    """
+    Score candidate days against the preferences and return the best ones.
+
+    Args:
+        series: Full daily series of the location's cell
+        ideals: Ideal value per preference (keys of PREFERENCES)
+        slots: Candidate day-of-year slot indices
+        start_year: First year to include
+        end_year: Last year to include
+        top_n: Number of days to return
+
+    Returns:
+        list: Best days first, with their score (0-100) and key statistics
+    """
+    matrices = {
+        name: day_of_year_matrix_for_series(series, column, start_year, end_year)[:, slots]
+        for name, (column, _) in PREFERENCES.items()
+    }
+    valid = np.logical_and.reduce([~np.isnan(matrix) for matrix in matrices.values()])
+    years = valid.sum(axis=0)
+
+    with warnings.catch_warnings(), np.errstate(invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)  # days without valid years give NaN
+
+        # Per-year closeness to every ideal in [0, 1], averaged over preferences and years
+        closeness = np.mean([
+            1 - np.minimum(np.abs(matrices[name] - ideals[name]) / span, 1)
+            for name, (_, span) in PREFERENCES.items()
+        ], axis=0)
+        closeness[~valid] = np.nan
+        scores = 100 * np.nanmean(closeness, axis=0)
+
+        for matrix in matrices.values():
+            matrix[~valid] = np.nan
+        median_temp = np.nanmedian(matrices["temperature"], axis=0)
+        rainy = np.count_nonzero(matrices["rain"] > config.RAIN_THRESHOLD_MM, axis=0)
+        avg_rain = np.nanmean(matrices["rain"], axis=0)
+        avg_wind = np.nanmean(matrices["wind_speed"], axis=0)
+        avg_humidity = np.nanmean(matrices["humidity"], axis=0)
+
+    # Days with too few years (e.g. Feb 29) are not ranked
+    scores[years < config.LIMITED_DATA_MIN_YEARS] = np.nan
+    ranked = [i for i in np.argsort(-scores, kind="stable") if not np.isnan(scores[i])][:top_n]
+
+    best_days = []
+    for i in ranked:
+        month, day = slot_to_month_day(int(slots[i]))
+        best_days.append({
+            "month": month,
+            "day": day,
+            "score": round(float(scores[i]), 2),
+            "median_temp_c": round(float(median_temp[i]), 2),
+            "rain_probability_percent": round(100 * int(rainy[i]) / int(years[i]), 2),
+            "avg_precipitation_mm": round(float(avg_rain[i]), 2),
+            "avg_wind_speed_ms": round(float(avg_wind[i]), 2),
+            "avg_humidity_percent": round(float(avg_humidity[i]), 2),
+            "years_analyzed": int(years[i]),
+        })
+    return best_days
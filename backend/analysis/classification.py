@@ -0,0 +1,87 @@
+"""
+Classification helpers shared by the analyzers and the climatology index.
+
+These functions only depend on summary numbers, not on pandas, so
+precomputed statistics can be described exactly like freshly analyzed ones.
+"""
+from typing import Dict, Any
+from config import config
+
+
+def classify_variability(cv: float, std_dev: float) -> Dict[str, Any]:
+    """Classify temperature variability based on coefficient of variation."""
+    if cv < config.TEMP_CV_VERY_CONSISTENT:
+        classification = "very_consistent"
+        description = "Temperature very consistent year after year"
+    elif cv < config.TEMP_CV_CONSISTENT:
+        classification = "consistent"
+        description = "Temperature relatively consistent"
+    elif cv < config.TEMP_CV_MODERATE:
+        classification = "moderate"
+        description = "Moderate temperature variability"
+    else:
+        classification = "high"
+        description = "High temperature variability between years"
+
+    return {
+        "std_dev_c": std_dev,
+        "coefficient_variation_percent": cv,
+        "classification": classification,
+        "description": description,
+        "interpretation": f"Temperature varies by ±{std_dev}°C on average from year to year"
+    }
+
+
+def describe_trend(slope: float) -> Dict[str, Any]:
+    """Describe a temperature trend slope (°C per year)."""
+    trend_slope = round(slope, 4)
+
+    threshold = config.TEMP_TREND_STABLE_THRESHOLD
+    if slope > threshold:
+        trend_desc = "warming"
+        interpretation = f"Temperature is increasing at {abs(trend_slope):.4f}°C per year"
+    elif slope < -threshold:
+        trend_desc = "cooling"
+        interpretation = f"Temperature is decreasing at {abs(trend_slope):.4f}°C per year"
+    else:
+        trend_desc = "stable"
+        interpretation = f"Temperature is stable at {abs(trend_slope):.4f}°C per year"
+
+    return {
+        "slope": trend_slope,
+        "description": trend_desc,
+        "interpretation": interpretation
+    }
+
+
+def insufficient_trend() -> Dict[str, Any]:
+    """Trend description when there are too few years to fit a slope."""
+    return {
+        "slope": 0.0,
+        "description": "insufficient data",
+        "interpretation": "Not enough data to determine temperature trend"
+    }
+
+
+def assess_data_quality(total_years: int) -> Dict[str, Any]:
+    """Assess data quality and confidence from the number of years analyzed."""
+    # Determine data quality
+    if total_years >= config.GOOD_DATA_MIN_YEARS:
+        data_quality = "good"
+    elif total_years >= config.LIMITED_DATA_MIN_YEARS:
+        data_quality = "limited"
+    else:
+        data_quality = "insufficient"
+
+    # Determine confidence level
+    if total_years >= config.HIGH_CONFIDENCE_MIN_YEARS:
+        confidence_level = "high"
+    elif total_years >= config.MEDIUM_CONFIDENCE_MIN_YEARS:
+        confidence_level = "medium"
+    else:
+        confidence_level = "low"
+
+    return {
+        "data_quality": data_quality,
+        "confidence_level": confidence_level
+    }
@@ -0,0 +1,262 @@
+"""
+Fixed-width climatology records per cell and day of year.
+
+Each record holds the numbers behind the default analysis response
+(the one produced by the default analyzers), so the response for any cell
+and calendar day can be rebuilt from a single record without pandas or the
+analyzers. Records are computed for all 366 day-of-year slots of a cell at
+once, on (years x 366) matrices.
+"""
+import warnings
+from typing import Any, Dict
+
+import numpy as np
+
+from config import config
+from .classification import assess_data_quality, classify_variability, describe_trend, insufficient_trend
+from .grid import Series, csv_values, day_of_year_matrix_for_series
+
+# Columns used by the default analyzers, by NASA parameter name
+BASE_COLUMNS = {
+    "T2M_MAX": "temp_max",
+    "T2M_MIN": "temp_min",
+    "T2M": "temp_avg",
+    "PRECTOTCORR": "precipitation",
+    "WS2M": "wind_speed",
+    "RH2M": "humidity",
+}
+
+RECORD_DTYPE = np.dtype([
+    ("n_years", "<i2"),
+    ("start_year", "<i2"),
+    ("end_year", "<i2"),
+    ("rainy_days", "<i2"),
+    ("hot_days", "<i2"),
+    ("cold_days", "<i2"),
+    ("humid_days", "<i2"),
+    ("dry_days", "<i2"),
+    ("hot_threshold", "<f4"),
+    ("cold_threshold", "<f4"),
+    ("humid_threshold", "<f4"),
+    ("dry_threshold", "<f4"),
+    ("avg_max", "<f4"),
+    ("avg_min", "<f4"),
+    ("avg_temp", "<f4"),
+    ("median_temp", "<f4"),
+    ("record_max", "<f4"),
+    ("record_min", "<f4"),
+    ("temp_std", "<f4"),
+    ("temp_p10", "<f4"),
+    ("temp_p90", "<f4"),
+    ("trend_slope", "<f8"),
+    ("wind_avg", "<f4"),
+    ("humidity_avg", "<f4"),
+    ("humidity_min", "<f4"),
+    ("humidity_max", "<f4"),
+    ("humidity_std", "<f4"),
+    ("humidity_p10", "<f4"),
+    ("humidity_p90", "<f4"),
+])
+
+
+def compute_day_of_year_records(series: Series, start_year: int, end_year: int) -> np.ndarray:
+    """
+    Compute the climatology records of one cell for every day of year.
+
+    Years missing any base column are dropped per day, as process_series_data
+    does. Stored values are brought back to the float64 values of the CSV
+    first, and every statistic is rounded the way the analyzers round it, so a
+    record matches the live analysis of the same day.
+
+    Args:
+        series: Full daily series of the cell
+        start_year: First year to include
+        end_year: Last year to include
+
+    Returns:
+        np.ndarray: (366,) array of RECORD_DTYPE
+    """
+    matrices = {
+        name: csv_values(day_of_year_matrix_for_series(series, column, start_year, end_year))
+        for column, name in BASE_COLUMNS.items()
+    }
+    valid = np.logical_and.reduce([~np.isnan(matrix) for matrix in matrices.values()])
+    for matrix in matrices.values():
+        matrix[~valid] = np.nan
+    years = np.where(valid, np.arange(start_year, end_year + 1)[:, np.newaxis], np.nan)
+
+    temp_max = matrices["temp_max"]
+    temp_min = matrices["temp_min"]
+    temp_avg = matrices["temp_avg"]
+    humidity = matrices["humidity"]
+
+    records = np.zeros(366, dtype=RECORD_DTYPE)
+    n_years = valid.sum(axis=0)
+    records["n_years"] = n_years
+
+    # Means, standard deviations and slopes are taken over each day's valid
+    # years as a 1-D array, so they are summed in the same order as the
+    # analyzers' pandas reductions; column-wise nanmean sums in another order
+    # and lands on the other side of a rounding tie for some days
+    year_numbers = np.arange(start_year, end_year + 1, dtype=float)
+    day_stats = {name: np.full(366, np.nan) for name in (
+        "avg_max", "avg_min", "avg_temp", "temp_std", "trend_slope", "wind_avg", "humidity_avg", "humidity_std"
+    )}
+    for slot in np.flatnonzero(n_years):
+        rows = valid[:, slot]
+        temp_avg_values = temp_avg[rows, slot]
+        humidity_values = humidity[rows, slot]
+        day_stats["avg_max"][slot] = temp_max[rows, slot].mean()
+        day_stats["avg_min"][slot] = temp_min[rows, slot].mean()
+        day_stats["avg_temp"][slot] = temp_avg_values.mean()
+        day_stats["wind_avg"][slot] = matrices["wind_speed"][rows, slot].mean()
+        day_stats["humidity_avg"][slot] = humidity_values.mean()
+        if len(temp_avg_values) > 1:
+            day_stats["temp_std"][slot] = temp_avg_values.std(ddof=1)
+            day_stats["humidity_std"][slot] = humidity_values.std(ddof=1)
+            years_centered = year_numbers[rows] - year_numbers[rows].mean()
+            day_stats["trend_slope"][slot] = (
+                np.dot(years_centered, temp_avg_values - temp_avg_values.mean()) / np.dot(years_centered, years_centered)
+            )
+
+    # Days without any valid year keep NaN statistics and n_years == 0
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+
+        records["start_year"] = np.nan_to_num(np.nanmin(years, axis=0))
+        records["end_year"] = np.nan_to_num(np.nanmax(years, axis=0))
+        records["rainy_days"] = np.count_nonzero(matrices["precipitation"] > config.RAIN_THRESHOLD_MM, axis=0)
+
+        cold_threshold = np.nanpercentile(temp_min, config.PERCENTILE_COLD, axis=0)
+        hot_threshold = np.nanpercentile(temp_max, config.PERCENTILE_HOT, axis=0)
+        dry_threshold = np.nanpercentile(humidity, config.PERCENTILE_DRY, axis=0)
+        humid_threshold = np.nanpercentile(humidity, config.PERCENTILE_HUMID, axis=0)
+        records["hot_days"] = np.count_nonzero(temp_max > hot_threshold, axis=0)
+        records["cold_days"] = np.count_nonzero(temp_min < cold_threshold, axis=0)
+        records["humid_days"] = np.count_nonzero(humidity > humid_threshold, axis=0)
+        records["dry_days"] = np.count_nonzero(humidity < dry_threshold, axis=0)
+        records["hot_threshold"] = np.round(hot_threshold, 2)
+        records["cold_threshold"] = np.round(cold_threshold, 2)
+        records["humid_threshold"] = np.round(humid_threshold, 2)
+        records["dry_threshold"] = np.round(dry_threshold, 2)
+
+        records["avg_max"] = np.round(day_stats["avg_max"], 2)
+        records["avg_min"] = np.round(day_stats["avg_min"], 2)
+        records["avg_temp"] = np.round(day_stats["avg_temp"], 2)
+        records["median_temp"] = np.round(np.nanmedian(temp_avg, axis=0), 2)
+        records["record_max"] = np.round(np.nanmax(temp_max, axis=0), 2)
+        records["record_min"] = np.round(np.nanmin(temp_min, axis=0), 2)
+        records["temp_std"] = np.round(day_stats["temp_std"], 2)
+        records["temp_p10"] = np.round(np.nanpercentile(temp_min, 10, axis=0), 2)
+        records["temp_p90"] = np.round(np.nanpercentile(temp_max, 90, axis=0), 2)
+        records["trend_slope"] = day_stats["trend_slope"]
+
+        records["wind_avg"] = np.round(day_stats["wind_avg"], 2)
+        records["humidity_avg"] = np.round(day_stats["humidity_avg"], 2)
+        records["humidity_min"] = np.round(np.nanmin(humidity, axis=0), 2)
+        records["humidity_max"] = np.round(np.nanmax(humidity, axis=0), 2)
+        records["humidity_std"] = np.round(day_stats["humidity_std"], 2)
+        records["humidity_p10"] = np.round(np.nanpercentile(humidity, 10, axis=0), 2)
+        records["humidity_p90"] = np.round(np.nanpercentile(humidity, 90, axis=0), 2)
+
+    return records
+
+
+def record_to_analysis(record: np.void, lat: float, lon: float) -> Dict[str, Any]:
+    """
+    Rebuild the default analysis response from a climatology record.
+
+    Args:
+        record: One RECORD_DTYPE record with n_years > 0
+        lat: Latitude of the requested location
+        lon: Longitude of the requested location
+
+    Returns:
+        dict: Analysis in the same shape as calculate_climate_statistics
+    """
+    values = {name: record[name].item() for name in RECORD_DTYPE.names}
+    for name, value in values.items():
+        if isinstance(value, float):
+            # NumPy floats, so derived values (CV, ranges) round like the analyzers' do
+            values[name] = np.float64(round(value, 2))
+    total = values["n_years"]
+
+    def percent(count: int) -> float:
+        return round((count / total) * 100, 2) if total > 0 else 0.0
+
+    rain_probability = percent(values["rainy_days"])
+    std_dev = values["temp_std"]
+    avg_temp = values["avg_temp"]
+    cv = round((std_dev / avg_temp) * 100, 2) if avg_temp > 0 else 0
+    slope = record["trend_slope"].item()
+
+    return {
+        "location": {"lat": lat, "lon": lon},
+        "analysis_period": {
+            "start_year": values["start_year"],
+            "end_year": values["end_year"],
+            "total_years_analyzed": total,
+        },
+        "rain_probability": {
+            "threshold_mm": config.RAIN_THRESHOLD_MM,
+            "probability_percent": rain_probability,
+            "rainy_days_count": values["rainy_days"],
+            "dry_days_count": total - values["rainy_days"],
+            "frequency_analysis": {
+                "rainy_days": values["rainy_days"],
+                "total_days": total,
+                "percentage": rain_probability,
+            },
+        },
+        "temperature": {
+            "avg_max_c": values["avg_max"],
+            "avg_min_c": values["avg_min"],
+            "median_c": values["median_temp"],
+            "record_max_c": values["record_max"],
+            "record_min_c": values["record_min"],
+            "std_dev": std_dev,
+            "percentiles": {
+                "10th_percentile_c": values["temp_p10"],
+                "90th_percentile_c": values["temp_p90"],
+            },
+            "variability_analysis": {
+                "coefficient_of_variation": cv,
+                "temperature_range_c": round(values["record_max"] - values["record_min"], 2),
+                "yearly_variability": classify_variability(cv, std_dev),
+            },
+            "trend": describe_trend(slope) if total > 1 and not np.isnan(slope) else insufficient_trend(),
+        },
+        "temperature_probability": {
+            "hot_threshold_c": values["hot_threshold"],
+            "cold_threshold_c": values["cold_threshold"],
+            "hot_probability_percent": percent(values["hot_days"]),
+            "cold_probability_percent": percent(values["cold_days"]),
+            "hot_days_count": values["hot_days"],
+            "cold_days_count": values["cold_days"],
+            "normal_days_count": total - values["hot_days"] - values["cold_days"],
+            "classification_method": f"{config.PERCENTILE_COLD}th and {config.PERCENTILE_HOT}th percentile thresholds",
+        },
+        "humidity": {
+            "avg_percent": values["humidity_avg"],
+            "min_percent": values["humidity_min"],
+            "max_percent": values["humidity_max"],
+            "std_dev": values["humidity_std"],
+            "percentiles": {
+                "10th_percentile_percent": values["humidity_p10"],
+                "90th_percentile_percent": values["humidity_p90"],
+            },
+            "range_percent": round(values["humidity_max"] - values["humidity_min"], 2),
+        },
+        "humidity_probability": {
+            "humid_threshold_percent": values["humid_threshold"],
+            "dry_threshold_percent": values["dry_threshold"],
+            "humid_probability_percent": percent(values["humid_days"]),
+            "dry_probability_percent": percent(values["dry_days"]),
+            "humid_days_count": values["humid_days"],
+            "dry_days_count": values["dry_days"],
+            "normal_days_count": total - values["humid_days"] - values["dry_days"],
+            "classification_method": f"{config.PERCENTILE_DRY}th and {config.PERCENTILE_HUMID}th percentile thresholds",
+        },
+        "wind": {"avg_speed_ms": values["wind_avg"]},
+        "summary_statistics": assess_data_quality(total),
+    }
@@ -0,0 +1,98 @@
+"""
+Bootstrap confidence interval analyzer module.
+"""
+import pandas as pd
+import numpy as np
+from typing import Dict, Any
+from .base_analyzer import BaseAnalyzer
+from config import config
+
+
+class ConfidenceIntervalAnalyzer(BaseAnalyzer):
+    """Analyzer for bootstrap confidence intervals of the reported probabilities."""
+
+    result_key = "confidence_intervals"
+
+    @property
+    def name(self) -> str:
+        return "ConfidenceIntervalAnalyzer"
+
+    def analyze(self, df: pd.DataFrame, **kwargs) -> Dict[str, Any]:
+        """
+        Estimate confidence intervals for rain, hot/cold and humid/dry probabilities.
+
+        The per-year values are resampled with replacement into a single
+        (resamples x years) matrix, and every probability is recomputed along
+        the rows at once, so no Python loop runs per resample. Percentile
+        thresholds are recomputed within each resample, as the probability
+        analyzers do on the original sample.
+
+        Args:
+            df: DataFrame with 'precipitation', 'temp_min', 'temp_max' and 'humidity' columns
+            **kwargs: Additional parameters (unused)
+
+        Returns:
+            Dictionary with lower/upper bounds for each probability
+        """
+        self.validate_data(df, ['precipitation', 'temp_min', 'temp_max', 'humidity'])
+
+        total_years = len(df)
+        if total_years == 0:
+            raise ValueError(f"{self.name}: No data to resample")
+
+        resamples = config.BOOTSTRAP_RESAMPLES
+        confidence_level = config.BOOTSTRAP_CONFIDENCE_LEVEL
+        rng = np.random.default_rng(config.BOOTSTRAP_SEED)
+        indices = rng.integers(0, total_years, size=(resamples, total_years))
+
+        precipitation = df['precipitation'].to_numpy(dtype=float)[indices]
+        temp_min = df['temp_min'].to_numpy(dtype=float)[indices]
+        temp_max = df['temp_max'].to_numpy(dtype=float)[indices]
+        humidity = df['humidity'].to_numpy(dtype=float)[indices]
+
+        # Per-resample thresholds, matching the probability analyzers
+        cold_threshold = self._row_percentile(np.sort(temp_min, axis=1), config.PERCENTILE_COLD)
+        hot_threshold = self._row_percentile(np.sort(temp_max, axis=1), config.PERCENTILE_HOT)
+        humidity_sorted = np.sort(humidity, axis=1)
+        dry_threshold = self._row_percentile(humidity_sorted, config.PERCENTILE_DRY)
+        humid_threshold = self._row_percentile(humidity_sorted, config.PERCENTILE_HUMID)
+
+        probabilities = {
+            "rain_probability": precipitation > config.RAIN_THRESHOLD_MM,
+            "hot_probability": temp_max > hot_threshold,
+            "cold_probability": temp_min < cold_threshold,
+            "humid_probability": humidity > humid_threshold,
+            "dry_probability": humidity < dry_threshold,
+        }
+
+        # Stack all statistics so their bounds come from one percentile call
+        stacked = np.stack([mask.mean(axis=1) * 100 for mask in probabilities.values()])
+        tail = (100 - confidence_level) / 2
+        lower, upper = np.percentile(stacked, [tail, 100 - tail], axis=1)
+
+        result = {
+            "confidence_level_percent": confidence_level,
+            "resamples": resamples,
+            "method": "percentile bootstrap over yearly values",
+        }
+        for i, key in enumerate(probabilities):
+            result[key] = {
+                "lower_percent": round(float(lower[i]), 2),
+                "upper_percent": round(float(upper[i]), 2),
+            }
+        return result
+
+    @staticmethod
+    def _row_percentile(sorted_rows: np.ndarray, percentile: float) -> np.ndarray:
+        """
+        Percentile of each row of a row-sorted matrix, as a column vector.
+
+        Uses the same linear interpolation as np.percentile, but reads it
+        directly from the sorted rows instead of partitioning them again.
+        """
+        position = percentile / 100 * (sorted_rows.shape[1] - 1)
+        below = int(np.floor(position))
+        above = min(below + 1, sorted_rows.shape[1] - 1)
+        fraction = position - below
+        column = sorted_rows[:, below] + (sorted_rows[:, above] - sorted_rows[:, below]) * fraction
+        return column[:, np.newaxis]
@@ -4,12 +4,14 @@ Data quality analyzer module.
 import pandas as pd
 from typing import Dict, Any
 from .base_analyzer import BaseAnalyzer
-from config import config
+from .classification import assess_data_quality
 
 
 class DataQualityAnalyzer(BaseAnalyzer):
     """Analyzer for data quality assessment."""
     
+    result_key = "summary_statistics"
+    
     @property
     def name(self) -> str:
         return "DataQualityAnalyzer"
@@ -25,25 +27,4 @@ class DataQualityAnalyzer(BaseAnalyzer):
         Returns:
             Dictionary with data quality assessment
         """
-        total_years = len(df)
-        
-        # Determine data quality
-        if total_years >= config.GOOD_DATA_MIN_YEARS:
-            data_quality = "good"
-        elif total_years >= config.LIMITED_DATA_MIN_YEARS:
-            data_quality = "limited"
-        else:
-            data_quality = "insufficient"
-        
-        # Determine confidence level
-        if total_years >= config.HIGH_CONFIDENCE_MIN_YEARS:
-            confidence_level = "high"
-        elif total_years >= config.MEDIUM_CONFIDENCE_MIN_YEARS:
-            confidence_level = "medium"
-        else:
-            confidence_level = "low"
-        
-        return {
-            "data_quality": data_quality,
-            "confidence_level": confidence_level
-        }
+        return assess_data_quality(len(df))
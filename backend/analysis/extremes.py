@@ -0,0 +1,188 @@
+"""
+Extreme-value (return period) analysis from annual maxima.
+
+Annual maxima of every cell and variable are stacked into one matrix and a
+generalized extreme value (GEV) distribution is fitted to every row at once
+with L-moments (Hosking, 1990), which only needs sorted sums. A region's
+return-level maps therefore cost a few array operations rather than one
+iterative maximum-likelihood fit per cell.
+
+Shape follows Hosking's sign convention: k > 0 has a bounded upper tail,
+k < 0 a heavy one, and k = 0 is the Gumbel distribution.
+"""
+import math
+import warnings
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .grid import Series, day_of_year_matrix_for_series
+
+EULER_GAMMA = 0.5772156649015329
+# Below this |k| the Gumbel limit is used to avoid dividing by k
+GUMBEL_SHAPE_TOLERANCE = 1e-6
+
+# Variable -> (NASA parameter, whether extremes are annual minima)
+EXTREME_VARIABLES = {
+    "precipitation_mm": ("PRECTOTCORR", False),
+    "max_temp_c": ("T2M_MAX", False),
+    "min_temp_c": ("T2M_MIN", True),
+}
+
+_gamma = np.vectorize(math.gamma, otypes=[float])
+
+
+def annual_maxima(cell_series: List[Optional[Series]], column: str, start_year: int, end_year: int,
+                  min_days: int, minima: bool = False) -> np.ndarray:
+    """
+    Annual maxima (or minima) of one column for every cell, as a (cells x years) matrix.
+
+    Years with fewer than min_days valid days are left out (NaN), so a
+    partial year cannot understate the maximum.
+
+    Args:
+        cell_series: Daily series per cell (None for cells without data)
+        column: Column to take the extremes of
+        start_year: First year of the matrix
+        end_year: Last year of the matrix
+        min_days: Valid days a year needs
+        minima: Take annual minima instead of maxima
+
+    Returns:
+        np.ndarray: float matrix with NaN where a cell/year has no extreme
+    """
+    extremes = np.full((len(cell_series), end_year - start_year + 1), np.nan)
+    for row, series in enumerate(cell_series):
+        if series is None or column not in series:
+            continue
+        matrix = day_of_year_matrix_for_series(series, column, start_year, end_year)
+        complete = np.count_nonzero(~np.isnan(matrix), axis=1) >= min_days
+        if complete.any():
+            values = matrix[complete]
+            extremes[row, complete] = np.nanmin(values, axis=1) if minima else np.nanmax(values, axis=1)
+    return extremes
+
+
+def l_moments(samples: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    First two L-moments and the L-skewness of every row, ignoring NaN values.
+
+    Uses the unbiased probability-weighted moments b0, b1 and b2 of each row's
+    sorted valid values.
+
+    Args:
+        samples: (rows x values) matrix
+
+    Returns:
+        tuple: l1, l2, t3 and the number of valid values per row (NaN moments below 3 values)
+    """
+    ordered = np.sort(samples, axis=1)  # NaN sort last
+    n = np.count_nonzero(~np.isnan(ordered), axis=1).astype(float)
+    j = np.arange(ordered.shape[1], dtype=float)[None, :]
+    values = np.where(j < n[:, None], ordered, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b0 = values.sum(axis=1) / n
+        b1 = (values * j).sum(axis=1) / (n * (n - 1))
+        b2 = (values * j * (j - 1)).sum(axis=1) / (n * (n - 1) * (n - 2))
+        l1 = b0
+        l2 = 2 * b1 - b0
+        l3 = 6 * b2 - 6 * b1 + b0
+        t3 = l3 / l2
+
+    too_few = n < 3
+    for moment in (l1, l2, t3):
+        moment[too_few] = np.nan
+    return l1, l2, t3, n.astype(int)
+
+
+def fit_gev(l1: np.ndarray, l2: np.ndarray, t3: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    GEV location, scale and shape from L-moments (Hosking's rational approximation for the shape).
+
+    Rows whose L-skewness implies a shape of -1 or less (infinite mean) are
+    left unfitted (NaN).
+
+    Args:
+        l1: First L-moments
+        l2: Second L-moments
+        t3: L-skewness
+
+    Returns:
+        tuple: location (xi), scale (alpha) and shape (k) arrays
+    """
+    c = 2 / (3 + t3) - math.log(2) / math.log(3)
+    k = 7.8590 * c + 2.9554 * c ** 2
+    k = np.where(k > -1, k, np.nan)
+
+    gumbel = np.abs(k) < GUMBEL_SHAPE_TOLERANCE
+    safe_k = np.where(gumbel | np.isnan(k), 1.0, k)
+    gamma = _gamma(1 + safe_k)
+    alpha = np.where(gumbel, l2 / math.log(2), l2 * safe_k / ((1 - 2 ** -safe_k) * gamma))
+    xi = np.where(gumbel, l1 - EULER_GAMMA * alpha, l1 - alpha * (1 - gamma) / safe_k)
+    alpha[np.isnan(k)] = np.nan
+    xi[np.isnan(k)] = np.nan
+    return xi, alpha, k
+
+
+def return_levels(xi: np.ndarray, alpha: np.ndarray, k: np.ndarray, return_periods: List[float]) -> np.ndarray:
+    """
+    Values exceeded on average once every T years, for every fit and return period.
+
+    Args:
+        xi: GEV locations
+        alpha: GEV scales
+        k: GEV shapes
+        return_periods: Return periods in years (each above 1)
+
+    Returns:
+        np.ndarray: (fits x return periods) matrix
+    """
+    y = -np.log(1 - 1 / np.asarray(return_periods, dtype=float))[None, :]
+    xi, alpha, k = xi[:, None], alpha[:, None], k[:, None]
+    gumbel = np.abs(k) < GUMBEL_SHAPE_TOLERANCE
+    safe_k = np.where(gumbel, 1.0, k)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # unfitted rows give NaN
+        return np.where(gumbel, xi - alpha * np.log(y), xi + alpha / safe_k * (1 - y ** safe_k))
+
+
+def return_level_grids(cell_series: List[Optional[Series]], start_year: int, end_year: int,
+                       return_periods: List[float], min_years: int, min_days: int) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Fit every cell and variable of EXTREME_VARIABLES in one pass.
+
+    Args:
+        cell_series: Daily series per cell (None for cells without data)
+        start_year: First year to include
+        end_year: Last year to include
+        return_periods: Return periods in years
+        min_years: Annual extremes a cell needs to be fitted
+        min_days: Valid days a year needs to count
+
+    Returns:
+        dict: Per variable, "levels" (cells x return periods, NaN where unfitted),
+            "years" (extremes per cell) and "shape" (GEV k per cell)
+    """
+    blocks = []
+    for column, minima in EXTREME_VARIABLES.values():
+        extremes = annual_maxima(cell_series, column, start_year, end_year, min_days, minima)
+        # Minima are fitted as maxima of the negated values
+        blocks.append(-extremes if minima else extremes)
+    stacked = np.vstack(blocks)
+
+    l1, l2, t3, years = l_moments(stacked)
+    xi, alpha, k = fit_gev(l1, l2, t3)
+    levels = return_levels(xi, alpha, k, return_periods)
+    levels[years < min_years] = np.nan
+
+    results = {}
+    cells = len(cell_series)
+    for index, (name, (_, minima)) in enumerate(EXTREME_VARIABLES.items()):
+        rows = slice(index * cells, (index + 1) * cells)
+        results[name] = {
+            "levels": -levels[rows] if minima else levels[rows],
+            "years": years[rows],
+            "shape": k[rows],
+        }
+    return results
@@ -0,0 +1,175 @@
+"""
+Vectorized probability grids over many NASA POWER cells.
+"""
+import numpy as np
+from typing import Dict, List, Optional
+
+from .quantile_sketch import TDigest
+
+# Daily series keyed by column name, as kept by the series store
+Series = Dict[str, np.ndarray]
+
+# Decimal places of the values in NASA POWER CSVs
+CSV_DECIMALS = 2
+
+# Days before each month in a leap year, so every calendar day has a fixed
+# day-of-year slot (Feb 29 is day 60 and Mar 1 always day 61)
+LEAP_YEAR_DAYS_BEFORE_MONTH = np.array([0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335])
+
+
+def csv_values(values: np.ndarray) -> np.ndarray:
+    """
+    Recover the float64 values of the CSV text from narrower stored values.
+
+    Two-decimal values survive a float32 round trip exactly once rounded back,
+    so statistics over stored series match those over freshly parsed ones.
+
+    Args:
+        values: Value array (e.g. float32 from the series store), NaN for missing data
+
+    Returns:
+        np.ndarray: float64 array
+    """
+    return np.round(np.asarray(values, dtype=np.float64), CSV_DECIMALS)
+
+
+def day_of_year(month, day):
+    """
+    Map calendar days to fixed day-of-year slots (1-366) of a leap-year calendar.
+
+    Accepts scalars or arrays of months and days.
+    """
+    return LEAP_YEAR_DAYS_BEFORE_MONTH[np.asarray(month) - 1] + np.asarray(day)
+
+
+def day_of_year_matrix(cell_series: List[Optional[Series]], column: str,
+                       month: int, day: int, start_year: int, end_year: int) -> np.ndarray:
+    """
+    Gather one column's values for a calendar day into a (cells x years) matrix.
+
+    Args:
+        cell_series: Daily series per cell (None for cells without data)
+        column: Column to extract
+        month: Month of the year
+        day: Day of the month
+        start_year: First year of the matrix
+        end_year: Last year of the matrix
+
+    Returns:
+        np.ndarray: float matrix with NaN where a cell/year has no value
+    """
+    matrix = np.full((len(cell_series), end_year - start_year + 1), np.nan)
+    for row, series in enumerate(cell_series):
+        if series is None or column not in series:
+            continue
+        on_day = (series["MO"] == month) & (series["DY"] == day)
+        years = series["YEAR"][on_day].astype(int)
+        in_range = (years >= start_year) & (years <= end_year)
+        matrix[row, years[in_range] - start_year] = series[column][on_day][in_range]
+    return matrix
+
+
+def day_of_year_matrix_for_series(series: Series, column: str,
+                                  start_year: int, end_year: int) -> np.ndarray:
+    """
+    Arrange one column of a full daily series as a (years x 366) matrix.
+
+    Columns are leap-year day-of-year slots, so Feb 29 only has values in leap
+    years and every other calendar day keeps the same column across years.
+
+    Args:
+        series: Full daily series of one cell
+        column: Column to extract
+        start_year: First year of the matrix
+        end_year: Last year of the matrix
+
+    Returns:
+        np.ndarray: float matrix with NaN where a year/day has no value
+    """
+    matrix = np.full((end_year - start_year + 1, 366), np.nan)
+    years = series["YEAR"].astype(int)
+    in_range = (years >= start_year) & (years <= end_year)
+    slots = day_of_year(series["MO"][in_range], series["DY"][in_range]) - 1
+    matrix[years[in_range] - start_year, slots] = series[column][in_range]
+    return matrix
+
+
+def compute_grid_probabilities(cell_series: List[Optional[Series]], shape: tuple[int, int],
+                               month: int, day: int, start_year: int, end_year: int,
+                               rain_threshold: float, hot_threshold: float) -> Dict[str, np.ndarray]:
+    """
+    Compute rain and temperature probabilities for every cell in one pass.
+
+    Args:
+        cell_series: Daily series per cell in row-major (lat, lon) order
+        shape: (number of latitudes, number of longitudes) of the grid
+        month: Month of the year
+        day: Day of the month
+        start_year: First year to analyze
+        end_year: Last year to analyze
+        rain_threshold: Precipitation above which a day counts as rainy (mm)
+        hot_threshold: Maximum temperature above which a day counts as hot (°C)
+
+    Returns:
+        dict: 2-D arrays (NaN where a cell has no data) keyed by statistic
+    """
+    # Compare CSV-exact values, so e.g. a stored 30.1 is not hot at a 30.1 threshold
+    precipitation = csv_values(day_of_year_matrix(cell_series, "PRECTOTCORR", month, day, start_year, end_year))
+    temp_max = csv_values(day_of_year_matrix(cell_series, "T2M_MAX", month, day, start_year, end_year))
+
+    rain_years = np.count_nonzero(~np.isnan(precipitation), axis=1)
+    temp_years = np.count_nonzero(~np.isnan(temp_max), axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rain_probability = np.count_nonzero(precipitation > rain_threshold, axis=1) / rain_years * 100
+        hot_probability = np.count_nonzero(temp_max > hot_threshold, axis=1) / temp_years * 100
+        avg_max_temp = np.nansum(temp_max, axis=1) / temp_years
+
+    return {
+        "rain_probability_percent": rain_probability.reshape(shape),
+        "hot_probability_percent": hot_probability.reshape(shape),
+        "avg_max_temp_c": avg_max_temp.reshape(shape),
+        "years_analyzed": rain_years.reshape(shape),
+    }
+
+
+def grid_to_lists(grid: np.ndarray, decimals: int = 2) -> list:
+    """Convert a 2-D array to nested lists, mapping NaN to None."""
+    rounded = np.round(grid.astype(float), decimals)
+    return np.where(np.isnan(rounded), None, rounded).tolist()
+
+
+def window_day_slots(month: int, day: int, window_days: int) -> np.ndarray:
+    """
+    Day-of-year slot indices (0-365) within ±window_days of a calendar day.
+
+    The window wraps around the end of the year.
+    """
+    center = int(day_of_year(month, day)) - 1
+    return (center + np.arange(-window_days, window_days + 1)) % 366
+
+
+def regional_percentiles(cell_day_sketches: List[List[TDigest]], slots: np.ndarray,
+                         percentiles: List[float], compression: float) -> Dict[str, object]:
+    """
+    Percentiles over a region and a window of days, merged from per-day sketches.
+
+    Args:
+        cell_day_sketches: Per cell, the 366 per-day-of-year TDigests of a column
+        slots: Day-of-year slot indices to include
+        percentiles: Percentiles to estimate (0-100)
+        compression: Compression of the merged digest
+
+    Returns:
+        dict: "sample_count" and "percentiles" (None when there are no values)
+    """
+    merged = TDigest.merge_all(
+        (sketches[slot] for sketches in cell_day_sketches for slot in slots), compression
+    )
+    if merged.count == 0:
+        return {"sample_count": 0, "percentiles": None}
+    values = merged.percentile(percentiles)
+    return {
+        "sample_count": merged.count,
+        "percentiles": {f"p{int(q)}": round(float(value), 2) for q, value in zip(percentiles, values)},
+    }
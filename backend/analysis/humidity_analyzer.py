@@ -11,6 +11,8 @@ from config import config
 class HumidityAnalyzer(BaseAnalyzer):
     """Analyzer for humidity statistics."""
     
+    result_key = "humidity"
+    
     @property
     def name(self) -> str:
         return "HumidityAnalyzer"
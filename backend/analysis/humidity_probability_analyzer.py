@@ -11,6 +11,8 @@ from config import config
 class HumidityProbabilityAnalyzer(BaseAnalyzer):
     """Analyzer for humid/dry day probabilities."""
     
+    result_key = "humidity_probability"
+    
     @property
     def name(self) -> str:
         return "HumidityProbabilityAnalyzer"
@@ -0,0 +1,132 @@
+"""
+Mergeable quantile sketch (merging t-digest).
+
+A digest summarizes a sample as weighted centroids whose size is bounded by
+the compression parameter, independent of the sample size. Digests built
+for separate partitions (cells, days, chunks of a stream) merge into a
+digest of the union, so percentiles over large windows or regions are
+computed from stored partials instead of from every raw value.
+
+Centroid sizes follow the arcsine scale function, so the tails stay (close
+to) exact while the middle of the distribution is summarized more coarsely.
+Small samples are kept exactly and their percentiles match np.percentile.
+"""
+from typing import Iterable
+
+import numpy as np
+
+
+class TDigest:
+    """Merging t-digest with vectorized compression."""
+
+    def __init__(self, means: np.ndarray, weights: np.ndarray, minimum: float, maximum: float,
+                 compression: float = 200.0):
+        """
+        Initialize a digest from sorted centroids.
+
+        Args:
+            means: Centroid means, sorted ascending
+            weights: Centroid weights (number of values per centroid)
+            minimum: Smallest value seen
+            maximum: Largest value seen
+            compression: Scale parameter; the digest keeps about compression / 2 centroids
+        """
+        self.means = np.asarray(means, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.compression = compression
+
+    @classmethod
+    def empty(cls, compression: float = 200.0) -> "TDigest":
+        """Create a digest without values."""
+        return cls(np.empty(0), np.empty(0), np.nan, np.nan, compression)
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, compression: float = 200.0) -> "TDigest":
+        """
+        Build a digest from raw values (NaN values are ignored).
+
+        Args:
+            values: Sample values
+            compression: Scale parameter of the digest
+
+        Returns:
+            TDigest: Digest of the values
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = np.sort(values[~np.isnan(values)])
+        if len(values) == 0:
+            return cls.empty(compression)
+        digest = cls(values, np.ones(len(values)), values[0], values[-1], compression)
+        digest._compress()
+        return digest
+
+    @classmethod
+    def merge_all(cls, digests: Iterable["TDigest"], compression: float = 200.0) -> "TDigest":
+        """
+        Merge several digests into one.
+
+        Args:
+            digests: Digests to merge
+            compression: Scale parameter of the merged digest
+
+        Returns:
+            TDigest: Digest of the union of all samples
+        """
+        digests = [digest for digest in digests if digest.count > 0]
+        if not digests:
+            return cls.empty(compression)
+        means = np.concatenate([digest.means for digest in digests])
+        weights = np.concatenate([digest.weights for digest in digests])
+        order = np.argsort(means, kind="stable")
+        merged = cls(
+            means[order], weights[order],
+            min(digest.minimum for digest in digests),
+            max(digest.maximum for digest in digests),
+            compression,
+        )
+        merged._compress()
+        return merged
+
+    @property
+    def count(self) -> int:
+        """Number of values summarized."""
+        return int(self.weights.sum())
+
+    def _scale(self, q: np.ndarray) -> np.ndarray:
+        """Arcsine scale function k(q); one unit of k is the largest centroid span."""
+        return self.compression / (2 * np.pi) * np.arcsin(2 * np.clip(q, 0, 1) - 1)
+
+    def _compress(self) -> None:
+        """Merge neighbouring centroids whose quantile midpoints share a unit of k."""
+        if len(self.means) <= self.compression / 2:
+            return
+        total = self.weights.sum()
+        cumulative = np.cumsum(self.weights)
+        midpoints = (cumulative - self.weights / 2) / total
+        buckets = np.floor(self._scale(midpoints) - self._scale(np.array(0.0))).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        weights = np.add.reduceat(self.weights, starts)
+        self.means = np.add.reduceat(self.means * self.weights, starts) / weights
+        self.weights = weights
+
+    def percentile(self, q):
+        """
+        Estimate percentiles, using the same linear interpolation as np.percentile.
+
+        Args:
+            q: Percentile or array of percentiles in [0, 100]
+
+        Returns:
+            float or np.ndarray: Estimated percentile value(s)
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        # Each centroid sits at the center of the sorted positions it covers;
+        # with unit weights this reproduces np.percentile exactly
+        positions = np.cumsum(self.weights) - self.weights + (self.weights - 1) / 2
+        positions = np.r_[0.0, positions, self.count - 1]
+        values = np.r_[self.minimum, self.means, self.maximum]
+        result = np.interp(np.asarray(q, dtype=np.float64) / 100 * (self.count - 1), positions, values)
+        return float(result) if np.ndim(result) == 0 else result
@@ -10,6 +10,8 @@ from config import config
 class RainAnalyzer(BaseAnalyzer):
     """Analyzer for rain probability and frequency."""
     
+    result_key = "rain_probability"
+    
     @property
     def name(self) -> str:
         return "RainAnalyzer"
@@ -1,67 +1,84 @@
 import pandas as pd
-import io
+import numpy as np
+from importlib import import_module
 from typing import List, Optional
 from exceptions import DataProcessingError, InsufficientDataError
-from .rain_analyzer import RainAnalyzer
-from .temperature_analyzer import TemperatureAnalyzer
-from .temperature_probability_analyzer import TemperatureProbabilityAnalyzer
-from .humidity_analyzer import HumidityAnalyzer
-from .humidity_probability_analyzer import HumidityProbabilityAnalyzer
-from .wind_analyzer import WindAnalyzer
-from .data_quality_analyzer import DataQualityAnalyzer
+from tracing import log, log_exception, span
 from .base_analyzer import BaseAnalyzer
 
 
-def process_csv_data(list_of_csvs: list[str]) -> pd.DataFrame:
+# Default analyzers as (module, class name) pairs. They are imported on first
+# use so that importing this module does not pull in every analyzer.
+DEFAULT_ANALYZERS = [
+    (".rain_analyzer", "RainAnalyzer"),
+    (".temperature_analyzer", "TemperatureAnalyzer"),
+    (".temperature_probability_analyzer", "TemperatureProbabilityAnalyzer"),
+    (".humidity_analyzer", "HumidityAnalyzer"),
+    (".humidity_probability_analyzer", "HumidityProbabilityAnalyzer"),
+    (".wind_analyzer", "WindAnalyzer"),
+    (".data_quality_analyzer", "DataQualityAnalyzer"),
+]
+
+
+# NASA parameter names to analysis column names
+COLUMN_NAMES = {
+    'T2M_MAX': 'temp_max',
+    'T2M_MIN': 'temp_min',
+    'T2M': 'temp_avg',
+    'PRECTOTCORR': 'precipitation',
+    'WS2M': 'wind_speed',
+    'RH2M': 'humidity',
+    # Additional parameters
+    'ALLSKY_SFC_SW_DWN': 'solar_radiation',
+    'CLOUD_AMT': 'cloud_cover',
+    'EVPTRNS': 'evapotranspiration',
+    'PS': 'surface_pressure'
+}
+
+
+def load_analyzer_class(module_name: str, class_name: str) -> type:
+    """
+    Import an analyzer class on demand.
+    
+    Args:
+        module_name: Module path, relative to the analysis package if it starts with a dot
+        class_name: Name of the analyzer class in that module
+        
+    Returns:
+        type: The analyzer class
+    """
+    module = import_module(module_name, package=__package__)
+    return getattr(module, class_name)
+
+
+def get_default_analyzers() -> List[BaseAnalyzer]:
+    """Instantiate the default set of analyzers."""
+    return [load_analyzer_class(module_name, class_name)() for module_name, class_name in DEFAULT_ANALYZERS]
+
+
+def process_series_data(list_of_series: list[dict]) -> pd.DataFrame:
     """
-    Process a list of CSV strings from NASA and return a cleaned DataFrame.
+    Combine parsed NASA responses into a cleaned DataFrame.
     
     Args:
-        list_of_csvs: List of CSV text strings with NASA data
+        list_of_series: Column arrays per NASA response, as returned by get_nasa_data
         
     Returns:
         pd.DataFrame: Cleaned and concatenated DataFrame with renamed columns
         
     Raises:
-        InsufficientDataError: If no valid data is found in the CSV files
+        InsufficientDataError: If no valid data is found in the responses
     """
-    if not list_of_csvs:
-        raise InsufficientDataError("NASA CSV list is empty.")
-
-    list_of_dfs = []
-    for i, csv_text in enumerate(list_of_csvs):
-        try:
-            header_end_str = "-END HEADER-"
-            header_end_pos = csv_text.find(header_end_str)
-            if header_end_pos != -1:
-                data_text = csv_text[header_end_pos + len(header_end_str):].lstrip()
-                if data_text:
-                    csv_data_io = io.StringIO(data_text)
-                    df = pd.read_csv(csv_data_io)
-                    df.replace(-999, pd.NA, inplace=True)
-                    list_of_dfs.append(df)
-        except Exception as e:
-            print(f"Error processing CSV #{i + 1}: {e}")
-
-    if not list_of_dfs:
-        raise InsufficientDataError("No valid data found in NASA files after processing.")
-
-    df_full = pd.concat(list_of_dfs, ignore_index=True).dropna()
-
-    rename_map = {
-        'T2M_MAX': 'temp_max',
-        'T2M_MIN': 'temp_min',
-        'T2M': 'temp_avg',
-        'PRECTOTCORR': 'precipitation',
-        'WS2M': 'wind_speed',
-        'RH2M': 'humidity',
-        # Additional parameters
-        'ALLSKY_SFC_SW_DWN': 'solar_radiation',
-        'CLOUD_AMT': 'cloud_cover',
-        'EVPTRNS': 'evapotranspiration',
-        'PS': 'surface_pressure'
-    }
-    df_full.rename(columns=rename_map, inplace=True)
+    if not list_of_series:
+        raise InsufficientDataError("NASA response list is empty.")
+
+    columns = list(list_of_series[0])
+    df_full = pd.DataFrame({
+        column: np.concatenate([series[column] for series in list_of_series])
+        for column in columns
+    }).dropna()
+
+    df_full.rename(columns=COLUMN_NAMES, inplace=True)
 
     if len(df_full) == 0:
         raise InsufficientDataError("No valid data remaining after cleaning missing values.")
@@ -69,9 +86,52 @@ def process_csv_data(list_of_csvs: list[str]) -> pd.DataFrame:
     return df_full
 
 
+def process_hourly_series(list_of_series: list[dict]) -> pd.DataFrame:
+    """
+    Reduce per-year hourly series to one row per year for the analyzers.
+
+    Each series holds the selected hours of day of one year. Temperature
+    becomes the max/min/mean over those hours, precipitation their total and
+    every other parameter their mean, so the daily analyzers apply unchanged.
+    A year missing any selected hour of a parameter is dropped, like a day
+    with missing values in process_series_data.
+
+    Args:
+        list_of_series: Column arrays per year, as returned by get_hourly_data_for_day
+
+    Returns:
+        pd.DataFrame: One row per year with renamed columns
+
+    Raises:
+        InsufficientDataError: If no year has complete data for the selected hours
+    """
+    rows = []
+    for series in list_of_series:
+        row = {"YEAR": int(series["YEAR"][0])}
+        for column, values in series.items():
+            if column in ("YEAR", "MO", "DY", "HR"):
+                continue
+            if column == "T2M":
+                row["temp_max"] = float(np.max(values))
+                row["temp_min"] = float(np.min(values))
+                row["temp_avg"] = float(np.mean(values))
+            elif column == "PRECTOTCORR":
+                row["precipitation"] = float(np.sum(values))
+            else:
+                row[COLUMN_NAMES.get(column, column)] = float(np.mean(values))
+        rows.append(row)
+
+    df = pd.DataFrame(rows).dropna()
+    if len(df) == 0:
+        raise InsufficientDataError("No valid hourly data remaining after cleaning missing values.")
+    return df
+
+
 def calculate_climate_statistics(df: pd.DataFrame, lat: float, lon: float, 
                                 analyzers: Optional[List[BaseAnalyzer]] = None,
-                                additional_parameters: Optional[List[str]] = None) -> dict:
+                                additional_parameters: Optional[List[str]] = None,
+                                confidence_intervals: bool = False,
+                                trends: bool = False) -> dict:
     """
     Calculate comprehensive climate statistics using pluggable analyzers.
     
@@ -81,6 +141,8 @@ def calculate_climate_statistics(df: pd.DataFrame, lat: float, lon: float,
         lon: Longitude of the location
         analyzers: Optional list of analyzer instances to use
         additional_parameters: Optional list of additional parameters to analyze
+        confidence_intervals: Whether to add bootstrap confidence intervals for the probabilities
+        trends: Whether to add Theil-Sen / Mann-Kendall trends of every variable
         
     Returns:
         dict: Dictionary containing all climate analysis results
@@ -90,15 +152,7 @@ def calculate_climate_statistics(df: pd.DataFrame, lat: float, lon: float,
     
     # Use default analyzers if none provided
     if analyzers is None:
-        analyzers = [
-            RainAnalyzer(),
-            TemperatureAnalyzer(),
-            TemperatureProbabilityAnalyzer(),
-            HumidityAnalyzer(),
-            HumidityProbabilityAnalyzer(),
-            WindAnalyzer(),
-            DataQualityAnalyzer()
-        ]
+        analyzers = get_default_analyzers()
     
     # Add additional parameter analyzers if requested
     if additional_parameters:
@@ -107,7 +161,15 @@ def calculate_climate_statistics(df: pd.DataFrame, lat: float, lon: float,
             try:
                 analyzers.append(AdditionalParameterAnalyzer(param))
             except ValueError as e:
-                print(f"Warning: Could not add analyzer for {param}: {e}")
+                log("WARNING", "Could not add analyzer for parameter", parameter=param, error=str(e))
+    
+    if confidence_intervals:
+        from .confidence_interval_analyzer import ConfidenceIntervalAnalyzer
+        analyzers.append(ConfidenceIntervalAnalyzer())
+    
+    if trends:
+        from .trend_analyzer import TrendAnalyzer
+        analyzers.append(TrendAnalyzer())
     
     # Base analysis structure
     analysis = {
@@ -122,72 +184,98 @@ def calculate_climate_statistics(df: pd.DataFrame, lat: float, lon: float,
         }
     }
     
-    # Store additional parameter results
-    additional_results = []
-    
     # Run each analyzer
     for analyzer in analyzers:
-        try:
-            result = analyzer.analyze(df)
-            
-            # Map analyzer results to expected keys
-            if isinstance(analyzer, RainAnalyzer):
-                analysis["rain_probability"] = result
-            elif isinstance(analyzer, TemperatureAnalyzer):
-                analysis["temperature"] = result
-            elif isinstance(analyzer, TemperatureProbabilityAnalyzer):
-                analysis["temperature_probability"] = result
-            elif isinstance(analyzer, HumidityAnalyzer):
-                analysis["humidity"] = result
-            elif isinstance(analyzer, HumidityProbabilityAnalyzer):
-                analysis["humidity_probability"] = result
-            elif isinstance(analyzer, WindAnalyzer):
-                analysis["wind"] = result
-            elif isinstance(analyzer, DataQualityAnalyzer):
-                analysis["summary_statistics"] = result
-            else:
-                # Handle additional parameter analyzers
-                from .additional_parameter_analyzer import AdditionalParameterAnalyzer
-                if isinstance(analyzer, AdditionalParameterAnalyzer):
-                    additional_results.append(result)
+        with span(f"analyzer {analyzer.name}", rows=len(df)):
+            try:
+                result = analyzer.analyze(df)
                 
-        except Exception as e:
-            print(f"Error in {analyzer.name}: {e}")
-            # Continue with other analyzers
-    
-    # Add additional parameters results if any
-    if additional_results:
-        analysis["additional_parameters"] = additional_results
+                # Map analyzer results to their response keys
+                if analyzer.result_key is None:
+                    continue
+                if analyzer.collects_results:
+                    analysis.setdefault(analyzer.result_key, []).append(result)
+                else:
+                    analysis[analyzer.result_key] = result
+                    
+            except Exception as e:
+                log_exception(f"Error in {analyzer.name}", e, analyzer=analyzer.name)
+                # Continue with other analyzers
     
     return analysis
 
 
-def process_and_analyze_data(list_of_csvs: list[str], lat: float, lon: float,
+def process_and_analyze_data(list_of_series: list[dict], lat: float, lon: float,
                             analyzers: Optional[List[BaseAnalyzer]] = None,
-                            additional_parameters: Optional[List[str]] = None) -> dict:
+                            additional_parameters: Optional[List[str]] = None,
+                            confidence_intervals: bool = False,
+                            trends: bool = False) -> dict:
     """
-    Main function to process CSV data and perform climate analysis.
+    Main function to process NASA data and perform climate analysis.
     
     Args:
-        list_of_csvs: List of CSV text strings with NASA data
+        list_of_series: Column arrays per NASA response
         lat: Latitude of the location
         lon: Longitude of the location
         analyzers: Optional list of analyzer instances to use
         additional_parameters: Optional list of additional parameters to analyze
+        confidence_intervals: Whether to add bootstrap confidence intervals for the probabilities
+        trends: Whether to add Theil-Sen / Mann-Kendall trends of every variable
         
     Returns:
         dict: Dictionary containing all climate analysis results or error message
     """
     try:
-        # Process CSV data
-        df = process_csv_data(list_of_csvs)
+        # Combine the parsed responses
+        with span("analysis.combine", responses=len(list_of_series)) as combine_span:
+            df = process_series_data(list_of_series)
+            combine_span.set_attribute("rows", len(df))
         
         # Calculate statistics using pluggable analyzers
-        analysis = calculate_climate_statistics(df, lat, lon, analyzers, additional_parameters)
+        analysis = calculate_climate_statistics(
+            df, lat, lon, analyzers, additional_parameters, confidence_intervals, trends=trends
+        )
         
         return analysis
         
     except (InsufficientDataError, DataProcessingError) as e:
         return {"error": str(e)}
     except Exception as e:
+        log_exception("Unexpected error during analysis", e)
+        return {"error": f"Unexpected error during analysis: {str(e)}"}
+
+
+def process_and_analyze_hourly_data(list_of_series: list[dict], lat: float, lon: float, hours: List[int],
+                                   additional_parameters: Optional[List[str]] = None,
+                                   confidence_intervals: bool = False,
+                                   trends: bool = False) -> dict:
+    """
+    Analyze hourly data restricted to some hours of day.
+
+    Args:
+        list_of_series: Column arrays per year holding only the selected hours
+        lat: Latitude of the location
+        lon: Longitude of the location
+        hours: Hours of day the series were filtered to
+        additional_parameters: Optional list of additional parameters to analyze
+        confidence_intervals: Whether to add bootstrap confidence intervals for the probabilities
+        trends: Whether to add Theil-Sen / Mann-Kendall trends of every variable
+
+    Returns:
+        dict: Dictionary containing all climate analysis results or error message
+    """
+    try:
+        with span("analysis.combine", responses=len(list_of_series), hourly=True) as combine_span:
+            df = process_hourly_series(list_of_series)
+            combine_span.set_attribute("rows", len(df))
+        analysis = calculate_climate_statistics(
+            df, lat, lon, None, additional_parameters, confidence_intervals, trends=trends
+        )
+        analysis["hours_of_day"] = hours
+        return analysis
+
+    except (InsufficientDataError, DataProcessingError) as e:
+        return {"error": str(e)}
+    except Exception as e:
+        log_exception("Unexpected error during analysis", e)
         return {"error": f"Unexpected error during analysis: {str(e)}"}
@@ -4,14 +4,15 @@ Temperature analyzer module.
 import pandas as pd
 import numpy as np
 from typing import Dict, Any
-from scipy import stats
 from .base_analyzer import BaseAnalyzer
-from config import config
+from .classification import classify_variability, describe_trend, insufficient_trend
 
 
 class TemperatureAnalyzer(BaseAnalyzer):
     """Analyzer for temperature statistics and trends."""
     
+    result_key = "temperature"
+    
     @property
     def name(self) -> str:
         return "TemperatureAnalyzer"
@@ -51,7 +52,7 @@ class TemperatureAnalyzer(BaseAnalyzer):
         temp_coefficient_variation = round((yearly_temp_variability / avg_temp) * 100, 2) if avg_temp > 0 else 0
         
         # Classify variability
-        variability_info = self._classify_variability(temp_coefficient_variation, yearly_temp_variability)
+        variability_info = classify_variability(temp_coefficient_variation, yearly_temp_variability)
         
         # Calculate trend (using average temperatures)
         trend_info = self._calculate_trend(df['YEAR'], df['temp_avg'])
@@ -75,53 +76,15 @@ class TemperatureAnalyzer(BaseAnalyzer):
             "trend": trend_info
         }
     
-    def _classify_variability(self, cv: float, std_dev: float) -> Dict[str, Any]:
-        """Classify temperature variability based on coefficient of variation."""
-        if cv < config.TEMP_CV_VERY_CONSISTENT:
-            classification = "very_consistent"
-            description = "Temperature very consistent year after year"
-        elif cv < config.TEMP_CV_CONSISTENT:
-            classification = "consistent"
-            description = "Temperature relatively consistent"
-        elif cv < config.TEMP_CV_MODERATE:
-            classification = "moderate"
-            description = "Moderate temperature variability"
-        else:
-            classification = "high"
-            description = "High temperature variability between years"
-        
-        return {
-            "std_dev_c": std_dev,
-            "coefficient_variation_percent": cv,
-            "classification": classification,
-            "description": description,
-            "interpretation": f"Temperature varies by ±{std_dev}°C on average from year to year"
-        }
-    
     def _calculate_trend(self, years: pd.Series, temps: pd.Series) -> Dict[str, Any]:
-        """Calculate temperature trend using linear regression."""
-        if len(years) > 1:
-            regression_result = stats.linregress(years, temps)
-            slope = float(regression_result.slope)
-            trend_slope = round(slope, 4)
-            
-            threshold = config.TEMP_TREND_STABLE_THRESHOLD
-            if slope > threshold:
-                trend_desc = "warming"
-                interpretation = f"Temperature is increasing at {abs(trend_slope):.4f}°C per year"
-            elif slope < -threshold:
-                trend_desc = "cooling"
-                interpretation = f"Temperature is decreasing at {abs(trend_slope):.4f}°C per year"
-            else:
-                trend_desc = "stable"
-                interpretation = f"Temperature is stable at {abs(trend_slope):.4f}°C per year"
-        else:
-            trend_desc = "insufficient data"
-            trend_slope = 0.0
-            interpretation = "Not enough data to determine temperature trend"
-        
-        return {
-            "slope": trend_slope,
-            "description": trend_desc,
-            "interpretation": interpretation
-        }
+        """Calculate temperature trend using least-squares linear regression."""
+        if len(years) > 1 and years.nunique() > 1:
+            slope = self._least_squares_slope(years.to_numpy(dtype=float), temps.to_numpy(dtype=float))
+            return describe_trend(slope)
+        return insufficient_trend()
+    
+    @staticmethod
+    def _least_squares_slope(x: np.ndarray, y: np.ndarray) -> float:
+        """Ordinary least-squares slope of y over x (same result as scipy's linregress)."""
+        x_centered = x - x.mean()
+        return float(np.dot(x_centered, y - y.mean()) / np.dot(x_centered, x_centered))
@@ -11,6 +11,8 @@ from config import config
 class TemperatureProbabilityAnalyzer(BaseAnalyzer):
     """Analyzer for hot/cold day probabilities."""
     
+    result_key = "temperature_probability"
+    
     @property
     def name(self) -> str:
         return "TemperatureProbabilityAnalyzer"
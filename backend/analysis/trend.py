@@ -0,0 +1,277 @@
+"""
+Robust trend estimation: Theil-Sen slope and Mann-Kendall test.
+
+Both statistics are defined over all n(n-1)/2 pairs of points. Here they are
+reduced to counting inversions, in O(n log n), so they stay fast on full
+daily series:
+
+- Mann-Kendall S is the number of increasing pairs minus the number of
+  decreasing pairs, i.e. a function of the inversions of y ordered by x.
+- With points ordered by x, the slope of pair (i, j) is below b exactly when
+  y - b*x has an inversion at (i, j). Counting slopes below b is therefore an
+  inversion count, and the median slope is found by bisection on b.
+
+Inversions are counted with a bottom-up merge sort whose levels are
+vectorized across all blocks at once.
+
+The Mann-Kendall variance assumes independent samples. Daily values are
+strongly autocorrelated and seasonal, so for daily series the test runs on
+yearly means of day-of-year anomalies, while the slope still uses every
+daily anomaly.
+"""
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .grid import Series, day_of_year
+
+# Bisection stops once the bracket around the median slope is this narrow
+# (relative to the slope, or absolute for slopes below 1)
+THEIL_SEN_TOLERANCE = 1e-6
+# Random pairs sampled to bracket the median slope before bisecting
+THEIL_SEN_SAMPLE_PAIRS = 4096
+
+
+def _dense_ranks(values: np.ndarray) -> np.ndarray:
+    return np.unique(values, return_inverse=True)[1].astype(np.int64)
+
+
+def count_inversions(values: np.ndarray) -> int:
+    """
+    Number of pairs i < j with values[i] > values[j] (ties are not inversions).
+
+    Args:
+        values: 1-D array
+
+    Returns:
+        int: Inversion count, computed in O(n log n)
+    """
+    ranks = _dense_ranks(values)
+    n = len(ranks)
+    positions = np.arange(n)
+    inversions = 0
+    width = 1
+    while width < n:
+        # Blocks of 2*width hold two sorted halves; offsetting every block by
+        # block * n keeps all blocks in one globally sorted order
+        block = positions // (2 * width)
+        in_right = (positions % (2 * width)) >= width
+        keys = block * n + ranks
+        left_keys = keys[~in_right]
+        right_keys = keys[in_right]
+        block_end = block[in_right] * n + n
+        # Left elements of the same block that are greater than each right element
+        inversions += int(np.sum(
+            np.searchsorted(left_keys, block_end, side="left")
+            - np.searchsorted(left_keys, right_keys, side="right")
+        ))
+        # Merge the halves (a stable sort merges the two presorted runs of every block)
+        ranks = np.sort(keys, kind="stable") - block * n
+        width *= 2
+    return inversions
+
+
+def _tied_pairs(values: np.ndarray, axis=None) -> int:
+    counts = np.unique(values, axis=axis, return_counts=True)[1]
+    return int(np.sum(counts * (counts - 1) // 2))
+
+
+def mann_kendall(x: np.ndarray, y: np.ndarray) -> Dict[str, Any]:
+    """
+    Mann-Kendall trend test of y over x, with the tie-corrected variance.
+
+    Args:
+        x: Times (e.g. years or fractional years)
+        y: Values
+
+    Returns:
+        dict: S statistic, normal approximation z and two-sided p-value
+    """
+    order = np.lexsort((y, x))
+    x, y = x[order], y[order]
+    n = len(y)
+    pairs = n * (n - 1) // 2
+    tied_x = _tied_pairs(x)
+    tied_y = _tied_pairs(y)
+    tied_xy = _tied_pairs(np.c_[x, y], axis=0)
+    # Pairs tied in x are sorted by y, so they are never inversions; they count as neither direction
+    decreasing = count_inversions(y)
+    increasing = pairs - tied_y - decreasing - (tied_x - tied_xy)
+    s = increasing - decreasing
+
+    tie_counts = np.unique(y, return_counts=True)[1]
+    variance = (n * (n - 1) * (2 * n + 5) - np.sum(tie_counts * (tie_counts - 1) * (2 * tie_counts + 5))) / 18
+    z = (s - np.sign(s)) / math.sqrt(variance) if variance > 0 else 0.0
+    p_value = math.erfc(abs(z) / math.sqrt(2))
+    return {
+        "sample_size": int(n),
+        "s": int(s),
+        "z": round(float(z), 4),
+        "p_value": round(p_value, 6),
+    }
+
+
+def theil_sen_slope(x: np.ndarray, y: np.ndarray) -> float:
+    """
+    Median of the slopes of all pairs with distinct x.
+
+    Args:
+        x: Times
+        y: Values
+
+    Returns:
+        float: Theil-Sen slope (NaN when all x are equal)
+    """
+    order = np.lexsort((y, x))
+    x, y = x[order].astype(np.float64), y[order].astype(np.float64)
+    n = len(y)
+    valid_pairs = n * (n - 1) // 2 - _tied_pairs(x)
+    if valid_pairs == 0:
+        return float("nan")
+
+    def slopes_below(b: float) -> int:
+        # Pairs tied in x are sorted by y and never counted
+        return count_inversions(y - b * x)
+
+    # Every pairwise slope is within +-(range of y) / (smallest gap between distinct x)
+    gaps = np.diff(np.unique(x))
+    bound = max(float(np.ptp(y) / gaps.min()), 1e-12)
+
+    def bracket(k: int) -> tuple[float, float]:
+        """Narrow the search to quantiles of a random sample of slopes when they enclose the k-th slope."""
+        rng = np.random.default_rng(k)
+        i, j = rng.integers(0, n, (2, THEIL_SEN_SAMPLE_PAIRS))
+        distinct = x[i] != x[j]
+        sample = np.sort((y[j] - y[i])[distinct] / (x[j] - x[i])[distinct])
+        if len(sample) < 100:
+            return -bound, bound
+        # About 3 standard errors of the sample quantile either side of k / valid_pairs
+        q = k / valid_pairs
+        spread = 3 * np.sqrt(q * (1 - q) / len(sample)) + 1 / len(sample)
+        low = sample[max(int((q - spread) * len(sample)), 0)]
+        high = sample[min(int((q + spread) * len(sample)), len(sample) - 1)]
+        if slopes_below(low) <= k < slopes_below(high):
+            return float(low), float(high)
+        return -bound, bound
+
+    def kth_slope(k: int) -> float:
+        """k-th smallest slope (0-based): the largest b with at most k slopes below it."""
+        low, high = bracket(k)
+        while high - low > THEIL_SEN_TOLERANCE * max(1.0, abs(low), abs(high)):
+            middle = (low + high) / 2
+            if slopes_below(middle) <= k:
+                low = middle
+            else:
+                high = middle
+        return (low + high) / 2
+
+    middle = valid_pairs // 2
+    if valid_pairs % 2:
+        return kth_slope(middle)
+    return (kth_slope(middle - 1) + kth_slope(middle)) / 2
+
+
+def describe_robust_trend(x: np.ndarray, y: np.ndarray, significance: float = 0.05,
+                          test_sample: Optional[tuple[np.ndarray, np.ndarray]] = None) -> Dict[str, Any]:
+    """
+    Theil-Sen slope and Mann-Kendall test of a sample, ignoring NaN values.
+
+    Args:
+        x: Times (the slope is per unit of x)
+        y: Values
+        significance: p-value below which the trend is reported as significant
+        test_sample: Optional (times, values) to run the Mann-Kendall test on instead
+            of (x, y), e.g. yearly aggregates of autocorrelated daily values
+
+    Returns:
+        dict: Slope, test statistics and an increasing/decreasing/no trend label
+    """
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[valid], y[valid]
+    test_x, test_y = (x, y) if test_sample is None else test_sample
+    if len(y) < 3 or len(np.unique(x)) < 2 or len(test_y) < 3:
+        return {"sample_size": int(len(y)), "slope_per_year": None, "mann_kendall": None, "trend": "insufficient data"}
+
+    test = mann_kendall(test_x, test_y)
+    if test["p_value"] >= significance:
+        trend = "no significant trend"
+    else:
+        trend = "increasing" if test["s"] > 0 else "decreasing"
+    return {
+        "sample_size": int(len(y)),
+        "slope_per_year": round(theil_sen_slope(x, y), 4),
+        "mann_kendall": test,
+        "trend": trend,
+    }
+
+
+def day_of_year_anomalies(slots: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Daily values minus the mean of their day-of-year slot, removing the seasonal cycle.
+
+    Args:
+        slots: Day-of-year slot (0-365) of each value
+        values: Daily values (NaN stays NaN)
+
+    Returns:
+        np.ndarray: Anomalies
+    """
+    valid = ~np.isnan(values)
+    sums = np.bincount(slots[valid], weights=values[valid], minlength=366)
+    slot_means = sums / np.maximum(np.bincount(slots[valid], minlength=366), 1)
+    return values - slot_means[slots]
+
+
+def annual_means(years: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Mean value of each year, ignoring NaN values.
+
+    Args:
+        years: Year of each value
+        values: Daily values
+
+    Returns:
+        tuple: Years with data and their mean
+    """
+    valid = ~np.isnan(values)
+    unique_years, year_index = np.unique(years[valid], return_inverse=True)
+    means = np.bincount(year_index, weights=values[valid]) / np.bincount(year_index)
+    return unique_years.astype(np.float64), means
+
+
+def series_trends(series: Series, columns: List[str], start_year: int, end_year: int,
+                  slots: Optional[np.ndarray] = None, significance: float = 0.05) -> Dict[str, Any]:
+    """
+    Robust trends of full daily series, optionally restricted to some days of the year.
+
+    Values are first reduced to day-of-year anomalies, so the seasonal cycle
+    neither biases the slope nor passes for a trend. Every daily anomaly is a
+    sample of the slope, at its date in fractional years, so slopes are per
+    year and a window of days around a date gives a far larger sample than one
+    value per year. Neighbouring days are not independent, though, so the
+    Mann-Kendall test runs on the yearly mean anomalies.
+
+    Args:
+        series: Full daily series of a cell
+        columns: Columns to estimate trends for
+        start_year: First year to include
+        end_year: Last year to include
+        slots: Optional day-of-year slot indices (0-365) to keep
+        significance: p-value below which a trend is reported as significant
+
+    Returns:
+        dict: Trend per column
+    """
+    slot = day_of_year(series["MO"], series["DY"]) - 1
+    mask = (series["YEAR"] >= start_year) & (series["YEAR"] <= end_year)
+    if slots is not None:
+        mask &= np.isin(slot, slots)
+    years, slot = series["YEAR"][mask], slot[mask]
+    times = years + slot / 366
+    trends = {}
+    for column in columns:
+        anomalies = day_of_year_anomalies(slot, series[column][mask].astype(np.float64))
+        trends[column] = describe_robust_trend(times, anomalies, significance, annual_means(years, anomalies))
+    return trends
@@ -0,0 +1,49 @@
+"""
+Robust trend analyzer module.
+"""
+import pandas as pd
+from typing import Dict, Any
+from .base_analyzer import BaseAnalyzer
+from .trend import describe_robust_trend
+from config import config
+
+
+class TrendAnalyzer(BaseAnalyzer):
+    """Analyzer for Theil-Sen trends and Mann-Kendall significance of every variable."""
+
+    result_key = "trends"
+
+    @property
+    def name(self) -> str:
+        return "TrendAnalyzer"
+
+    def analyze(self, df: pd.DataFrame, **kwargs) -> Dict[str, Any]:
+        """
+        Estimate the trend over the years of every analyzed variable.
+
+        Unlike the least-squares slope reported under `temperature`, the
+        Theil-Sen slope is not pulled by a single extreme year, and the
+        Mann-Kendall test tells whether the trend is distinguishable from
+        year-to-year noise.
+
+        Args:
+            df: DataFrame with a 'YEAR' column and one column per variable
+            **kwargs: Additional parameters (unused)
+
+        Returns:
+            Dictionary with the method, significance level and a trend per variable
+        """
+        self.validate_data(df, ['YEAR'])
+
+        years = df['YEAR'].to_numpy(dtype=float)
+        variables = [column for column in df.columns if column not in ('YEAR', 'MO', 'DY', 'HR')]
+        return {
+            "method": "theil_sen_mann_kendall",
+            "significance_level": config.TREND_SIGNIFICANCE_LEVEL,
+            "variables": {
+                column: describe_robust_trend(
+                    years, df[column].to_numpy(dtype=float), config.TREND_SIGNIFICANCE_LEVEL
+                )
+                for column in variables
+            }
+        }
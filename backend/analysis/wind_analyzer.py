@@ -9,6 +9,8 @@ from .base_analyzer import BaseAnalyzer
 class WindAnalyzer(BaseAnalyzer):
     """Analyzer for wind statistics."""
     
+    result_key = "wind"
+    
     @property
     def name(self) -> str:
         return "WindAnalyzer"
@@ -17,10 +17,74 @@ class Config:
     NASA_COMMUNITY: str = os.getenv("NASA_COMMUNITY", "AG")
     NASA_FORMAT: str = os.getenv("NASA_FORMAT", "CSV")
     NASA_TIMEOUT: float = float(os.getenv("NASA_TIMEOUT", "45.0"))
+    NASA_HOURLY_BASE_URL: str = os.getenv("NASA_HOURLY_BASE_URL", "https://power.larc.nasa.gov/api/temporal/hourly/point")
+    # LST (local solar time) or UTC, used for the hours of day of hourly data
+    NASA_HOURLY_TIME_STANDARD: str = os.getenv("NASA_HOURLY_TIME_STANDARD", "LST")
+    # Bytes read from a streamed NASA response per parse step
+    NASA_STREAM_CHUNK_BYTES: int = int(os.getenv("NASA_STREAM_CHUNK_BYTES", "65536"))
+    # Outbound scheduler: token bucket (0 disables the rate limit) and in-flight cap
+    NASA_RATE_LIMIT_PER_SECOND: float = float(os.getenv("NASA_RATE_LIMIT_PER_SECOND", "10"))
+    NASA_RATE_BURST: int = int(os.getenv("NASA_RATE_BURST", "30"))
+    NASA_MAX_CONCURRENT_REQUESTS: int = int(os.getenv("NASA_MAX_CONCURRENT_REQUESTS", "20"))
+    
+    # NASA POWER grid resolution (MERRA-2 meteorology cells, degrees)
+    POWER_CELL_LAT_STEP: float = float(os.getenv("POWER_CELL_LAT_STEP", "0.5"))
+    POWER_CELL_LON_STEP: float = float(os.getenv("POWER_CELL_LON_STEP", "0.625"))
+    
+    # Local Series Store
+    LOCAL_STORE_DIR: str = os.getenv("LOCAL_STORE_DIR", "data/series")
+    LOCAL_STORE_WRITABLE: bool = os.getenv("LOCAL_STORE_WRITABLE", "true").lower() == "true"
+    SERIES_MEMORY_CACHE_SIZE: int = int(os.getenv("SERIES_MEMORY_CACHE_SIZE", "64"))
+
+    # Shared cross-worker cache (SQLite in WAL mode) for series and analyses
+    SHARED_CACHE_PATH: str = os.getenv("SHARED_CACHE_PATH", "data/shared_cache.sqlite3")
+    SHARED_CACHE_MAX_BYTES: int = int(os.getenv("SHARED_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    SHARED_CACHE_TTL_SECONDS: float = float(os.getenv("SHARED_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    # A hit only rewrites the entry's access time once it is at least this old
+    SHARED_CACHE_TOUCH_SECONDS: float = float(os.getenv("SHARED_CACHE_TOUCH_SECONDS", "300"))
+    
+    # Admission control for requests that miss every cache
+    ANALYSIS_MAX_CONCURRENT: int = int(os.getenv("ANALYSIS_MAX_CONCURRENT", "16"))
+    ANALYSIS_MAX_QUEUE: int = int(os.getenv("ANALYSIS_MAX_QUEUE", "32"))
+    ANALYSIS_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("ANALYSIS_QUEUE_TIMEOUT_SECONDS", "5.0"))
+    
+    # Progressive results (Server-Sent Events): first estimate after SSE_MIN_YEARS
+    # years, then at most one update per SSE_UPDATE_INTERVAL_MS
+    SSE_MIN_YEARS: int = int(os.getenv("SSE_MIN_YEARS", "3"))
+    SSE_UPDATE_INTERVAL_MS: float = float(os.getenv("SSE_UPDATE_INTERVAL_MS", "250"))
+    
+    # Rows encoded per chunk by the streaming series export
+    EXPORT_CHUNK_ROWS: int = int(os.getenv("EXPORT_CHUNK_ROWS", "8192"))
+    
+    # Climate Grid Configuration
+    GRID_MAX_CELLS: int = int(os.getenv("GRID_MAX_CELLS", "400"))
+    GRID_FETCH_CONCURRENCY: int = int(os.getenv("GRID_FETCH_CONCURRENCY", "8"))
+    GRID_HOT_THRESHOLD_C: float = float(os.getenv("GRID_HOT_THRESHOLD_C", "30.0"))
+    
+    # Return Periods (GEV fits to annual extremes)
+    RETURN_PERIODS: List[int] = [int(period) for period in os.getenv("RETURN_PERIODS", "10,25,50,100").split(",")]
+    EXTREMES_MIN_DAYS_PER_YEAR: int = int(os.getenv("EXTREMES_MIN_DAYS_PER_YEAR", "330"))
+    
+    # Map Overlay Tiles
+    TILES_DIR: str = os.getenv("TILES_DIR", "data/tiles")
+    TILE_SIZE: int = int(os.getenv("TILE_SIZE", "256"))
+    TILE_MIN_ZOOM: int = int(os.getenv("TILE_MIN_ZOOM", "2"))
+    TILE_MAX_ZOOM: int = int(os.getenv("TILE_MAX_ZOOM", "7"))
+    TILE_CACHE_MAX_AGE: int = int(os.getenv("TILE_CACHE_MAX_AGE", "86400"))
+    
+    # Quantile Sketches
+    SKETCH_COMPRESSION: float = float(os.getenv("SKETCH_COMPRESSION", "200"))
+    # (cell, column) sketch sets kept in memory; a full grid merges two columns per cell
+    SKETCH_MEMORY_CACHE_SIZE: int = int(os.getenv("SKETCH_MEMORY_CACHE_SIZE", str(2 * GRID_MAX_CELLS)))
+    
+    # Climatology Index
+    CLIMATOLOGY_INDEX_DIR: str = os.getenv("CLIMATOLOGY_INDEX_DIR", "data/climatology")
     
     # Data Collection Parameters
     START_YEAR: int = int(os.getenv("START_YEAR", "2000"))
     NASA_PARAMETERS: List[str] = os.getenv("NASA_PARAMETERS", "T2M_MAX,T2M_MIN,T2M,PRECTOTCORR,WS2M,RH2M").split(",")
+    # Hourly data has no daily max/min; those come from the selected hours
+    NASA_HOURLY_PARAMETERS: List[str] = os.getenv("NASA_HOURLY_PARAMETERS", "T2M,PRECTOTCORR,WS2M,RH2M").split(",")
     
     # Analysis Thresholds
     RAIN_THRESHOLD_MM: float = float(os.getenv("RAIN_THRESHOLD_MM", "1.0"))
@@ -29,6 +93,11 @@ class Config:
     PERCENTILE_DRY: int = int(os.getenv("PERCENTILE_DRY", "25"))
     PERCENTILE_HUMID: int = int(os.getenv("PERCENTILE_HUMID", "75"))
     
+    # Bootstrap Confidence Intervals
+    BOOTSTRAP_RESAMPLES: int = int(os.getenv("BOOTSTRAP_RESAMPLES", "2000"))
+    BOOTSTRAP_CONFIDENCE_LEVEL: float = float(os.getenv("BOOTSTRAP_CONFIDENCE_LEVEL", "95"))
+    BOOTSTRAP_SEED: int = int(os.getenv("BOOTSTRAP_SEED", "0"))
+    
     # Data Quality Thresholds
     GOOD_DATA_MIN_YEARS: int = int(os.getenv("GOOD_DATA_MIN_YEARS", "20"))
     LIMITED_DATA_MIN_YEARS: int = int(os.getenv("LIMITED_DATA_MIN_YEARS", "10"))
@@ -43,11 +112,35 @@ class Config:
     # Temperature Trend Thresholds
     TEMP_TREND_STABLE_THRESHOLD: float = float(os.getenv("TEMP_TREND_STABLE_THRESHOLD", "0.01"))
     
+    # Robust Trends (Theil-Sen slope, Mann-Kendall test)
+    TREND_SIGNIFICANCE_LEVEL: float = float(os.getenv("TREND_SIGNIFICANCE_LEVEL", "0.05"))
+    
     # API Configuration
     API_VERSION: str = os.getenv("API_VERSION", "v1")
     API_TITLE: str = os.getenv("API_TITLE", "Climate Analysis API")
     API_DESCRIPTION: str = os.getenv("API_DESCRIPTION", "Provides historical climate analysis for a specific date and location.")
     
+    # Startup Configuration
+    PRELOAD_ANALYSIS_MODULES: bool = os.getenv("PRELOAD_ANALYSIS_MODULES", "true").lower() == "true"
+    STARTUP_IMPORT_BUDGET_MS: float = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "800"))
+    # Semicolon-separated "lat,lon" pairs whose series are prefetched into the store at startup
+    WARM_LOCATIONS: List[str] = [
+        location.strip() for location in os.getenv("WARM_LOCATIONS", "").split(";") if location.strip()
+    ]
+    
+    # Response Encoding Configuration
+    COMPRESSION_MIN_BYTES: int = int(os.getenv("COMPRESSION_MIN_BYTES", "500"))
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "6"))
+    BROTLI_QUALITY: int = int(os.getenv("BROTLI_QUALITY", "5"))
+    
+    # Logging and Tracing
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    # "file" (TRACE_FILE), "stdout" or "none"
+    TRACE_EXPORTER: str = os.getenv("TRACE_EXPORTER", "file")
+    TRACE_FILE: str = os.getenv("TRACE_FILE", "data/traces.jsonl")
+    # Traces are exported when the request took at least this long or failed
+    TRACE_SLOW_MS: float = float(os.getenv("TRACE_SLOW_MS", "1000"))
+    
     # CORS Configuration
     @property
     def CORS_ORIGINS(self) -> List[str]:
@@ -33,6 +33,14 @@ class DataValidationError(DataProcessingError):
     pass
 
 
+class ServiceOverloadedError(ClimateAPIException):
+    """Raised when a request is shed because the service is at capacity."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class ConfigurationError(ClimateAPIException):
     """Raised when there's a configuration error."""
     pass
@@ -1,5 +1,13 @@
-from fastapi import FastAPI, HTTPException, Query
+import asyncio
+import calendar
+import importlib
+from contextlib import asynccontextmanager, nullcontext
+from datetime import datetime
+
+from fastapi import FastAPI, HTTPException, Path, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import MutableHeaders
 
 # Import configuration
 from config import config
@@ -10,21 +18,426 @@ from exceptions import (
     DataSourceError, 
     NASAAPIError,
     InsufficientDataError,
-    DataProcessingError
+    DataProcessingError,
+    DataValidationError,
+    ServiceOverloadedError
 )
 
 # Import services and schemas
-from services.nasa_service import get_historical_data_for_day
-from analysis.statistics import process_and_analyze_data
-from schemas import ClimateAnalysisResponse
+# (the analysis stack pulls in pandas/numpy and is imported lazily, see below)
+from services.nasa_service import (
+    get_historical_data_for_day, get_hourly_data_for_day, iter_historical_data_for_day, years_requested_for_day
+)
+from schemas import (
+    BestDaysResponse, ClimateAnalysisResponse, ClimateGridResponse, ReturnPeriodGridResponse, TrendsResponse
+)
+from responses import encode_response
+from services.admission import analysis_admission
+from services.scheduler import Priority
+from tracing import log, log_exception, set_attributes, span, start_trace
+
+
+def preload_analysis_modules():
+    """Import the analysis stack and instantiate the default analyzers."""
+    from analysis.statistics import get_default_analyzers
+    get_default_analyzers()
+
+
+async def warm_series_store():
+    """Prefetch the series of WARM_LOCATIONS into the store, yielding upstream capacity to user requests."""
+    # Imported off the event loop, as it pulls in numpy
+    store_module = await asyncio.to_thread(importlib.import_module, "services.series_store")
+    for location in config.WARM_LOCATIONS:
+        try:
+            lat, lon = (float(value) for value in location.split(","))
+            cell = store_module.snap_to_cell(lat, lon)
+            await store_module.series_store.get(cell, config.NASA_PARAMETERS, priority=Priority.PREFETCH)
+        except (ValueError, ClimateAPIException) as e:
+            log("WARNING", "Could not warm series store", location=location, error=str(e))
+
+
+def parse_hours(value: str) -> list[int]:
+    """
+    Parse an hours-of-day selection such as "18" , "17,18" or "17-20".
+
+    Raises:
+        DataValidationError: If an hour is not an integer in 0-23
+    """
+    hours = set()
+    for part in (p.strip() for p in value.split(",") if p.strip()):
+        try:
+            first, _, last = part.partition("-")
+            start, end = int(first), int(last or first)
+        except ValueError:
+            raise DataValidationError(f"Invalid hour selection '{part}'.")
+        if not 0 <= start <= end <= 23:
+            raise DataValidationError(f"Hours must be between 0 and 23, got '{part}'.")
+        hours.update(range(start, end + 1))
+    return sorted(hours)
+
+
+async def lookup_cached_analysis(lat: float, lon: float, day: int, month: int, requested_params: list[str],
+                           confidence_intervals: bool, selected_hours: list[int],
+                           trends: bool) -> tuple[dict | None, str]:
+    """
+    Find a finished analysis in the climatology index or the shared cache.
+
+    Default analyses come straight from the climatology index when it covers
+    the cell; any other finished analysis is shared by all workers, per NASA
+    POWER cell, through the shared cache.
+
+    Returns:
+        tuple: The analysis (None on a miss) and its shared-cache key
+    """
+    from services.series_store import snap_to_cell
+    from services.shared_cache import shared_cache
+
+    cell = snap_to_cell(lat, lon)
+    set_attributes(cell=f"{cell.lat:.4f},{cell.lon:.4f}")
+    cache_key = (
+        f"analysis:{cell.lat:.4f},{cell.lon:.4f}:{month:02d}-{day:02d}:{','.join(sorted(requested_params))}:"
+        f"{int(confidence_intervals)}:{','.join(map(str, selected_hours))}:{int(trends)}:{datetime.now().year}"
+    )
+
+    if not requested_params and not confidence_intervals and not selected_hours and not trends:
+        from services.climatology_index import climatology_index
+        record = climatology_index.lookup(lat, lon, month, day)
+        if record is not None:
+            from analysis.climatology import record_to_analysis
+            set_attributes(cache_tier="climatology_index")
+            return record_to_analysis(record, lat, lon), cache_key
+
+    cached = await asyncio.to_thread(shared_cache.get_json, cache_key)
+    if cached is not None:
+        set_attributes(cache_tier="shared_cache")
+        cached["location"] = {"lat": lat, "lon": lon}
+        return cached, cache_key
+
+    set_attributes(cache_tier="upstream")
+    return None, cache_key
+
+
+def nasa_parameters_for(requested_params: list[str]) -> list[str]:
+    """NASA parameters to fetch: the base set plus those behind known additional parameters."""
+    parameters = config.NASA_PARAMETERS.copy()
+    if requested_params:
+        from analysis.additional_parameter_analyzer import PARAMETER_MAP
+        for param in requested_params:
+            if param in PARAMETER_MAP:
+                nasa_param = PARAMETER_MAP[param]['nasa_param']
+                if nasa_param not in parameters:
+                    parameters.append(nasa_param)
+    return parameters
+
+
+async def compute_climate_analysis(lat: float, lon: float, day: int, month: int,
+                                   requested_params: list[str], confidence_intervals: bool,
+                                   selected_hours: list[int], trends: bool = False) -> dict:
+    """
+    Fetch NASA data for a date and run the analyzers on it.
+
+    Args:
+        lat: Latitude
+        lon: Longitude
+        day: Day of the month
+        month: Month of the year
+        requested_params: Additional parameters to analyze
+        confidence_intervals: Whether to add bootstrap confidence intervals
+        selected_hours: Hours of day to restrict the analysis to (empty for daily data)
+        trends: Whether to add robust trends of every variable
+
+    Returns:
+        dict: The analysis result
+    """
+    parameters = nasa_parameters_for(requested_params)
+
+    if selected_hours:
+        parameters = config.NASA_HOURLY_PARAMETERS + [p for p in parameters if p not in config.NASA_PARAMETERS]
+        with span("nasa.fetch_years", hourly=True, parameters=",".join(parameters)) as fetch_span:
+            list_of_series = await get_hourly_data_for_day(lat, lon, parameters, month, day, selected_hours)
+            fetch_span.set_attribute("years_received", len(list_of_series))
+        if not list_of_series:
+            raise InsufficientDataError("No hourly data found for this location/date.")
+
+        from analysis.statistics import process_and_analyze_hourly_data
+        with span("analysis"):
+            analysis_result = await asyncio.to_thread(
+                process_and_analyze_hourly_data,
+                list_of_series, lat, lon, selected_hours,
+                additional_parameters=requested_params,
+                confidence_intervals=confidence_intervals,
+                trends=trends
+            )
+    else:
+        from services.series_store import day_rows, series_store, snap_to_cell
+
+        # 1. Use the cell's stored series when it has the base parameters through the last
+        # complete year (fetching only missing additional columns), or else call the
+        # service to fetch NASA data
+        cell = snap_to_cell(lat, lon)
+        loaded = await series_store.lookup(cell)
+        if series_store.is_complete(loaded[0], config.NASA_PARAMETERS):
+            series = await series_store.get(cell, parameters, loaded=loaded)
+            rows = day_rows(series, month, day, parameters)
+            list_of_series = [rows] if len(rows["YEAR"]) else []
+        else:
+            with span("nasa.fetch_years", hourly=False, parameters=",".join(parameters)) as fetch_span:
+                list_of_series = await get_historical_data_for_day(
+                    lat, lon, parameters, month, day
+                )
+                fetch_span.set_attribute("years_received", len(list_of_series))
+
+        if not list_of_series:
+            raise InsufficientDataError("No historical data found for this location/date.")
+
+        # 2. Call the analysis module to process the data
+        from analysis.statistics import process_and_analyze_data
+        with span("analysis"):
+            analysis_result = await asyncio.to_thread(
+                process_and_analyze_data,
+                list_of_series, lat, lon,
+                additional_parameters=requested_params,
+                confidence_intervals=confidence_intervals,
+                trends=trends
+            )
+
+    if "error" in analysis_result:
+        raise DataProcessingError(analysis_result["error"])
+    return analysis_result
+
+
+async def load_cell(cell, parameters: list[str], priority: Priority = Priority.INTERACTIVE):
+    """
+    Load or fetch one cell's full daily series.
+
+    The cell is read from the store once; admission control applies only
+    when some of the parameters must be fetched upstream.
+
+    Args:
+        cell: NASA POWER cell
+        parameters: NASA parameter names the series must hold
+        priority: Priority class of an upstream fetch
+
+    Returns:
+        dict: The cell's series
+    """
+    from services.series_store import series_store
+
+    loaded = await series_store.lookup(cell)
+    if series_store.is_complete(loaded[0], parameters):
+        return await series_store.get(cell, parameters, loaded=loaded)
+    async with analysis_admission.admit():
+        return await series_store.get(cell, parameters, priority=priority, loaded=loaded)
+
+
+async def load_cell_series(cells: list) -> list:
+    """
+    Load or fetch the full daily series of many cells under a concurrency cap.
+
+    Admission control applies only when some cell must be fetched upstream,
+    and upstream fetches run at batch priority, behind single-point requests.
+
+    Args:
+        cells: NASA POWER cells
+
+    Returns:
+        list: Series per cell, None where it could not be loaded
+    """
+    from services.series_store import series_store
+
+    semaphore = asyncio.Semaphore(config.GRID_FETCH_CONCURRENCY)
+    loaded = await asyncio.gather(*(series_store.lookup(cell) for cell in cells))
+    all_stored = all(series_store.is_complete(series, config.NASA_PARAMETERS) for series, _ in loaded)
+    async with nullcontext() if all_stored else analysis_admission.admit():
+        results = await asyncio.gather(
+            *(series_store.get(cell, config.NASA_PARAMETERS, semaphore, Priority.BATCH, loaded=cell_loaded)
+              for cell, cell_loaded in zip(cells, loaded)),
+            return_exceptions=True
+        )
+    cell_series = []
+    for cell, result in zip(cells, results):
+        if isinstance(result, Exception):
+            log("WARNING", "Could not load series for cell", cell=f"{cell.lat},{cell.lon}", error=str(result))
+            cell_series.append(None)
+        else:
+            cell_series.append(result)
+    return cell_series
+
+
+def sse_event(event: str, payload: dict) -> bytes:
+    """Encode one Server-Sent Event with a JSON payload."""
+    from responses import encode_json
+    return f"event: {event}\ndata: ".encode() + encode_json(payload) + b"\n\n"
+
+
+async def stream_climate_analysis(lat: float, lon: float, day: int, month: int, requested_params: list[str],
+                                  confidence_intervals: bool, trends: bool):
+    """
+    Yield Server-Sent Events with estimates that improve as yearly NASA responses arrive.
+
+    `partial` events rerun the default analyzers (and additional parameters)
+    on the years received so far, after SSE_MIN_YEARS years and at most every
+    SSE_UPDATE_INTERVAL_MS. The `complete` event carries the same result as
+    /v1/climate-analysis; failures end the stream with an `error` event.
+    Cached analyses and cells in the series store get only the `complete` event.
+    """
+    with span("climate-analysis stream", lat=lat, lon=lon):
+        try:
+            cached, cache_key = await lookup_cached_analysis(
+                lat, lon, day, month, requested_params, confidence_intervals, [], trends
+            )
+            if cached is not None:
+                years = cached["analysis_period"]["total_years_analyzed"]
+                yield sse_event("complete", {"years_received": years, "years_requested": years, "analysis": cached})
+                return
+
+            from services.series_store import series_store, snap_to_cell
+            from services.shared_cache import shared_cache
+
+            stored, _ = await series_store.lookup(snap_to_cell(lat, lon))
+            if series_store.is_complete(stored, config.NASA_PARAMETERS):
+                # The stored series answers at once (at most one column fetch), so skip the estimates
+                async with analysis_admission.admit():
+                    analysis_result = await compute_climate_analysis(
+                        lat, lon, day, month, requested_params, confidence_intervals, [], trends
+                    )
+                await asyncio.to_thread(shared_cache.set_json, cache_key, analysis_result)
+                years = analysis_result["analysis_period"]["total_years_analyzed"]
+                yield sse_event("complete", {
+                    "years_received": years, "years_requested": years, "analysis": analysis_result
+                })
+                return
+
+            parameters = nasa_parameters_for(requested_params)
+            years_requested = years_requested_for_day()
+            years_received = 0
+            list_of_series = []
+            last_update = 0.0
+
+            async with analysis_admission.admit():
+                from analysis.statistics import process_and_analyze_data
+
+                with span("nasa.fetch_years", hourly=False, parameters=",".join(parameters),
+                          progressive=True) as fetch_span:
+                    async for series in iter_historical_data_for_day(lat, lon, parameters, month, day):
+                        years_received += 1
+                        if series:
+                            list_of_series.append(series)
+                        now = asyncio.get_running_loop().time()
+                        due = 1000 * (now - last_update) >= config.SSE_UPDATE_INTERVAL_MS
+                        if (len(list_of_series) >= config.SSE_MIN_YEARS and due
+                                and years_received < years_requested):
+                            with span("analysis.partial", years=len(list_of_series)):
+                                partial = await asyncio.to_thread(
+                                    process_and_analyze_data,
+                                    list_of_series, lat, lon, additional_parameters=requested_params
+                                )
+                            if "error" not in partial:
+                                last_update = now
+                                yield sse_event("partial", {
+                                    "years_received": years_received,
+                                    "years_requested": years_requested,
+                                    "analysis": partial,
+                                })
+                    fetch_span.set_attribute("years_received", len(list_of_series))
+
+                if not list_of_series:
+                    raise InsufficientDataError("No historical data found for this location/date.")
+                with span("analysis"):
+                    analysis_result = await asyncio.to_thread(
+                        process_and_analyze_data,
+                        list_of_series, lat, lon,
+                        additional_parameters=requested_params,
+                        confidence_intervals=confidence_intervals,
+                        trends=trends
+                    )
+                if "error" in analysis_result:
+                    raise DataProcessingError(analysis_result["error"])
+
+            await asyncio.to_thread(shared_cache.set_json, cache_key, analysis_result)
+            yield sse_event("complete", {
+                "years_received": years_received,
+                "years_requested": years_requested,
+                "analysis": analysis_result,
+            })
+
+        except ServiceOverloadedError as e:
+            yield sse_event("error", {"status": 503, "detail": str(e)})
+
+        except InsufficientDataError as e:
+            yield sse_event("error", {"status": 404, "detail": str(e)})
+
+        except DataSourceError as e:
+            yield sse_event("error", {"status": 502, "detail": f"External API error: {str(e)}"})
+
+        except DataProcessingError as e:
+            yield sse_event("error", {"status": 422, "detail": f"Data processing error: {str(e)}"})
+
+        except ClimateAPIException as e:
+            yield sse_event("error", {"status": 500, "detail": f"Internal error: {str(e)}"})
+
+        except Exception as e:
+            # Log unexpected errors
+            log_exception("Unexpected error occurred in stream endpoint", e)
+            yield sse_event("error", {"status": 500, "detail": "Internal server error occurred."})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm heavy modules and the series store in the background without delaying readiness."""
+    if config.PRELOAD_ANALYSIS_MODULES:
+        asyncio.get_running_loop().run_in_executor(None, preload_analysis_modules)
+    warm_task = asyncio.create_task(warm_series_store()) if config.WARM_LOCATIONS else None
+    yield
+    if warm_task is not None:
+        warm_task.cancel()
+
 
 # Create FastAPI app with versioning
 app = FastAPI(
     title=config.API_TITLE,
     description=config.API_DESCRIPTION,
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+class TraceRequestsMiddleware:
+    """
+    Open a root span per request and return its trace ID in the traceparent header.
+
+    A pure ASGI middleware, so the span only ends once the response body has
+    been sent and covers streamed responses (series export, SSE) in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        with start_trace(
+            f"{request.method} {request.url.path}",
+            request.headers.get("traceparent"),
+            **{"http.method": request.method, "http.target": str(request.url.path), "http.query": request.url.query}
+        ) as root:
+            async def send_traced(message):
+                if message["type"] == "http.response.start":
+                    root.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        root.status = "ERROR"
+                        root.trace.failed = True
+                    MutableHeaders(scope=message).append("traceparent", root.traceparent())
+                await send(message)
+
+            await self.app(scope, receive, send_traced)
+
+
+app.add_middleware(TraceRequestsMiddleware)
+
+
 # --- CORS Middleware ---
 app.add_middleware(
     CORSMiddleware,
@@ -42,9 +455,23 @@ async def health_check():
     return {"status": "healthy", "version": config.API_VERSION}
 
 
+@app.get("/metrics/outbound")
+async def outbound_metrics():
+    """Queue depths, rate limit state and wait times of the NASA POWER scheduler."""
+    from services.scheduler import outbound_scheduler
+    return outbound_scheduler.metrics()
+
+
+@app.get("/metrics/admission")
+async def admission_metrics():
+    """Active, waiting, admitted and rejected requests of the analysis endpoints."""
+    return analysis_admission.metrics()
+
+
 # V1 API Routes
 @app.get(f"/{config.API_VERSION}/climate-analysis", response_model=ClimateAnalysisResponse)
 async def get_climate_analysis(
+        request: Request,
         lat: float = Query(..., description="Latitude", example=-9.665),
         lon: float = Query(..., description="Longitude", example=-35.735),
         day: int = Query(..., ge=1, le=31, description="Day of the month", example=4),
@@ -53,6 +480,19 @@ async def get_climate_analysis(
             "", 
             description="Comma-separated list of additional parameters to analyze",
             example="solar_radiation,cloud_cover"
+        ),
+        confidence_intervals: bool = Query(
+            False,
+            description="Include bootstrap confidence intervals for the reported probabilities"
+        ),
+        hours: str = Query(
+            "",
+            description="Restrict the analysis to hours of day (local solar time), e.g. '18' or '17-20'",
+            example="18-20"
+        ),
+        trends: bool = Query(
+            False,
+            description="Include Theil-Sen trends and Mann-Kendall significance of every variable"
         )
 ):
     """
@@ -61,71 +501,623 @@ async def get_climate_analysis(
     This endpoint analyzes historical climate data for a specific date and location,
     providing probabilities and statistics for rain, temperature, humidity, and wind.
     Optionally includes analysis of multiple additional parameters.
+    
+    With `hours`, hourly NASA POWER data is streamed instead of daily data and
+    only the selected hours of each year are kept and analyzed.
+    
+    With `trends`, a `trends` section reports the Theil-Sen slope (per year)
+    and Mann-Kendall test of every analyzed variable over the years.
+    
+    The response honours content negotiation: `Accept: application/msgpack`
+    returns MessagePack instead of JSON, and `Accept-Encoding` enables
+    brotli or gzip compression.
     """
     try:
-        # Determine which parameters to fetch from NASA
-        parameters = config.NASA_PARAMETERS.copy()
-        
         # Parse additional parameters
         requested_params = []
         if additional_parameters:
             requested_params = [p.strip() for p in additional_parameters.split(',') if p.strip()]
         
-        # Add additional parameters if requested
+        selected_hours = parse_hours(hours) if hours else []
+        
+        cached, cache_key = await lookup_cached_analysis(
+            lat, lon, day, month, requested_params, confidence_intervals, selected_hours, trends
+        )
+        if cached is not None:
+            return encode_response(request, cached)
+        
+        # Cache misses fetch upstream, limited by admission control
+        async with analysis_admission.admit():
+            analysis_result = await compute_climate_analysis(
+                lat, lon, day, month, requested_params, confidence_intervals, selected_hours, trends
+            )
+        from services.shared_cache import shared_cache
+        await asyncio.to_thread(shared_cache.set_json, cache_key, analysis_result)
+
+        # Return the encoded result (skips a second response_model validation pass)
+        return encode_response(request, analysis_result)
+
+    except ServiceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    except InsufficientDataError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    except DataSourceError as e:
+        raise HTTPException(status_code=502, detail=f"External API error: {str(e)}")
+    
+    except DataProcessingError as e:
+        raise HTTPException(status_code=422, detail=f"Data processing error: {str(e)}")
+    
+    except ClimateAPIException as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+    
+    except Exception as e:
+        # Log unexpected errors
+        log_exception("Unexpected error occurred in endpoint", e)
+        raise HTTPException(status_code=500, detail="Internal server error occurred.")
+
+
+@app.get(f"/{config.API_VERSION}/climate-analysis/stream")
+async def get_climate_analysis_stream(
+        request: Request,
+        lat: float = Query(..., description="Latitude", example=-9.665),
+        lon: float = Query(..., description="Longitude", example=-35.735),
+        day: int = Query(..., ge=1, le=31, description="Day of the month", example=4),
+        month: int = Query(..., ge=1, le=12, description="Month of the year", example=10),
+        additional_parameters: str = Query(
+            "",
+            description="Comma-separated list of additional parameters to analyze",
+            example="solar_radiation,cloud_cover"
+        ),
+        confidence_intervals: bool = Query(
+            False,
+            description="Include bootstrap confidence intervals in the complete result"
+        ),
+        trends: bool = Query(
+            False,
+            description="Include Theil-Sen trends and Mann-Kendall significance in the complete result"
+        )
+):
+    """
+    Progressive variant of /v1/climate-analysis, as Server-Sent Events.
+
+    Yearly NASA responses are processed as they arrive. `partial` events carry
+    the default analysis of the years received so far, together with
+    `years_received` and `years_requested`, and the `complete` event carries the
+    final result. Cached analyses are sent as a single `complete` event. Errors
+    end the stream with an `error` event holding the HTTP status the regular
+    endpoint would return.
+    """
+    requested_params = [p.strip() for p in additional_parameters.split(',') if p.strip()]
+    return StreamingResponse(
+        stream_climate_analysis(lat, lon, day, month, requested_params, confidence_intervals, trends),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get(f"/{config.API_VERSION}/climate-grid", response_model=ClimateGridResponse)
+async def get_climate_grid(
+        request: Request,
+        min_lat: float = Query(..., ge=-90, le=90, description="Southern edge of the bounding box", example=-10.5),
+        min_lon: float = Query(..., ge=-180, le=180, description="Western edge of the bounding box", example=-37.0),
+        max_lat: float = Query(..., ge=-90, le=90, description="Northern edge of the bounding box", example=-8.5),
+        max_lon: float = Query(..., ge=-180, le=180, description="Eastern edge of the bounding box", example=-35.0),
+        day: int = Query(..., ge=1, le=31, description="Day of the month", example=4),
+        month: int = Query(..., ge=1, le=12, description="Month of the year", example=10),
+        hot_threshold_c: float = Query(
+            config.GRID_HOT_THRESHOLD_C,
+            description="Maximum temperature above which a day counts as hot (°C)"
+        ),
+        percentile_window_days: int = Query(
+            7, ge=0, le=45,
+            description="Days on each side of the date pooled into the regional percentiles"
+        )
+):
+    """
+    Probability grid over every NASA POWER cell inside a bounding box.
+
+    Each cell's full daily series is read from the local store or fetched
+    concurrently (at most GRID_FETCH_CONCURRENCY requests at a time), and the
+    rain/temperature probabilities for the requested date are computed for all
+    cells in one vectorized pass. Cells without data are returned as null.
+
+    Regional percentiles over the whole box and a window of days are merged
+    from per-cell, per-day quantile sketches stored alongside the series.
+    """
+    try:
+        if min_lat > max_lat or min_lon > max_lon:
+            raise DataValidationError("Bounding box minimums must not exceed its maximums.")
+
+        from services.series_store import Cell, cells_in_bbox, series_store
+        from analysis.grid import (
+            compute_grid_probabilities, grid_to_lists, regional_percentiles, window_day_slots
+        )
+
+        lats, lons = cells_in_bbox(min_lat, min_lon, max_lat, max_lon)
+        if len(lats) * len(lons) > config.GRID_MAX_CELLS:
+            raise DataValidationError(
+                f"Bounding box covers {len(lats) * len(lons)} cells; the limit is {config.GRID_MAX_CELLS}."
+            )
+
+        # 1. Load or fetch every cell's series
+        cells = [Cell(float(lat), float(lon)) for lat in lats for lon in lons]
+        cell_series = await load_cell_series(cells)
+        if all(series is None for series in cell_series):
+            raise InsufficientDataError("No historical data found for any cell in this bounding box.")
+
+        # 2. Compute all cells at once
+        start_year = config.START_YEAR
+        end_year = max(int(series["YEAR"].max()) for series in cell_series if series is not None)
+        grid = compute_grid_probabilities(
+            cell_series, (len(lats), len(lons)), month, day, start_year, end_year,
+            config.RAIN_THRESHOLD_MM, hot_threshold_c
+        )
+
+        # 3. Merge per-day sketches over the box and the day window (off the event
+        # loop: cold cells build and persist their sketches)
+        slots = window_day_slots(month, day, percentile_window_days)
+        cells_with_series = [(cell, series) for cell, series in zip(cells, cell_series) if series is not None]
+
+        def merge_sketches(column: str) -> dict:
+            return regional_percentiles(
+                [series_store.day_sketches(cell, series, column) for cell, series in cells_with_series],
+                slots, [10, 25, 50, 75, 90], config.SKETCH_COMPRESSION
+            )
+
+        distribution = {"window_days": percentile_window_days}
+        for name, column in (("max_temp_c", "T2M_MAX"), ("precipitation_mm", "PRECTOTCORR")):
+            with span("grid.percentiles", column=column, cells=len(cells_with_series)):
+                distribution[name] = await asyncio.to_thread(merge_sketches, column)
+
+        return encode_response(request, {
+            "bbox": {"min_lat": min_lat, "min_lon": min_lon, "max_lat": max_lat, "max_lon": max_lon},
+            "day": day,
+            "month": month,
+            "analysis_period": {
+                "start_year": start_year,
+                "end_year": end_year,
+                "total_years_analyzed": end_year - start_year + 1,
+            },
+            "rain_threshold_mm": config.RAIN_THRESHOLD_MM,
+            "hot_threshold_c": hot_threshold_c,
+            "lats": lats.tolist(),
+            "lons": lons.tolist(),
+            "cells_with_data": sum(series is not None for series in cell_series),
+            "rain_probability_percent": grid_to_lists(grid["rain_probability_percent"]),
+            "hot_probability_percent": grid_to_lists(grid["hot_probability_percent"]),
+            "avg_max_temp_c": grid_to_lists(grid["avg_max_temp_c"]),
+            "years_analyzed": grid["years_analyzed"].tolist(),
+            "regional_percentiles": distribution,
+        })
+
+    except ServiceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    except InsufficientDataError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    except DataProcessingError as e:
+        raise HTTPException(status_code=422, detail=f"Data processing error: {str(e)}")
+
+    except ClimateAPIException as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+
+    except Exception as e:
+        # Log unexpected errors
+        log_exception("Unexpected error occurred in grid endpoint", e)
+        raise HTTPException(status_code=500, detail="Internal server error occurred.")
+
+
+@app.get(f"/{config.API_VERSION}/return-periods", response_model=ReturnPeriodGridResponse)
+async def get_return_periods(
+        request: Request,
+        min_lat: float = Query(..., ge=-90, le=90, description="Southern edge of the bounding box", example=-10.5),
+        min_lon: float = Query(..., ge=-180, le=180, description="Western edge of the bounding box", example=-37.0),
+        max_lat: float = Query(..., ge=-90, le=90, description="Northern edge of the bounding box", example=-8.5),
+        max_lon: float = Query(..., ge=-180, le=180, description="Eastern edge of the bounding box", example=-35.0),
+        return_periods: str = Query(
+            ",".join(map(str, config.RETURN_PERIODS)),
+            description="Comma-separated return periods in years",
+            example="10,50,100"
+        )
+):
+    """
+    "1-in-N-year" rainfall, heat and cold levels for every cell in a bounding box.
+
+    A GEV distribution is fitted with L-moments to each cell's annual extremes
+    (wettest day, hottest day, coldest night), for all cells and variables in
+    one vectorized pass. A single location is a bounding box of one cell.
+    Cells with fewer than LIMITED_DATA_MIN_YEARS complete years are null.
+    """
+    try:
+        if min_lat > max_lat or min_lon > max_lon:
+            raise DataValidationError("Bounding box minimums must not exceed its maximums.")
+        try:
+            periods = sorted({int(period) for period in return_periods.split(",") if period.strip()})
+        except ValueError:
+            raise DataValidationError(f"Invalid return periods '{return_periods}'.")
+        if not periods or periods[0] < 2:
+            raise DataValidationError("Return periods must be whole numbers of years, at least 2.")
+
+        from services.series_store import Cell, cells_in_bbox
+        from analysis.extremes import return_level_grids
+        from analysis.grid import grid_to_lists
+
+        lats, lons = cells_in_bbox(min_lat, min_lon, max_lat, max_lon)
+        if len(lats) * len(lons) > config.GRID_MAX_CELLS:
+            raise DataValidationError(
+                f"Bounding box covers {len(lats) * len(lons)} cells; the limit is {config.GRID_MAX_CELLS}."
+            )
+
+        cells = [Cell(float(lat), float(lon)) for lat in lats for lon in lons]
+        cell_series = await load_cell_series(cells)
+        if all(series is None for series in cell_series):
+            raise InsufficientDataError("No historical data found for any cell in this bounding box.")
+
+        start_year = config.START_YEAR
+        end_year = max(int(series["YEAR"].max()) for series in cell_series if series is not None)
+        # Fitting every cell takes a moment; keep the event loop free meanwhile
+        fits = await asyncio.to_thread(
+            return_level_grids, cell_series, start_year, end_year, periods,
+            config.LIMITED_DATA_MIN_YEARS, config.EXTREMES_MIN_DAYS_PER_YEAR
+        )
+
+        shape = (len(lats), len(lons))
+        variables = {}
+        for name, fit in fits.items():
+            variables[name] = {
+                "years_analyzed": fit["years"].reshape(shape).tolist(),
+                "gev_shape": grid_to_lists(fit["shape"].reshape(shape), 4),
+                "levels": {
+                    str(period): grid_to_lists(fit["levels"][:, i].reshape(shape))
+                    for i, period in enumerate(periods)
+                },
+            }
+
+        return encode_response(request, {
+            "bbox": {"min_lat": min_lat, "min_lon": min_lon, "max_lat": max_lat, "max_lon": max_lon},
+            "analysis_period": {
+                "start_year": start_year,
+                "end_year": end_year,
+                "total_years_analyzed": end_year - start_year + 1,
+            },
+            "return_periods": periods,
+            "lats": lats.tolist(),
+            "lons": lons.tolist(),
+            "cells_with_data": sum(series is not None for series in cell_series),
+            "variables": variables,
+        })
+
+    except ServiceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    except InsufficientDataError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    except DataProcessingError as e:
+        raise HTTPException(status_code=422, detail=f"Data processing error: {str(e)}")
+
+    except ClimateAPIException as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+
+    except Exception as e:
+        # Log unexpected errors
+        log_exception("Unexpected error occurred in return-periods endpoint", e)
+        raise HTTPException(status_code=500, detail="Internal server error occurred.")
+
+
+@app.get(f"/{config.API_VERSION}/best-days", response_model=BestDaysResponse)
+async def get_best_days(
+        request: Request,
+        lat: float = Query(..., ge=-90, le=90, description="Latitude", example=-9.665),
+        lon: float = Query(..., ge=-180, le=180, description="Longitude", example=-35.735),
+        start_month: int = Query(1, ge=1, le=12, description="Month of the first candidate day"),
+        start_day: int = Query(1, ge=1, le=31, description="Day of the first candidate day"),
+        end_month: int = Query(12, ge=1, le=12, description="Month of the last candidate day"),
+        end_day: int = Query(31, ge=1, le=31, description="Day of the last candidate day"),
+        ideal_temperature: float = Query(25, description="Ideal average temperature (°C)"),
+        ideal_rain: float = Query(0, ge=0, description="Ideal precipitation (mm/day)"),
+        ideal_wind_speed: float = Query(5, ge=0, description="Ideal wind speed (m/s)"),
+        ideal_humidity: float = Query(60, ge=0, le=100, description="Ideal relative humidity (%)"),
+        top_n: int = Query(10, ge=1, le=50, description="Number of days to return")
+):
+    """
+    Rank every calendar day in a range by how well it matches the preferences.
+
+    The location's full daily series is loaded once (from the series store or
+    a single NASA POWER request) and all candidate days are scored together.
+    Each day's score (0-100) averages, over the years, how close temperature,
+    precipitation, wind and humidity were to the ideals. The range may wrap
+    around the new year (e.g. December 15 to January 15).
+    """
+    try:
+        from services.series_store import snap_to_cell
+        from analysis.best_days import candidate_slots, rank_days
+
+        for month, day in ((start_month, start_day), (end_month, end_day)):
+            if day > calendar.monthrange(2000, month)[1]:
+                raise DataValidationError(f"Invalid calendar day {month}/{day}.")
+
+        cell = snap_to_cell(lat, lon)
+        series = await load_cell(cell, config.NASA_PARAMETERS)
+
+        ideals = {
+            "temperature": ideal_temperature,
+            "rain": ideal_rain,
+            "wind_speed": ideal_wind_speed,
+            "humidity": ideal_humidity,
+        }
+        slots = candidate_slots(start_month, start_day, end_month, end_day)
+        start_year = config.START_YEAR
+        end_year = int(series["YEAR"].max())
+        days = rank_days(series, ideals, slots, start_year, end_year, top_n)
+        if not days:
+            raise InsufficientDataError("Not enough historical data to rank days for this location.")
+
+        return encode_response(request, {
+            "location": {"lat": lat, "lon": lon},
+            "analysis_period": {
+                "start_year": start_year,
+                "end_year": end_year,
+                "total_years_analyzed": end_year - start_year + 1,
+            },
+            "preferences": ideals,
+            "candidate_days": len(slots),
+            "days": days,
+        })
+
+    except ServiceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    except InsufficientDataError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    except DataSourceError as e:
+        raise HTTPException(status_code=502, detail=f"External API error: {str(e)}")
+
+    except DataProcessingError as e:
+        raise HTTPException(status_code=422, detail=f"Data processing error: {str(e)}")
+
+    except ClimateAPIException as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+
+    except Exception as e:
+        # Log unexpected errors
+        log_exception("Unexpected error occurred in best-days endpoint", e)
+        raise HTTPException(status_code=500, detail="Internal server error occurred.")
+
+
+@app.get(f"/{config.API_VERSION}/trends", response_model=TrendsResponse)
+async def get_trends(
+        request: Request,
+        lat: float = Query(..., ge=-90, le=90, description="Latitude", example=-9.665),
+        lon: float = Query(..., ge=-180, le=180, description="Longitude", example=-35.735),
+        month: int | None = Query(None, ge=1, le=12, description="Month of the day to center the window on"),
+        day: int | None = Query(None, ge=1, le=31, description="Day to center the window on"),
+        window_days: int = Query(7, ge=0, le=60, description="Days on each side of the date to include"),
+        start_year: int = Query(config.START_YEAR, description="First year to include"),
+        end_year: int | None = Query(None, description="Last year to include (default: last year)"),
+        additional_parameters: str = Query(
+            "",
+            description="Comma-separated list of additional parameters to include",
+            example="solar_radiation,cloud_cover"
+        )
+):
+    """
+    Robust trends of every variable over a location's full daily series.
+
+    Every daily day-of-year anomaly is a sample of the Theil-Sen slope (per
+    year): the whole year by default, or the days within ±window_days of
+    `month`/`day`. The Mann-Kendall test runs on the yearly mean anomalies, as
+    daily values are autocorrelated. Both are computed in O(n log n), so
+    decades of daily data are handled in one request.
+    """
+    try:
+        from services.series_store import snap_to_cell
+        from analysis.grid import window_day_slots
+        from analysis.statistics import COLUMN_NAMES
+        from analysis.trend import series_trends
+
+        if (month is None) != (day is None):
+            raise DataValidationError("Provide both month and day, or neither.")
+        if month is not None and day > calendar.monthrange(2000, month)[1]:
+            raise DataValidationError(f"Invalid calendar day {month}/{day}.")
+        if end_year is None:
+            end_year = datetime.now().year - 1
+
+        parameters = config.NASA_PARAMETERS.copy()
+        requested_params = [p.strip() for p in additional_parameters.split(',') if p.strip()]
         if requested_params:
             from analysis.additional_parameter_analyzer import PARAMETER_MAP
             for param in requested_params:
-                if param in PARAMETER_MAP:
-                    nasa_param = PARAMETER_MAP[param]['nasa_param']
-                    if nasa_param not in parameters:
-                        parameters.append(nasa_param)
-        
-        # 1. Call the service to fetch NASA data
-        list_of_csvs = await get_historical_data_for_day(
-            lat, lon, parameters, month, day
+                if param not in PARAMETER_MAP:
+                    raise DataValidationError(f"Unknown parameter '{param}'.")
+                if PARAMETER_MAP[param]['nasa_param'] not in parameters:
+                    parameters.append(PARAMETER_MAP[param]['nasa_param'])
+
+        cell = snap_to_cell(lat, lon)
+        series = await load_cell(cell, parameters)
+
+        slots = window_day_slots(month, day, window_days) if month is not None else None
+        # Decades of daily values take a moment; keep the event loop free meanwhile
+        trends = await asyncio.to_thread(
+            series_trends, series, parameters, start_year, end_year, slots, config.TREND_SIGNIFICANCE_LEVEL
         )
+        if all(trend["slope_per_year"] is None for trend in trends.values()):
+            raise InsufficientDataError("Not enough stored values in the requested period to estimate trends.")
 
-        if not list_of_csvs:
-            raise InsufficientDataError("No historical data found for this location/date.")
+        return encode_response(request, {
+            "location": {"lat": lat, "lon": lon},
+            "analysis_period": {
+                "start_year": start_year,
+                "end_year": end_year,
+                "total_years_analyzed": end_year - start_year + 1,
+            },
+            "month": month,
+            "day": day,
+            "window_days": window_days if month is not None else None,
+            "trends": {
+                "method": "theil_sen_mann_kendall",
+                "significance_level": config.TREND_SIGNIFICANCE_LEVEL,
+                "variables": {COLUMN_NAMES.get(column, column): trend for column, trend in trends.items()},
+            },
+        })
 
-        # 2. Call the analysis module to process the data
-        analysis_result = process_and_analyze_data(
-            list_of_csvs, lat, lon, additional_parameters=requested_params
+    except ServiceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    except InsufficientDataError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    except DataSourceError as e:
+        raise HTTPException(status_code=502, detail=f"External API error: {str(e)}")
+
+    except DataProcessingError as e:
+        raise HTTPException(status_code=422, detail=f"Data processing error: {str(e)}")
+
+    except ClimateAPIException as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+
+    except Exception as e:
+        # Log unexpected errors
+        log_exception("Unexpected error occurred in trends endpoint", e)
+        raise HTTPException(status_code=500, detail="Internal server error occurred.")
+
+
+@app.get(f"/{config.API_VERSION}/series")
+async def get_series(
+        lat: float = Query(..., ge=-90, le=90, description="Latitude", example=-9.665),
+        lon: float = Query(..., ge=-180, le=180, description="Longitude", example=-35.735),
+        format: str = Query("csv", pattern="^(csv|arrow)$", description="csv or arrow (Arrow IPC stream)"),
+        start_year: int = Query(config.START_YEAR, description="First year to export"),
+        end_year: int | None = Query(None, description="Last year to export (default: last year)"),
+        month: int | None = Query(None, ge=1, le=12, description="Only export days of this month"),
+        day: int | None = Query(None, ge=1, le=31, description="Only export this day of the month"),
+        additional_parameters: str = Query(
+            "",
+            description="Comma-separated list of additional parameters to include",
+            example="solar_radiation,cloud_cover"
+        )
+):
+    """
+    Export the cleaned daily values of a location's NASA POWER cell.
+
+    Values are streamed in chunks straight from the cell's cached arrays, as
+    CSV or as an Arrow IPC stream (int16 dates, float32 values, nulls for
+    missing data). With `month` and `day`, only that calendar day is exported
+    for every year, i.e. the per-year values behind an analysis.
+    """
+    try:
+        from services.series_store import snap_to_cell
+        from services.series_export import (
+            ARROW_MEDIA_TYPE, CSV_MEDIA_TYPE, iter_arrow, iter_csv, pyarrow, select_rows
         )
 
-        if "error" in analysis_result:
-            raise DataProcessingError(analysis_result["error"])
+        if format == "arrow" and pyarrow is None:
+            raise DataValidationError("Arrow export is not available on this server; use format=csv.")
+
+        parameters = config.NASA_PARAMETERS.copy()
+        requested_params = [p.strip() for p in additional_parameters.split(',') if p.strip()]
+        if requested_params:
+            from analysis.additional_parameter_analyzer import PARAMETER_MAP
+            for param in requested_params:
+                if param not in PARAMETER_MAP:
+                    raise DataValidationError(f"Unknown parameter '{param}'.")
+                if PARAMETER_MAP[param]['nasa_param'] not in parameters:
+                    parameters.append(PARAMETER_MAP[param]['nasa_param'])
+
+        cell = snap_to_cell(lat, lon)
+        series = await load_cell(cell, parameters, Priority.BATCH)
+
+        if end_year is None:
+            end_year = datetime.now().year - 1
+        rows = select_rows(series, start_year, end_year, month, day)
+        if len(rows) == 0:
+            raise InsufficientDataError("No stored values match the requested period.")
+
+        columns = ["YEAR", "MO", "DY"] + parameters
+        file_name = f"series_{cell.lat:.4f}_{cell.lon:.4f}.{'arrow' if format == 'arrow' else 'csv'}"
+        return StreamingResponse(
+            iter_arrow(series, columns, rows) if format == "arrow" else iter_csv(series, columns, rows),
+            media_type=ARROW_MEDIA_TYPE if format == "arrow" else CSV_MEDIA_TYPE,
+            headers={"Content-Disposition": f'attachment; filename="{file_name}"'}
+        )
 
-        # 3. Return the result
-        return analysis_result
+    except ServiceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
 
     except InsufficientDataError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    
-    except NASAAPIError as e:
+
+    except DataSourceError as e:
         raise HTTPException(status_code=502, detail=f"External API error: {str(e)}")
-    
+
     except DataProcessingError as e:
         raise HTTPException(status_code=422, detail=f"Data processing error: {str(e)}")
-    
+
     except ClimateAPIException as e:
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
-    
+
     except Exception as e:
         # Log unexpected errors
-        print(f"Unexpected error occurred in endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        log_exception("Unexpected error occurred in series endpoint", e)
         raise HTTPException(status_code=500, detail="Internal server error occurred.")
 
 
+@app.get(f"/{config.API_VERSION}/tiles")
+async def get_tiles_metadata():
+    """Describe the precomputed overlay tiles: layers, legends, zoom range and bounds."""
+    import os
+    from services.tiles import METADATA_FILE
+
+    metadata_path = os.path.join(config.TILES_DIR, METADATA_FILE)
+    if not os.path.exists(metadata_path):
+        raise HTTPException(status_code=404, detail="Overlay tiles have not been built.")
+    return FileResponse(metadata_path, media_type="application/json")
+
+
+@app.get(f"/{config.API_VERSION}/tiles/{{layer}}/{{day_of_year}}/{{z}}/{{x}}/{{y}}.png")
+async def get_tile(
+        layer: str,
+        day_of_year: int = Path(..., ge=1, le=366, description="Day of year in a leap-year calendar"),
+        z: int = Path(..., ge=0, le=22),
+        x: int = Path(..., ge=0),
+        y: int = Path(..., ge=0)
+):
+    """
+    Serve a precomputed overlay tile (built offline by scripts/build_tiles.py).
+
+    Tiles that contain no data are not written, so they return 404 and the
+    map simply shows nothing there.
+    """
+    import os
+    from services.tiles import LAYERS, tile_path
+
+    if layer not in LAYERS:
+        raise HTTPException(status_code=404, detail=f"Unknown layer: {layer}")
+    path = tile_path(layer, day_of_year, z, x, y)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Tile not found.")
+    return FileResponse(
+        path,
+        media_type="image/png",
+        headers={"Cache-Control": f"public, max-age={config.TILE_CACHE_MAX_AGE}"}
+    )
+
+
 # Backwards compatibility - redirect old endpoint to new versioned one
 @app.get("/climate-analysis", response_model=ClimateAnalysisResponse, include_in_schema=False)
 async def get_climate_analysis_legacy(
+        request: Request,
         lat: float = Query(..., description="Latitude", example=-9.665),
         lon: float = Query(..., description="Longitude", example=-35.735),
         day: int = Query(..., ge=1, le=31, description="Day of the month", example=4),
         month: int = Query(..., ge=1, le=12, description="Month of the year", example=10)
 ):
     """Legacy endpoint for backwards compatibility. Use /v1/climate-analysis instead."""
-    return await get_climate_analysis(lat, lon, day, month)
\ No newline at end of file
+    return await get_climate_analysis(
+        request, lat=lat, lon=lon, day=day, month=month,
+        additional_parameters="", confidence_intervals=False, hours="", trends=False
+    )
@@ -0,0 +1,127 @@
+"""
+Response encoding with content negotiation.
+
+Analysis endpoints return plain dicts built by the analyzers. Instead of
+letting FastAPI run them through the default encoder and validate them a
+second time against the ``response_model``, they are serialized once here
+according to the client's ``Accept`` and ``Accept-Encoding`` headers.
+"""
+import gzip
+import json
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from config import config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional encoding
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional compression
+    brotli = None
+
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def _default(value: Any) -> Any:
+    """Convert NumPy scalars and other non-native values for serialization."""
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def _accepts(header: str, token: str) -> bool:
+    """Check whether a comma-separated header lists a token with non-zero quality."""
+    for part in header.split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        if name.lower() != token:
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def encode_json(payload: Any) -> bytes:
+    """Serialize a payload to JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def encode_msgpack(payload: Any) -> bytes:
+    """Serialize a payload to MessagePack bytes."""
+    return msgpack.packb(payload, default=_default, use_bin_type=True)
+
+
+def negotiate_media_type(request: Request) -> str:
+    """Pick the response media type from the request's Accept header."""
+    accept = request.headers.get("accept", "")
+    if msgpack is not None:
+        for media_type in MSGPACK_MEDIA_TYPES:
+            if _accepts(accept, media_type):
+                return media_type
+    return JSON_MEDIA_TYPE
+
+
+def negotiate_encoding(request: Request) -> str | None:
+    """Pick the content encoding from the request's Accept-Encoding header."""
+    accept_encoding = request.headers.get("accept-encoding", "")
+    if brotli is not None and _accepts(accept_encoding, "br"):
+        return "br"
+    if _accepts(accept_encoding, "gzip"):
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str | None) -> bytes:
+    """Compress a response body with the negotiated encoding."""
+    if encoding == "br":
+        return brotli.compress(body, quality=config.BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=config.GZIP_LEVEL)
+    return body
+
+
+def encode_response(request: Request, payload: Any, status_code: int = 200) -> Response:
+    """
+    Build a response for an already-validated payload using content negotiation.
+
+    Args:
+        request: Incoming request whose headers drive the negotiation
+        payload: JSON-compatible data (dicts, lists, numbers, NumPy scalars)
+        status_code: HTTP status code of the response
+
+    Returns:
+        Response: Encoded (and possibly compressed) response
+    """
+    media_type = negotiate_media_type(request)
+    if media_type == JSON_MEDIA_TYPE:
+        body = encode_json(payload)
+    else:
+        body = encode_msgpack(payload)
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    encoding = negotiate_encoding(request) if len(body) >= config.COMPRESSION_MIN_BYTES else None
+    if encoding:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
@@ -110,6 +110,45 @@ class AdditionalParameterStats(BaseModel):
     percentiles: dict
 
 
+class ConfidenceInterval(BaseModel):
+    lower_percent: float
+    upper_percent: float
+
+
+class ProbabilityConfidenceIntervals(BaseModel):
+    confidence_level_percent: float
+    resamples: int
+    method: str
+    rain_probability: ConfidenceInterval
+    hot_probability: ConfidenceInterval
+    cold_probability: ConfidenceInterval
+    humid_probability: ConfidenceInterval
+    dry_probability: ConfidenceInterval
+
+
+class MannKendallTest(BaseModel):
+    # Points tested: one per year for daily series (yearly mean anomalies)
+    sample_size: int
+    s: int
+    z: float
+    p_value: float
+
+
+class RobustTrend(BaseModel):
+    sample_size: int
+    # Theil-Sen slope, in the variable's unit per year; null with too little data
+    slope_per_year: float | None
+    mann_kendall: MannKendallTest | None
+    trend: str
+
+
+class TrendAnalysis(BaseModel):
+    method: str
+    significance_level: float
+    # Keyed by analysis variable (temp_avg, precipitation, ...)
+    variables: dict[str, RobustTrend]
+
+
 # Modelo principal da resposta da API
 class ClimateAnalysisResponse(BaseModel):
     location: Location
@@ -122,6 +161,104 @@ class ClimateAnalysisResponse(BaseModel):
     humidity: HumidityStats
     summary_statistics: SummaryStatistics
     additional_parameters: list[AdditionalParameterStats] | None = None
+    confidence_intervals: ProbabilityConfidenceIntervals | None = None
+    trends: TrendAnalysis | None = None
+    # Hours of day (NASA_HOURLY_TIME_STANDARD) the analysis was restricted to
+    hours_of_day: list[int] | None = None
+
+
+
+class BoundingBox(BaseModel):
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+
+
+class RegionalPercentiles(BaseModel):
+    sample_count: int
+    # Keyed p10, p25, p50, p75, p90; null when no cell has data
+    percentiles: dict[str, float] | None
+
+
+class RegionalDistribution(BaseModel):
+    window_days: int
+    max_temp_c: RegionalPercentiles
+    precipitation_mm: RegionalPercentiles
+
+
+class ClimateGridResponse(BaseModel):
+    bbox: BoundingBox
+    day: int
+    month: int
+    analysis_period: AnalysisPeriod
+    rain_threshold_mm: float
+    hot_threshold_c: float
+    lats: list[float]
+    lons: list[float]
+    cells_with_data: int
+    # 2-D arrays indexed [lat][lon]; null where a cell has no data
+    rain_probability_percent: list[list[float | None]]
+    hot_probability_percent: list[list[float | None]]
+    avg_max_temp_c: list[list[float | None]]
+    years_analyzed: list[list[int]]
+    regional_percentiles: RegionalDistribution
+
+
+class ReturnLevelGrid(BaseModel):
+    # 2-D arrays indexed [lat][lon]; null where a cell has too few years
+    years_analyzed: list[list[int]]
+    gev_shape: list[list[float | None]]
+    # Keyed by return period in years
+    levels: dict[str, list[list[float | None]]]
+
+
+class ReturnPeriodGridResponse(BaseModel):
+    bbox: BoundingBox
+    analysis_period: AnalysisPeriod
+    return_periods: list[int]
+    lats: list[float]
+    lons: list[float]
+    cells_with_data: int
+    # precipitation_mm (wettest day), max_temp_c (hottest day), min_temp_c (coldest night)
+    variables: dict[str, ReturnLevelGrid]
+
+
+class BestDay(BaseModel):
+    month: int
+    day: int
+    score: float
+    median_temp_c: float
+    rain_probability_percent: float
+    avg_precipitation_mm: float
+    avg_wind_speed_ms: float
+    avg_humidity_percent: float
+    years_analyzed: int
+
+
+class DayPreferences(BaseModel):
+    temperature: float
+    rain: float
+    wind_speed: float
+    humidity: float
+
+
+class BestDaysResponse(BaseModel):
+    location: Location
+    analysis_period: AnalysisPeriod
+    preferences: DayPreferences
+    candidate_days: int
+    days: list[BestDay]
+
+
+class TrendsResponse(BaseModel):
+    location: Location
+    analysis_period: AnalysisPeriod
+    # Calendar day and window the samples were restricted to; null for the whole year
+    month: int | None
+    day: int | None
+    window_days: int | None
+    trends: TrendAnalysis
 
 
 # Resolve forward references
@@ -0,0 +1,76 @@
+"""
+Offline build of the memory-mapped climatology index.
+
+Computes the fixed-width climatology record of every cell in the local series
+store for all 366 days of year and writes them to CLIMATOLOGY_INDEX_DIR. The
+API then answers default analyses for indexed cells with a direct array
+lookup instead of fetching and analyzing data.
+
+Usage (from the backend directory):
+    python -m scripts.build_climatology_index [--end-year 2024]
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from config import config
+from analysis.climatology import BASE_COLUMNS, RECORD_DTYPE, compute_day_of_year_records
+from services.climatology_index import (
+    CELLS_FILE, METADATA_FILE, RECORDS_FILE, cell_grid_index, global_grid_shape, index_metadata
+)
+from services.series_store import series_store
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the climatology index from the local series store.")
+    parser.add_argument("--end-year", type=int, default=datetime.now().year - 1,
+                        help="Last year to include (default: last complete year)")
+    args = parser.parse_args()
+
+    cells = series_store.stored_cells()
+    if not cells:
+        print(f"No cells found in the local series store ({config.LOCAL_STORE_DIR}).")
+        return 1
+
+    directory = config.CLIMATOLOGY_INDEX_DIR
+    os.makedirs(directory, exist_ok=True)
+    cells_tmp = os.path.join(directory, CELLS_FILE + ".tmp")
+    records_tmp = os.path.join(directory, RECORDS_FILE + ".tmp")
+
+    cell_rows = np.full(global_grid_shape(), -1, dtype=np.int32)
+    records = np.lib.format.open_memmap(records_tmp, mode="w+", dtype=RECORD_DTYPE, shape=(len(cells), 366))
+
+    position = 0
+    for cell in cells:
+        series = series_store.load(cell, list(BASE_COLUMNS))
+        if series is None:
+            print(f"Skipping cell {cell.lat}, {cell.lon}: missing base parameters")
+            continue
+        records[position] = compute_day_of_year_records(series, config.START_YEAR, args.end_year)
+        cell_rows[cell_grid_index(cell.lat, cell.lon)] = position
+        position += 1
+        if position % 100 == 0:
+            print(f"Indexed {position}/{len(cells)} cells")
+
+    records.flush()
+    del records
+    with open(cells_tmp, "wb") as cells_file:
+        np.save(cells_file, cell_rows)
+
+    # Replace the files atomically; metadata last so readers see a complete index
+    os.replace(cells_tmp, os.path.join(directory, CELLS_FILE))
+    os.replace(records_tmp, os.path.join(directory, RECORDS_FILE))
+    metadata = dict(index_metadata(), end_year=args.end_year, indexed_cells=position)
+    with open(os.path.join(directory, METADATA_FILE), "w") as metadata_file:
+        json.dump(metadata, metadata_file, indent=2)
+
+    print(f"Indexed {position} cells into {directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
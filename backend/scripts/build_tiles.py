@@ -0,0 +1,135 @@
+"""
+Offline build of the map overlay tiles.
+
+Reads every cell in the local series store, computes the rain probability and
+hot-percentile temperature for each cell and day of year, and writes them as
+z/x/y PNG tiles under TILES_DIR, one tile set per layer and day of year.
+The API serves the result as static files, so map browsing costs no
+computation.
+
+Usage (from the backend directory):
+    python -m scripts.build_tiles [--min-zoom 2] [--max-zoom 7] [--days 1-366]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import warnings
+from datetime import datetime
+
+import numpy as np
+
+from config import config
+from analysis.grid import day_of_year_matrix_for_series
+from services.series_store import series_store
+from services.tiles import (
+    LAYERS, METADATA_FILE, encode_png, lat_to_tile_y, lon_to_tile_x, render_tile, tile_path
+)
+
+
+def build_fields(start_year: int, end_year: int) -> tuple[dict[str, np.ndarray], float, float]:
+    """
+    Compute every layer for every stored cell and day of year.
+
+    Returns:
+        tuple: (layer name -> (366 x lat cells x lon cells) array, origin latitude, origin longitude)
+    """
+    cells = series_store.stored_cells()
+    if not cells:
+        raise SystemExit(f"No cells found in the local series store ({config.LOCAL_STORE_DIR}).")
+
+    lats = sorted({cell.lat for cell in cells})
+    lons = sorted({cell.lon for cell in cells})
+    origin_lat, origin_lon = lats[0], lons[0]
+    n_lat = int(round((lats[-1] - origin_lat) / config.POWER_CELL_LAT_STEP)) + 1
+    n_lon = int(round((lons[-1] - origin_lon) / config.POWER_CELL_LON_STEP)) + 1
+    fields = {layer: np.full((366, n_lat, n_lon), np.nan, dtype=np.float32) for layer in LAYERS}
+
+    for count, cell in enumerate(cells, start=1):
+        series = series_store.load(cell, ["PRECTOTCORR", "T2M_MAX"])
+        if series is None:
+            print(f"Skipping cell {cell.lat}, {cell.lon}: missing parameters")
+            continue
+        row = int(round((cell.lat - origin_lat) / config.POWER_CELL_LAT_STEP))
+        column = int(round((cell.lon - origin_lon) / config.POWER_CELL_LON_STEP))
+
+        precipitation = day_of_year_matrix_for_series(series, "PRECTOTCORR", start_year, end_year)
+        temp_max = day_of_year_matrix_for_series(series, "T2M_MAX", start_year, end_year)
+        with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+            warnings.simplefilter("ignore", RuntimeWarning)
+            years_with_data = np.count_nonzero(~np.isnan(precipitation), axis=0)
+            fields["rain_probability"][:, row, column] = (
+                np.count_nonzero(precipitation > config.RAIN_THRESHOLD_MM, axis=0) / years_with_data * 100
+            )
+            fields["temperature_percentile"][:, row, column] = np.nanpercentile(
+                temp_max, config.PERCENTILE_HOT, axis=0
+            )
+        if count % 100 == 0:
+            print(f"Computed {count}/{len(cells)} cells")
+
+    return fields, origin_lat, origin_lon
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write a file atomically so the API never serves a partial tile."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build z/x/y overlay tiles from the local series store.")
+    parser.add_argument("--min-zoom", type=int, default=config.TILE_MIN_ZOOM)
+    parser.add_argument("--max-zoom", type=int, default=config.TILE_MAX_ZOOM)
+    parser.add_argument("--days", default="1-366", help="Day-of-year range to build, e.g. 1-366 or 277-277")
+    parser.add_argument("--end-year", type=int, default=datetime.now().year - 1,
+                        help="Last year to include (default: last complete year)")
+    args = parser.parse_args()
+
+    first_day, _, last_day = args.days.partition("-")
+    days = range(int(first_day), int(last_day or first_day) + 1)
+    end_year = args.end_year
+
+    fields, origin_lat, origin_lon = build_fields(config.START_YEAR, end_year)
+    n_lat, n_lon = next(iter(fields.values())).shape[1:]
+    south = origin_lat - config.POWER_CELL_LAT_STEP / 2
+    north = origin_lat + (n_lat - 0.5) * config.POWER_CELL_LAT_STEP
+    west = origin_lon - config.POWER_CELL_LON_STEP / 2
+    east = origin_lon + (n_lon - 0.5) * config.POWER_CELL_LON_STEP
+
+    written = 0
+    for layer, field in fields.items():
+        for day in days:
+            for z in range(args.min_zoom, args.max_zoom + 1):
+                for x in range(lon_to_tile_x(west, z), lon_to_tile_x(east, z) + 1):
+                    for y in range(lat_to_tile_y(north, z), lat_to_tile_y(south, z) + 1):
+                        rgba = render_tile(field[day - 1], origin_lat, origin_lon, layer, z, x, y)
+                        if rgba is not None:
+                            write_atomic(tile_path(layer, day, z, x, y), encode_png(rgba))
+                            written += 1
+        print(f"Layer {layer}: done")
+
+    metadata = {
+        "layers": LAYERS,
+        "min_zoom": args.min_zoom,
+        "max_zoom": args.max_zoom,
+        "bounds": {"south": south, "west": west, "north": north, "east": east},
+        "start_year": config.START_YEAR,
+        "end_year": end_year,
+        "rain_threshold_mm": config.RAIN_THRESHOLD_MM,
+        "tile_size": config.TILE_SIZE,
+    }
+    write_atomic(os.path.join(config.TILES_DIR, METADATA_FILE), json.dumps(metadata, indent=2).encode("utf-8"))
+    print(f"Wrote {written} tiles to {config.TILES_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
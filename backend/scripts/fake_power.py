@@ -0,0 +1,147 @@
+"""
+Local stand-in for the NASA POWER daily point API, for load tests.
+
+Serves `GET /api/temporal/daily/point` with the same query parameters and CSV
+layout as NASA POWER (header block, column line, one row per day), with
+deterministic pseudo-random values per location, date and parameter.
+Latency, error rate and payload size are configurable, so the backend can be
+measured without depending on the real service.
+
+Usage (from the backend directory):
+    python -m scripts.fake_power [--port 8900] [--latency-ms 300] [--jitter-ms 100]
+                                 [--error-rate 0.01] [--header-bytes 1500]
+
+Point the backend at it with:
+    NASA_BASE_URL=http://127.0.0.1:8900/api/temporal/daily/point
+"""
+import argparse
+import asyncio
+import random
+from datetime import date, timedelta
+
+from fastapi import FastAPI, Query
+from fastapi.responses import PlainTextResponse
+
+# Rough typical values per parameter: (mean, standard deviation, lower bound)
+PARAMETER_PROFILES = {
+    "T2M": (24.0, 3.0, None),
+    "T2M_MAX": (29.0, 3.5, None),
+    "T2M_MIN": (19.0, 3.0, None),
+    "PRECTOTCORR": (2.5, 5.0, 0.0),
+    "WS2M": (3.0, 1.2, 0.0),
+    "RH2M": (70.0, 12.0, 0.0),
+}
+DEFAULT_PROFILE = (50.0, 10.0, 0.0)
+
+
+def parse_date(value: str) -> date:
+    return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+
+
+def render_csv(latitude: float, longitude: float, parameters: list[str],
+               start: date, end: date, header_bytes: int) -> str:
+    """
+    Build a POWER-style CSV body for a date range.
+
+    Args:
+        latitude: Requested latitude
+        longitude: Requested longitude
+        parameters: Requested parameter names
+        start: First day
+        end: Last day
+        header_bytes: Approximate size of the header block (real responses carry ~1.5 KB)
+
+    Returns:
+        str: The response body
+    """
+    header = [
+        "-BEGIN HEADER-",
+        "NASA/POWER Source Native Resolution Daily Data (load-test stand-in)",
+        f"Dates (month/day/year): {start:%m/%d/%Y} through {end:%m/%d/%Y}",
+        f"Location: latitude  {latitude}   longitude {longitude}",
+        "Value for missing model data cannot be computed or out of model availability range: -999",
+    ]
+    padding = header_bytes - sum(len(line) + 1 for line in header) - len("-END HEADER-\n")
+    while padding > 0:
+        line = f"# {'.' * min(max(padding - 3, 0), 96)}"
+        header.append(line)
+        padding -= len(line) + 1
+    header.append("-END HEADER-")
+
+    rows = [",".join(["YEAR", "MO", "DY"] + parameters)]
+    day = start
+    while day <= end:
+        values = []
+        for parameter in parameters:
+            # Seeded per parameter, so a value does not depend on which others were requested
+            rng = random.Random(f"{latitude:.3f},{longitude:.3f},{day.isoformat()},{parameter}")
+            mean, std_dev, lower = PARAMETER_PROFILES.get(parameter, DEFAULT_PROFILE)
+            value = rng.gauss(mean, std_dev)
+            values.append(f"{max(value, lower) if lower is not None else value:.2f}")
+        rows.append(f"{day.year},{day.month},{day.day}," + ",".join(values))
+        day += timedelta(days=1)
+    return "\n".join(header + rows) + "\n"
+
+
+def create_app(latency_ms: float, jitter_ms: float, error_rate: float,
+               error_status: int, header_bytes: int) -> FastAPI:
+    """
+    Build the stand-in application.
+
+    Args:
+        latency_ms: Mean added latency per request
+        jitter_ms: Uniform jitter around the mean latency
+        error_rate: Fraction of requests answered with error_status
+        error_status: HTTP status of injected errors
+        header_bytes: Approximate size of each response's header block
+
+    Returns:
+        FastAPI: The application
+    """
+    app = FastAPI(title="Fake NASA POWER")
+    stats = {"requests": 0, "errors": 0}
+
+    @app.get("/api/temporal/daily/point")
+    async def daily_point(
+            start: str = Query(..., pattern=r"^\d{8}$"),
+            end: str = Query(..., pattern=r"^\d{8}$"),
+            latitude: float = Query(...),
+            longitude: float = Query(...),
+            parameters: str = Query(...),
+            community: str = Query("RE"),
+            format: str = Query("CSV")
+    ):
+        stats["requests"] += 1
+        delay = max(latency_ms + random.uniform(-jitter_ms, jitter_ms), 0) / 1000
+        await asyncio.sleep(delay)
+        if random.random() < error_rate:
+            stats["errors"] += 1
+            return PlainTextResponse("Injected error", status_code=error_status)
+        body = render_csv(latitude, longitude, parameters.split(","), parse_date(start), parse_date(end), header_bytes)
+        return PlainTextResponse(body, media_type="text/csv")
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=300, help="Mean added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=100, help="Uniform jitter around the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of injected failures")
+    parser.add_argument("--header-bytes", type=int, default=1500, help="Approximate header block size per response")
+    args = parser.parse_args()
+
+    import uvicorn
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.error_status, args.header_bytes)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Import-time report for the API entrypoint.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter, prints the
+slowest top-level imports and checks the total against the documented startup
+budget (STARTUP_IMPORT_BUDGET_MS). Heavy analysis dependencies must not be
+imported at startup; they are loaded lazily on the first analysis request.
+
+Usage (from the backend directory):
+    python -m scripts.import_report [--top 15]
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+from config import config
+
+# Modules that must stay off the startup path
+LAZY_MODULES = ("pandas", "numpy", "scipy")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def measure_imports(module: str = "main") -> list[tuple[str, int, int]]:
+    """
+    Import a module in a fresh interpreter and collect per-module import times.
+    
+    Args:
+        module: Module to import
+        
+    Returns:
+        list: (module name, nesting depth, cumulative time in µs) tuples, in
+        the order reported by the interpreter (children before their parent)
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        timings.append((name.strip(), depth, int(cumulative_us)))
+    return timings
+
+
+def direct_imports(timings: list[tuple[str, int, int]], module: str) -> list[tuple[str, int]]:
+    """Return the (name, cumulative µs) entries imported directly by a top-level module."""
+    end = max(index for index, (name, depth, _) in enumerate(timings) if name == module and depth == 0)
+    children = []
+    for name, depth, cumulative in reversed(timings[:end]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((name, cumulative))
+    return children
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report backend import times against the startup budget.")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest top-level imports to show")
+    args = parser.parse_args()
+
+    timings = measure_imports()
+    total_ms = next(cumulative for name, depth, cumulative in timings if name == "main" and depth == 0) / 1000
+    imported = {name.split(".")[0] for name, _, _ in timings}
+
+    print(f"{'module imported by main':<50} {'cumulative ms':>14}")
+    for name, cumulative in sorted(direct_imports(timings, "main"), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{name:<50} {cumulative / 1000:>14.1f}")
+    print()
+    print(f"Total import time: {total_ms:.1f} ms (budget {config.STARTUP_IMPORT_BUDGET_MS:.0f} ms)")
+
+    failures = []
+    if total_ms > config.STARTUP_IMPORT_BUDGET_MS:
+        failures.append(f"import time {total_ms:.1f} ms exceeds budget of {config.STARTUP_IMPORT_BUDGET_MS:.0f} ms")
+    for module in LAZY_MODULES:
+        if module in imported:
+            failures.append(f"'{module}' is imported at startup but must be loaded lazily")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
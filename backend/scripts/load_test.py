@@ -0,0 +1,253 @@
+"""
+End-to-end load test of the analysis endpoint against a fake NASA POWER.
+
+Starts scripts/fake_power.py and a backend instance (uvicorn) pointed at it,
+then drives `/v1/climate-analysis` at increasing concurrency. Each level runs
+for a fixed duration with a pool of closed-loop clients and reports
+throughput, latency percentiles, errors and the backend's peak resident
+memory. Thresholds turn the run into a pass/fail check, so capacity
+regressions show up before a deploy.
+
+Requests go to random locations by default, so every one misses the caches
+and exercises the full fetch-and-analyze path; `--locations N` draws from a
+fixed pool of N locations instead, to measure a warm-cache mix.
+
+Usage (from the backend directory):
+    python -m scripts.load_test [--concurrency 1,4,16,64] [--duration 20]
+                                [--latency-ms 300] [--error-rate 0.01]
+                                [--workers 1] [--json results.json]
+                                [--max-p99-ms 5000] [--min-rps 2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def process_tree_rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of a process and its children (uvicorn workers), from /proc; None elsewhere."""
+    total_kb = 0
+    pending = [pid]
+    try:
+        while pending:
+            current = pending.pop()
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+            children = Path(f"/proc/{current}/task/{current}/children")
+            if children.exists():
+                pending.extend(int(child) for child in children.read_text().split())
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    return round(total_kb / 1024, 1)
+
+
+def start_process(args: list[str], env: Optional[dict] = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable] + args, cwd=BACKEND_DIR, env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+
+
+async def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 30) -> None:
+    """Poll a URL until it answers, failing early if the process exits."""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Process exited during startup:\n{process.stderr.read().decode()}")
+            try:
+                await client.get(url, timeout=1)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s")
+
+
+def random_request(locations: Optional[list[tuple[float, float]]]) -> dict:
+    if locations:
+        lat, lon = random.choice(locations)
+    else:
+        lat, lon = random.uniform(-60, 70), random.uniform(-180, 180)
+    return {"lat": round(lat, 4), "lon": round(lon, 4), "month": random.randint(1, 12), "day": random.randint(1, 28)}
+
+
+async def run_level(base_url: str, concurrency: int, duration: float, backend_pid: int,
+                    locations: Optional[list[tuple[float, float]]], timeout: float) -> dict:
+    """
+    Run closed-loop clients at one concurrency level.
+
+    Args:
+        base_url: Backend URL
+        concurrency: Number of clients, each sending its next request when the previous one finishes
+        duration: Seconds to run
+        backend_pid: Backend process ID, for memory sampling
+        locations: Optional fixed pool of locations
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        dict: Throughput, latency percentiles, status counts and peak memory
+    """
+    latencies = []
+    statuses: dict[str, int] = {}
+    peak_rss = process_tree_rss_mb(backend_pid)
+    deadline = time.monotonic() + duration
+
+    async def client_loop(client: httpx.AsyncClient):
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.get("/v1/climate-analysis", params=random_request(locations))
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(1000 * (time.perf_counter() - started))
+            statuses[status] = statuses.get(status, 0) + 1
+
+    async def sample_memory():
+        nonlocal peak_rss
+        while time.monotonic() < deadline:
+            rss = process_tree_rss_mb(backend_pid)
+            if rss is not None:
+                peak_rss = max(peak_rss or 0, rss)
+            await asyncio.sleep(0.5)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        started = time.monotonic()
+        await asyncio.gather(sample_memory(), *(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    ok = statuses.get("200", 0)
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "ok": ok,
+        "statuses": statuses,
+        "rps": round(ok / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p90_ms": round(percentile(latencies, 90), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "max_ms": round(latencies[-1], 1) if latencies else float("nan"),
+        "peak_rss_mb": peak_rss,
+    }
+
+
+def print_table(results: list[dict]) -> None:
+    columns = ["concurrency", "requests", "ok", "rps", "p50_ms", "p90_ms", "p99_ms", "max_ms", "peak_rss_mb"]
+    print(" ".join(f"{column:>12}" for column in columns) + "  statuses")
+    for result in results:
+        print(" ".join(f"{str(result[column]):>12}" for column in columns) + f"  {result['statuses']}")
+
+
+async def run(args: argparse.Namespace) -> int:
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    backend_url = f"http://127.0.0.1:{args.port}"
+    scratch = tempfile.mkdtemp(prefix="cascao-loadtest-")
+
+    fake = start_process([
+        "-m", "scripts.fake_power", "--port", str(args.fake_port),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate), "--header-bytes", str(args.header_bytes),
+    ])
+    backend = start_process(
+        ["-m", "uvicorn", "main:app", "--port", str(args.port), "--workers", str(args.workers),
+         "--log-level", "warning"],
+        env={
+            "NASA_BASE_URL": f"{fake_url}/api/temporal/daily/point",
+            # Measure the backend, not the politeness limits meant for the real service
+            "NASA_RATE_LIMIT_PER_SECOND": str(args.nasa_rate_limit),
+            "NASA_RATE_BURST": str(args.nasa_rate_limit),
+            # Start cold and keep caches and traces out of the working tree
+            "SHARED_CACHE_PATH": os.path.join(scratch, "shared_cache.sqlite3"),
+            "LOCAL_STORE_DIR": "",
+            "CLIMATOLOGY_INDEX_DIR": "",
+            "TRACE_EXPORTER": "none",
+            "LOG_LEVEL": "ERROR",
+        },
+    )
+    try:
+        await wait_until_ready(f"{fake_url}/stats", fake)
+        await wait_until_ready(f"{backend_url}/health", backend)
+
+        locations = None
+        if args.locations:
+            locations = [(random.uniform(-60, 70), random.uniform(-180, 180)) for _ in range(args.locations)]
+
+        results = []
+        for concurrency in args.concurrency:
+            print(f"Running {args.duration:.0f}s at concurrency {concurrency}...", flush=True)
+            results.append(await run_level(backend_url, concurrency, args.duration, backend.pid,
+                                           locations, args.timeout))
+        print()
+        print_table(results)
+
+        if args.json:
+            with open(args.json, "w") as file:
+                json.dump({"settings": vars(args), "results": results}, file, indent=2)
+
+        # Thresholds apply to the highest concurrency level
+        final = results[-1]
+        failures = []
+        if args.max_p99_ms is not None and final["p99_ms"] > args.max_p99_ms:
+            failures.append(f"p99 {final['p99_ms']} ms exceeds {args.max_p99_ms} ms")
+        if args.min_rps is not None and final["rps"] < args.min_rps:
+            failures.append(f"throughput {final['rps']} rps is below {args.min_rps} rps")
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        return 1 if failures else 0
+    finally:
+        for process in (backend, fake):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=lambda value: [int(level) for level in value.split(",")],
+                        default=[1, 4, 16, 64], help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per level")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--locations", type=int, default=0,
+                        help="Draw requests from a pool of N locations (0 = a new random location each time)")
+    parser.add_argument("--port", type=int, default=8800, help="Backend port")
+    parser.add_argument("--workers", type=int, default=1, help="Backend worker processes")
+    parser.add_argument("--nasa-rate-limit", type=float, default=10000,
+                        help="NASA_RATE_LIMIT_PER_SECOND for the backend under test")
+    parser.add_argument("--fake-port", type=int, default=8900, help="Fake NASA POWER port")
+    parser.add_argument("--latency-ms", type=float, default=300, help="Fake NASA POWER mean latency")
+    parser.add_argument("--jitter-ms", type=float, default=100, help="Fake NASA POWER latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fake NASA POWER error rate")
+    parser.add_argument("--header-bytes", type=int, default=1500, help="Fake NASA POWER header size")
+    parser.add_argument("--json", help="Write settings and results to this file")
+    parser.add_argument("--max-p99-ms", type=float, help="Fail if p99 at the highest level exceeds this")
+    parser.add_argument("--min-rps", type=float, help="Fail if throughput at the highest level is below this")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
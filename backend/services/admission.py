@@ -0,0 +1,101 @@
+"""
+Admission control for the analysis endpoints.
+
+Requests that miss every cache fan out to NASA POWER and are admitted
+through a bounded concurrency limit. A limited number may wait for a slot,
+each for at most ANALYSIS_QUEUE_TIMEOUT_SECONDS; anything beyond that is
+shed right away with ServiceOverloadedError (HTTP 503 with Retry-After), so a
+spike degrades into fast rejections instead of every request timing out.
+"""
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+
+from config import config
+from exceptions import ServiceOverloadedError
+from tracing import set_attributes
+
+
+class AdmissionController:
+    """Bounded concurrency with a bounded, deadline-limited wait queue."""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        """
+        Initialize the controller.
+
+        Args:
+            max_concurrent: Requests processed at once
+            max_queue: Requests allowed to wait for a slot
+            queue_timeout: Seconds a request may wait before it is shed
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._active = 0
+        self._waiting = 0
+        self._admitted = 0
+        self._rejected = 0
+        # Exponentially weighted average of how long admitted requests take
+        self._avg_service_seconds = 1.0
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait, from the current backlog and service time."""
+        backlog = (self._active + self._waiting) / self.max_concurrent
+        return max(1, math.ceil(backlog * self._avg_service_seconds))
+
+    def _reject(self, reason: str) -> ServiceOverloadedError:
+        self._rejected += 1
+        return ServiceOverloadedError(f"Service is at capacity ({reason}); retry later.", self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Hold a processing slot for the duration of the block.
+
+        Raises:
+            ServiceOverloadedError: If the wait queue is full or the wait deadline passes
+        """
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue:
+                raise self._reject("queue full")
+            self._waiting += 1
+            queued = time.monotonic()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject("queue wait exceeded")
+            finally:
+                self._waiting -= 1
+            set_attributes(admission_wait_ms=round(1000 * (time.monotonic() - queued), 2))
+        else:
+            await self._semaphore.acquire()
+
+        self._active += 1
+        self._admitted += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+            self._avg_service_seconds += 0.1 * (time.monotonic() - started - self._avg_service_seconds)
+
+    def metrics(self) -> dict:
+        """Current load and totals."""
+        return {
+            "active": self._active,
+            "waiting": self._waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "avg_service_ms": round(1000 * self._avg_service_seconds, 1),
+        }
+
+
+# Shared controller for the analysis endpoints
+analysis_admission = AdmissionController(
+    config.ANALYSIS_MAX_CONCURRENT, config.ANALYSIS_MAX_QUEUE, config.ANALYSIS_QUEUE_TIMEOUT_SECONDS
+)
@@ -0,0 +1,129 @@
+"""
+Memory-mapped global climatology index.
+
+Built offline by ``scripts/build_climatology_index.py``, the index holds one
+fixed-width record per NASA POWER cell and day of year:
+
+- ``cells.npy``: int32 (lat cells x lon cells) grid mapping every global cell
+  to its row in the records array, or -1 when the cell is not indexed
+- ``records.npy``: (indexed cells x 366) array of ``RECORD_DTYPE``
+- ``metadata.json``: the configuration the records were computed with
+
+Both arrays are opened with ``mmap_mode="r"``, so a lookup is two array
+reads and every worker process shares the same page-cache pages.
+"""
+import calendar
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from config import config
+from analysis.climatology import RECORD_DTYPE
+from analysis.grid import day_of_year
+from tracing import log
+
+CELLS_FILE = "cells.npy"
+RECORDS_FILE = "records.npy"
+METADATA_FILE = "metadata.json"
+
+
+def global_grid_shape() -> tuple[int, int]:
+    """Number of (latitude, longitude) cells in the global NASA POWER grid."""
+    return (int(round(180 / config.POWER_CELL_LAT_STEP)) + 1,
+            int(round(360 / config.POWER_CELL_LON_STEP)))
+
+
+def cell_grid_index(lat: float, lon: float) -> tuple[int, int]:
+    """Row and column of the global grid cell containing a coordinate."""
+    n_lat, n_lon = global_grid_shape()
+    row = int(round((lat + 90) / config.POWER_CELL_LAT_STEP))
+    column = int(round((lon + 180) / config.POWER_CELL_LON_STEP)) % n_lon
+    return min(max(row, 0), n_lat - 1), column
+
+
+def index_metadata() -> dict:
+    """Configuration values that the stored records depend on."""
+    return {
+        "start_year": config.START_YEAR,
+        "rain_threshold_mm": config.RAIN_THRESHOLD_MM,
+        "percentile_cold": config.PERCENTILE_COLD,
+        "percentile_hot": config.PERCENTILE_HOT,
+        "percentile_dry": config.PERCENTILE_DRY,
+        "percentile_humid": config.PERCENTILE_HUMID,
+        "lat_step": config.POWER_CELL_LAT_STEP,
+        "lon_step": config.POWER_CELL_LON_STEP,
+        "record_dtype": RECORD_DTYPE.descr,
+    }
+
+
+class ClimatologyIndex:
+    """Read-only view of a memory-mapped climatology index."""
+
+    def __init__(self, directory: str):
+        """
+        Initialize the index. Files are opened lazily on the first lookup.
+
+        Args:
+            directory: Directory holding the index files (empty to disable)
+        """
+        self.directory = directory
+        self._cells: Optional[np.ndarray] = None
+        self._records: Optional[np.ndarray] = None
+        self._end_year = 0
+        self._opened = False
+
+    def _open(self) -> None:
+        self._opened = True
+        if not self.directory or not os.path.exists(os.path.join(self.directory, RECORDS_FILE)):
+            return
+        with open(os.path.join(self.directory, METADATA_FILE)) as metadata_file:
+            stored = json.load(metadata_file)
+        expected = json.loads(json.dumps(index_metadata()))
+        mismatched = [key for key, value in expected.items() if stored.get(key) != value]
+        if mismatched:
+            log("WARNING", "Climatology index disabled: built with different settings", mismatched=mismatched)
+            return
+        self._end_year = int(stored.get("end_year", 0))
+        self._cells = np.load(os.path.join(self.directory, CELLS_FILE), mmap_mode="r")
+        self._records = np.load(os.path.join(self.directory, RECORDS_FILE), mmap_mode="r")
+
+    @property
+    def available(self) -> bool:
+        """Whether an index matching the current configuration is present."""
+        if not self._opened:
+            self._open()
+        return self._records is not None
+
+    def lookup(self, lat: float, lon: float, month: int, day: int) -> Optional[np.void]:
+        """
+        Return the record for a coordinate and calendar day.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+            month: Month of the year
+            day: Day of the month
+
+        Returns:
+            np.void or None: The record, or None if the cell or day is not indexed, or the
+            index ends before the last complete year (it has not been rebuilt since a rollover)
+        """
+        if not self.available or day > calendar.monthrange(2000, month)[1]:
+            return None
+        if self._end_year < datetime.now().year - 1:
+            return None
+        row, column = cell_grid_index(lat, lon)
+        position = int(self._cells[row, column])
+        if position < 0:
+            return None
+        record = self._records[position, int(day_of_year(month, day)) - 1]
+        if record["n_years"] == 0:
+            return None
+        return record
+
+
+# Shared index instance
+climatology_index = ClimatologyIndex(config.CLIMATOLOGY_INDEX_DIR)
@@ -1,48 +1,198 @@
 import httpx
 import asyncio
+import time
 from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 from config import config
-from exceptions import NASAAPIError
+from exceptions import NASAAPIError, InsufficientDataError
+from services.scheduler import Priority, outbound_scheduler
+from tracing import log, span
+
+if TYPE_CHECKING:  # the parser pulls in numpy, imported on the first fetch
+    from services.power_csv import PowerCSVParser
 
 BASE_URL = config.NASA_BASE_URL
 
+# Connection pool shared by all requests on the running event loop
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _shared_client() -> httpx.AsyncClient:
+    """
+    HTTP client shared by all NASA POWER requests on the running event loop.
+
+    Building a client (and its SSL context) costs tens of milliseconds of CPU,
+    which added up to over a second per analysis when every yearly request
+    made its own; sharing one also reuses connections.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient()
+        _client_loop = loop
+    return _client
+
+
+async def get_nasa_data(latitude: float, longitude: float, parameters: list[str], start_date: str, end_date: str,
+                        value_dtype: str = "float32", priority: Priority = Priority.INTERACTIVE):
+    """
+    Fetch daily data from NASA POWER API for a specific geographic point.
+
+    The response body is parsed while it downloads, straight into one typed
+    array per column.
+
+    Returns:
+        dict: Column arrays (date columns int16, values value_dtype with NaN for
+            missing data), or None on a request error or an empty response
+    """
+    from services.power_csv import PowerCSVParser
 
-async def get_nasa_data(latitude: float, longitude: float, parameters: list[str], start_date: str, end_date: str):
-    """Fetch daily data from NASA POWER API for a specific geographic point."""
-    parameters_str = ",".join(parameters)
     params = {
         "start": start_date,
         "end": end_date,
         "latitude": latitude,
         "longitude": longitude,
         "community": config.NASA_COMMUNITY,
-        "parameters": parameters_str,
+        "parameters": ",".join(parameters),
         "format": config.NASA_FORMAT
     }
+    return await stream_nasa_data(BASE_URL, params, PowerCSVParser(value_dtype=value_dtype), priority)
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(BASE_URL, params=params, timeout=config.NASA_TIMEOUT)
-            response.raise_for_status()
-            return response.text
-        except httpx.HTTPStatusError as e:
-            print(f"HTTP error for period {start_date}-{end_date}: {e}")
-            raise NASAAPIError(f"NASA API returned error: {e.response.status_code}")
-        except httpx.RequestError as e:
-            print(f"Request error for period {start_date}-{end_date}: {e}")
-            return None
 
+def _yearly_day_requests(latitude: float, longitude: float, parameters: list[str], month: int, day: int,
+                         priority: Priority) -> list:
+    """One request per complete year for the same day/month."""
+    current_year = datetime.now().year
+    day_month_str = f"{str(month).zfill(2)}{str(day).zfill(2)}"
+    requests = []
 
-async def get_historical_data_for_day(latitude: float, longitude: float, parameters: list[str], month: int, day: int):
+    for year in range(config.START_YEAR, current_year):  # Excludes current year as it may be incomplete
+        date_str = f"{year}{day_month_str}"
+        # float64 keeps the analyzers' rounding identical to the CSV values
+        requests.append(get_nasa_data(latitude, longitude, parameters, date_str, date_str, value_dtype="float64",
+                                      priority=priority))
+    return requests
+
+
+async def get_historical_data_for_day(latitude: float, longitude: float, parameters: list[str], month: int, day: int,
+                                      priority: Priority = Priority.INTERACTIVE):
     """Fetch data for the same day/month across different years, concurrently."""
+    results = await asyncio.gather(*_yearly_day_requests(latitude, longitude, parameters, month, day, priority))
+    return [res for res in results if res]
+
+
+def years_requested_for_day() -> int:
+    """Number of yearly requests made for a day/month."""
+    return datetime.now().year - config.START_YEAR
+
+
+async def iter_historical_data_for_day(latitude: float, longitude: float, parameters: list[str],
+                                       month: int, day: int, priority: Priority = Priority.INTERACTIVE):
+    """
+    Fetch data for the same day/month across different years, yielding each year as it arrives.
+
+    Yields:
+        dict or None: A year's column arrays, or None for a year without data,
+            in completion order. Requests still pending are cancelled when the
+            consumer stops early.
+    """
+    tasks = [
+        asyncio.ensure_future(request)
+        for request in _yearly_day_requests(latitude, longitude, parameters, month, day, priority)
+    ]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def get_full_daily_series(latitude: float, longitude: float, parameters: list[str],
+                                priority: Priority = Priority.INTERACTIVE):
+    """Fetch every day from START_YEAR through the last complete year in a single request."""
+    last_year = datetime.now().year - 1  # Excludes current year as it may be incomplete
+    return await get_nasa_data(latitude, longitude, parameters, f"{config.START_YEAR}0101", f"{last_year}1231",
+                               priority=priority)
+
+
+async def stream_nasa_data(url: str, params: dict, parser: "PowerCSVParser",
+                           priority: Priority = Priority.INTERACTIVE):
+    """
+    Stream a NASA POWER CSV response into an incremental parser.
+
+    The body is parsed chunk by chunk while it downloads, so only the rows the
+    parser keeps are held in memory. The request waits for a slot from the
+    outbound scheduler first, so upstream capacity goes to higher priorities.
+
+    Returns:
+        dict: Parsed column arrays, or None on a request error or an empty response
+    """
+    period = f"{params['start']}-{params['end']}"
+    with span("nasa.fetch", url=url, period=period, priority=priority.name) as fetch_span:
+        queued = time.perf_counter()
+        async with outbound_scheduler.slot(priority):
+            client = _shared_client()
+            fetch_span.set_attribute("scheduler_wait_ms", round(1000 * (time.perf_counter() - queued), 2))
+            received = 0
+            parse_seconds = 0.0
+            try:
+                async with client.stream("GET", url, params=params, timeout=config.NASA_TIMEOUT) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(config.NASA_STREAM_CHUNK_BYTES):
+                        received += len(chunk)
+                        started = time.perf_counter()
+                        parser.feed(chunk)
+                        parse_seconds += time.perf_counter() - started
+                series = parser.close()
+                fetch_span.set_attribute("rows", len(series["YEAR"]))
+                return series
+            except httpx.HTTPStatusError as e:
+                log("WARNING", "NASA POWER returned an HTTP error", period=period, status=e.response.status_code)
+                raise NASAAPIError(f"NASA API returned error: {e.response.status_code}")
+            except httpx.RequestError as e:
+                fetch_span.record_exception(e)
+                log("WARNING", "NASA POWER request failed", period=period, error=str(e))
+                return None
+            except InsufficientDataError as e:
+                fetch_span.set_attribute("rows", 0)
+                log("INFO", "NASA POWER returned no data", period=period, error=str(e))
+                return None
+            finally:
+                fetch_span.set_attribute("bytes_received", received)
+                fetch_span.set_attribute("rows_seen", parser.rows_seen)
+                fetch_span.set_attribute("parse_ms", round(1000 * parse_seconds, 2))
+
+
+async def get_hourly_data_for_day(latitude: float, longitude: float, parameters: list[str],
+                                  month: int, day: int, hours: list[int],
+                                  priority: Priority = Priority.INTERACTIVE):
+    """
+    Fetch hourly data for the same day/month across different years, concurrently.
+
+    Each yearly response is streamed and reduced to the requested hours of day
+    while it downloads.
+    """
+    from services.power_csv import PowerCSVParser, hour_filter
+
     current_year = datetime.now().year
     day_month_str = f"{str(month).zfill(2)}{str(day).zfill(2)}"
     tasks = []
 
     for year in range(config.START_YEAR, current_year):  # Excludes current year as it may be incomplete
         date_str = f"{year}{day_month_str}"
-        task = get_nasa_data(latitude, longitude, parameters, date_str, date_str)
-        tasks.append(task)
+        params = {
+            "start": date_str,
+            "end": date_str,
+            "latitude": latitude,
+            "longitude": longitude,
+            "community": config.NASA_COMMUNITY,
+            "parameters": ",".join(parameters),
+            "format": config.NASA_FORMAT,
+            "time-standard": config.NASA_HOURLY_TIME_STANDARD,
+        }
+        tasks.append(stream_nasa_data(config.NASA_HOURLY_BASE_URL, params, PowerCSVParser(hour_filter(hours)), priority))
 
     results = await asyncio.gather(*tasks)
-    return [res for res in results if res]
\ No newline at end of file
+    return [res for res in results if res]
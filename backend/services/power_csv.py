@@ -0,0 +1,133 @@
+"""
+Incremental parser for NASA POWER CSV responses.
+
+The parser is fed the response body chunk by chunk as it downloads. It skips
+the header block, reads the column names, and converts every batch of
+complete rows straight into a typed block (float32 by default). An optional row filter
+(e.g. "only hours 18-20") is applied per batch, so only the kept rows stay in
+memory and the full response text is never held at once.
+"""
+from typing import Callable, Optional
+
+import numpy as np
+
+from exceptions import InsufficientDataError
+
+# Date/time columns present in NASA POWER CSVs (HR only in hourly responses)
+DATE_COLUMNS = ("YEAR", "MO", "DY", "HR")
+
+# NASA POWER fill value for missing data
+MISSING_VALUE = -999
+
+HEADER_BEGIN = b"-BEGIN HEADER-"
+HEADER_END = b"-END HEADER-"
+
+Series = dict[str, np.ndarray]
+RowFilter = Callable[[Series], np.ndarray]
+
+
+class PowerCSVParser:
+    """Chunked NASA POWER CSV parser producing one array per column."""
+
+    def __init__(self, row_filter: Optional[RowFilter] = None, value_dtype: str = "float32"):
+        """
+        Initialize the parser.
+
+        Args:
+            row_filter: Optional function receiving a batch as column arrays and
+                returning a boolean mask of the rows to keep
+            value_dtype: dtype of the value columns (date columns are always int16)
+        """
+        self.row_filter = row_filter
+        self.value_dtype = np.dtype(value_dtype)
+        self.columns: Optional[list[str]] = None
+        self.rows_seen = 0
+        self._buffer = b""
+        self._in_header = True
+        self._blocks: list[np.ndarray] = []
+
+    def feed(self, data: bytes) -> None:
+        """
+        Consume the next chunk of the response body.
+
+        Args:
+            data: Raw bytes, split anywhere (even inside a row)
+        """
+        self._buffer += data
+        if self._in_header:
+            header_end = self._buffer.find(HEADER_END)
+            if header_end == -1:
+                # Wait for the end marker, unless the body has no header block at all
+                if HEADER_BEGIN.startswith(self._buffer.lstrip()[:len(HEADER_BEGIN)]):
+                    return
+                self._in_header = False
+            else:
+                self._buffer = self._buffer[header_end + len(HEADER_END):].lstrip()
+                self._in_header = False
+
+        if self.columns is None:
+            self._buffer = self._buffer.lstrip()
+            line_end = self._buffer.find(b"\n")
+            if line_end == -1:
+                return
+            header = self._buffer[:line_end].decode()
+            self.columns = [name.strip() for name in header.split(",")]
+            self._buffer = self._buffer[line_end + 1:]
+
+        last_line_end = self._buffer.rfind(b"\n")
+        if last_line_end == -1:
+            return
+        complete, self._buffer = self._buffer[:last_line_end], self._buffer[last_line_end + 1:]
+        self._parse_rows(complete)
+
+    def _parse_rows(self, text: bytes) -> None:
+        """Convert complete CSV rows into a typed block, keeping filtered rows only."""
+        text = text.replace(b"\r", b"").strip()
+        if not text:
+            return
+        values = np.fromstring(text.replace(b"\n", b",").decode(), dtype=np.float64, sep=",")
+        if len(values) % len(self.columns):
+            raise InsufficientDataError("Malformed row in NASA response.")
+        block = values.reshape(-1, len(self.columns))
+        self.rows_seen += len(block)
+        if self.row_filter is not None:
+            block = block[self.row_filter(self._to_series(block))]
+        if len(block):
+            self._blocks.append(block.astype(self.value_dtype))
+
+    def _to_series(self, block: np.ndarray) -> Series:
+        """Split a 2-D block into column arrays; date columns as int16, missing values as NaN."""
+        series = {}
+        for i, column in enumerate(self.columns):
+            if column in DATE_COLUMNS:
+                series[column] = block[:, i].astype(np.int16)
+            else:
+                values = block[:, i].astype(self.value_dtype)
+                values[block[:, i] == MISSING_VALUE] = np.nan
+                series[column] = values
+        return series
+
+    def close(self) -> Series:
+        """
+        Parse any trailing row and return the collected columns.
+
+        Returns:
+            dict: Column name to array; date columns as int16, values as value_dtype with NaN for missing data
+
+        Raises:
+            InsufficientDataError: If the response held no (kept) data rows
+        """
+        if self.columns is not None and self._buffer:
+            self._parse_rows(self._buffer)
+        self._buffer = b""
+        if self.columns is None or not self._blocks:
+            raise InsufficientDataError("NASA response contains no data rows.")
+        series = self._to_series(np.concatenate(self._blocks))
+        self._blocks = []
+        return series
+
+
+def hour_filter(hours: list[int]) -> RowFilter:
+    """Row filter keeping rows whose HR column is one of the given hours."""
+    wanted = np.asarray(hours)
+    return lambda series: np.isin(series["HR"], wanted)
@@ -0,0 +1,143 @@
+"""
+Priority-aware scheduler for outbound NASA POWER requests.
+
+Every upstream request takes a slot from a single scheduler. Slots are
+granted from a token bucket (NASA_RATE_LIMIT_PER_SECOND, refilled
+continuously up to NASA_RATE_BURST) and capped at NASA_MAX_CONCURRENT_REQUESTS
+in flight. When requests have to wait, they are served strictly by priority
+class and then in arrival order, so a large batch never delays an
+interactive query by more than the requests already in flight.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Optional
+
+from config import config
+
+
+class Priority(IntEnum):
+    """Priority classes of outbound requests (lower value is served first)."""
+    INTERACTIVE = 0
+    BATCH = 1
+    PREFETCH = 2
+
+
+class OutboundScheduler:
+    """Token-bucket rate limiter with a priority queue of waiting requests."""
+
+    def __init__(self, rate: float, burst: int, max_concurrency: int):
+        """
+        Initialize the scheduler.
+
+        Args:
+            rate: Requests started per second on average (0 for no rate limit)
+            burst: Bucket size, i.e. requests that may start back to back
+            max_concurrency: Requests allowed in flight at once
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._in_flight = 0
+        self._waiting: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._granted = {priority: 0 for priority in Priority}
+        self._wait_seconds = {priority: 0.0 for priority in Priority}
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.rate > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _dispatch(self) -> None:
+        """Grant slots to waiting requests in priority order while tokens and capacity allow."""
+        self._timer = None
+        while self._waiting:
+            priority, _, future = self._waiting[0]
+            if future.done():  # cancelled while waiting
+                heapq.heappop(self._waiting)
+                continue
+            if self._in_flight >= self.max_concurrency:
+                return  # the next release dispatches again
+            self._refill()
+            if self.rate > 0 and self._tokens < 1:
+                delay = (1 - self._tokens) / self.rate
+                self._timer = future.get_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiting)
+            if self.rate > 0:
+                self._tokens -= 1
+            self._in_flight += 1
+            future.set_result(None)
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        """
+        Wait until a request of the given priority may start.
+
+        Args:
+            priority: Priority class of the request
+        """
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (int(priority), next(self._sequence), future))
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+        started = time.monotonic()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # granted just before the caller was cancelled
+            raise
+        self._granted[priority] += 1
+        self._wait_seconds[priority] += time.monotonic() - started
+
+    def release(self) -> None:
+        """Mark a request as finished and hand its slot to the next waiter."""
+        self._in_flight -= 1
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.INTERACTIVE):
+        """Hold an outbound request slot for the duration of the block."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def metrics(self) -> dict:
+        """Current queue depths, tokens and per-priority totals."""
+        self._refill()
+        queued = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _, future in self._waiting:
+            if not future.done():
+                queued[Priority(priority).name.lower()] += 1
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "tokens_available": round(self._tokens, 2),
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queued": queued,
+            "granted": {priority.name.lower(): count for priority, count in self._granted.items()},
+            "avg_wait_ms": {
+                priority.name.lower(): round(1000 * self._wait_seconds[priority] / count, 1) if count else 0.0
+                for priority, count in self._granted.items()
+            },
+        }
+
+
+# Shared scheduler for all NASA POWER requests
+outbound_scheduler = OutboundScheduler(
+    config.NASA_RATE_LIMIT_PER_SECOND, config.NASA_RATE_BURST, config.NASA_MAX_CONCURRENT_REQUESTS
+)
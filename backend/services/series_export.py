@@ -0,0 +1,113 @@
+"""
+Streaming export of stored daily series.
+
+Rows are selected from a cell's cached arrays with a boolean mask and encoded
+in fixed-size chunks, either as CSV text or as Arrow IPC record batches, so an
+export of the full record never builds per-row Python objects or a whole
+response body in memory.
+"""
+from typing import Iterator, Optional
+
+import numpy as np
+
+from config import config
+from services.power_csv import DATE_COLUMNS
+from services.series_store import Series
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover - optional encoding
+    pyarrow = None
+
+CSV_MEDIA_TYPE = "text/csv"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def select_rows(series: Series, start_year: int, end_year: int,
+                month: Optional[int] = None, day: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of the rows within a year range, optionally restricted to one month and/or day.
+
+    Args:
+        series: Daily series of a cell
+        start_year: First year to include
+        end_year: Last year to include
+        month: Optional month of the year
+        day: Optional day of the month
+
+    Returns:
+        np.ndarray: Row indices in date order
+    """
+    mask = (series["YEAR"] >= start_year) & (series["YEAR"] <= end_year)
+    if month is not None:
+        mask &= series["MO"] == month
+    if day is not None:
+        mask &= series["DY"] == day
+    return np.flatnonzero(mask)
+
+
+def iter_csv(series: Series, columns: list[str], rows: np.ndarray,
+             chunk_rows: int = config.EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Encode selected rows as CSV, one chunk of rows at a time.
+
+    Missing values are written as empty fields.
+
+    Args:
+        series: Daily series of a cell
+        columns: Columns to export, in order
+        rows: Row indices to export
+        chunk_rows: Rows encoded per yielded chunk
+
+    Yields:
+        bytes: The header line, then blocks of CSV rows
+    """
+    yield (",".join(columns) + "\n").encode()
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows[start:start + chunk_rows]
+        fields = []
+        for column in columns:
+            values = series[column][chunk]
+            if column in DATE_COLUMNS:
+                fields.append(np.char.mod("%d", values))
+            else:
+                text = np.char.mod("%.2f", values)
+                text[np.isnan(values)] = ""
+                fields.append(text)
+        yield ("\n".join(map(",".join, zip(*fields))) + "\n").encode()
+
+
+# End-of-stream marker of the Arrow IPC streaming format
+ARROW_END_OF_STREAM = b"\xff\xff\xff\xff\x00\x00\x00\x00"
+
+
+def iter_arrow(series: Series, columns: list[str], rows: np.ndarray,
+               chunk_rows: int = config.EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Encode selected rows as an Arrow IPC stream, one record batch per chunk.
+
+    The schema message, each record batch message and the end-of-stream
+    marker are serialized separately, so batches go out as they are built.
+    Missing values become nulls; column types follow the stored arrays
+    (int16 dates, float32 values).
+
+    Args:
+        series: Daily series of a cell
+        columns: Columns to export, in order
+        rows: Row indices to export
+        chunk_rows: Rows per record batch
+
+    Yields:
+        bytes: The schema, then one record batch at a time, then the end-of-stream marker
+    """
+    schema = pyarrow.schema([(column, pyarrow.from_numpy_dtype(series[column].dtype)) for column in columns])
+    yield schema.serialize().to_pybytes()
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows[start:start + chunk_rows]
+        arrays = []
+        for column in columns:
+            values = series[column][chunk]
+            mask = None if column in DATE_COLUMNS else np.isnan(values)
+            arrays.append(pyarrow.array(values, mask=mask, type=schema.field(column).type))
+        yield pyarrow.record_batch(arrays, schema=schema).serialize().to_pybytes()
+    yield ARROW_END_OF_STREAM
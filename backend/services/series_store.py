@@ -0,0 +1,435 @@
+"""
+Local store of full daily series per NASA POWER grid cell.
+
+NASA POWER meteorology comes from the MERRA-2 grid, so every coordinate
+inside a cell returns the same values. Series are kept per cell center as
+compact NumPy arrays: in a small in-process LRU and, when LOCAL_STORE_DIR is
+set, as compressed ``.npz`` files that can be pre-populated offline and are
+written through on every fetch. When the disk store is disabled or read-only,
+fetched series go to the shared cross-worker cache instead.
+
+A stored series grows by column: when a request needs NASA parameters the
+cell does not have yet, only those columns are fetched and merged by date
+into the stored series, rather than fetching every column again. A series
+that ends before the last complete year is fetched again, with all of its
+columns, the first time it is requested after a year rollover.
+"""
+import asyncio
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from config import config
+from exceptions import DataSourceError
+from analysis.grid import csv_values, day_of_year_matrix_for_series
+from analysis.quantile_sketch import TDigest
+from services.nasa_service import get_full_daily_series
+from services.scheduler import Priority
+from services.shared_cache import shared_cache
+from tracing import span
+
+Series = dict[str, np.ndarray]
+
+DATE_COLUMNS = ("YEAR", "MO", "DY")
+
+
+class Cell(NamedTuple):
+    """Center of a NASA POWER grid cell."""
+    lat: float
+    lon: float
+
+
+def snap_to_cell(lat: float, lon: float) -> Cell:
+    """Snap a coordinate to the center of the NASA POWER cell containing it."""
+    lat_step = config.POWER_CELL_LAT_STEP
+    lon_step = config.POWER_CELL_LON_STEP
+    cell_lat = round(round((lat + 90) / lat_step) * lat_step - 90, 4)
+    cell_lon = round(round((lon + 180) / lon_step) * lon_step - 180, 4)
+    return Cell(min(max(cell_lat, -90.0), 90.0), ((cell_lon + 180) % 360) - 180)
+
+
+def cells_in_bbox(min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Enumerate the NASA POWER cell centers covering a bounding box.
+
+    Args:
+        min_lat: Southern edge of the box
+        min_lon: Western edge of the box
+        max_lat: Northern edge of the box
+        max_lon: Eastern edge of the box
+
+    Returns:
+        tuple: (latitudes, longitudes) of the cell centers, south-to-north and west-to-east
+    """
+    south, west = snap_to_cell(min_lat, min_lon)
+    north, east = snap_to_cell(max_lat, max_lon)
+    lats = np.round(np.arange(south, north + config.POWER_CELL_LAT_STEP / 2, config.POWER_CELL_LAT_STEP), 4)
+    lons = np.round(np.arange(west, east + config.POWER_CELL_LON_STEP / 2, config.POWER_CELL_LON_STEP), 4)
+    return lats, lons
+
+
+def _date_keys(series: Series) -> np.ndarray:
+    """Encode each row's date as a sortable YYYYMMDD integer."""
+    return (series["YEAR"].astype(np.int32) * 10000 + series["MO"].astype(np.int32) * 100
+            + series["DY"].astype(np.int32))
+
+
+def merge_columns(series: Series, additions: Series) -> Series:
+    """
+    Add the value columns of another series, aligned on the dates of the first.
+
+    Columns the series already has are kept. Days missing from the additions
+    become NaN, and days only present in the additions are left out.
+
+    Args:
+        series: Series to extend
+        additions: Series holding the new columns
+
+    Returns:
+        dict: A new series with the columns of both
+    """
+    keys = _date_keys(series)
+    added_keys = _date_keys(additions)
+    order = np.argsort(added_keys, kind="stable")
+    sorted_keys = added_keys[order]
+    positions = np.minimum(np.searchsorted(sorted_keys, keys), max(len(sorted_keys) - 1, 0))
+    found = sorted_keys[positions] == keys if len(sorted_keys) else np.zeros(len(keys), dtype=bool)
+    rows = order[positions[found]]
+
+    merged = dict(series)
+    for name, values in additions.items():
+        if name in DATE_COLUMNS or name in merged:
+            continue
+        column = np.full(len(keys), np.nan, dtype=np.result_type(values.dtype, np.float32))
+        column[found] = values[rows]
+        merged[name] = column
+    return merged
+
+
+def day_rows(series: Series, month: int, day: int, columns: list[str]) -> Series:
+    """
+    Rows of one calendar day in every year, restricted to some value columns.
+
+    Values are returned as float64 at CSV precision, like the per-day fetch,
+    so an analysis does not depend on whether the cell was stored.
+
+    Args:
+        series: Full daily series
+        month: Month of the day
+        day: Day of the month
+        columns: Value columns to keep (date columns are always kept)
+
+    Returns:
+        dict: One row per year (date columns as stored, values as float64)
+    """
+    rows = (series["MO"] == month) & (series["DY"] == day)
+    selected = {name: series[name][rows] for name in DATE_COLUMNS}
+    selected.update({name: csv_values(series[name][rows]) for name in columns})
+    return selected
+
+
+class SeriesStore:
+    """Tiered (memory, disk, shared cache) store of full daily series keyed by cell."""
+
+    def __init__(self, directory: str, memory_size: int, sketch_memory_size: int):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory holding one .npz file per cell (empty to disable disk storage)
+            memory_size: Number of cells kept in the in-process LRU
+            sketch_memory_size: Number of (cell, column) sketch sets kept in the in-process LRU
+        """
+        self.directory = directory
+        self.memory_size = memory_size
+        self.sketch_memory_size = sketch_memory_size
+        self._memory: OrderedDict[Cell, Series] = OrderedDict()
+        # Sketches are read from worker threads (the grid merge), so their LRU is locked
+        self._sketch_memory: OrderedDict[tuple[Cell, str], list[TDigest]] = OrderedDict()
+        self._sketch_lock = threading.Lock()
+
+    def path_for(self, cell: Cell) -> str:
+        """Return the file path of a cell's series."""
+        return os.path.join(self.directory, f"{cell.lat:.4f}_{cell.lon:.4f}.npz")
+
+    def sketch_path_for(self, cell: Cell) -> str:
+        """Return the file path of a cell's per-day quantile sketches."""
+        return os.path.join(self.directory, f"{cell.lat:.4f}_{cell.lon:.4f}.sketch.npz")
+
+    @staticmethod
+    def shared_key(cell: Cell) -> str:
+        """Return the shared cache key of a cell's series."""
+        return f"series:{cell.lat:.4f},{cell.lon:.4f}"
+
+    def stored_cells(self) -> list[Cell]:
+        """List the cells that have a series on disk."""
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        cells = []
+        for file_name in sorted(os.listdir(self.directory)):
+            if file_name.endswith(".npz") and not file_name.endswith(".sketch.npz"):
+                lat, lon = file_name[:-len(".npz")].split("_")
+                cells.append(Cell(float(lat), float(lon)))
+        return cells
+
+    def _remember(self, cell: Cell, series: Series) -> None:
+        self._memory[cell] = series
+        self._memory.move_to_end(cell)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def load(self, cell: Cell, parameters: list[str]) -> Optional[Series]:
+        """
+        Load a cell's series if it holds every requested parameter.
+
+        Args:
+            cell: Cell to load
+            parameters: NASA parameter names that must be present
+
+        Returns:
+            dict or None: The series, or None when it is missing or incomplete
+        """
+        series = self._load_with_tier(cell)[0]
+        return series if self.has_parameters(series, parameters) else None
+
+    @staticmethod
+    def has_parameters(series: Optional[Series], parameters: list[str]) -> bool:
+        """Whether a (possibly missing) series holds every requested parameter."""
+        return series is not None and all(param in series for param in parameters)
+
+    @staticmethod
+    def is_current(series: Series) -> bool:
+        """Whether a series reaches the last complete year."""
+        return int(series["YEAR"].max()) >= datetime.now().year - 1
+
+    def is_complete(self, series: Optional[Series], parameters: list[str]) -> bool:
+        """Whether a (possibly missing) series can serve a request as is: all parameters, up to date."""
+        return self.has_parameters(series, parameters) and self.is_current(series)
+
+    def _read_stored(self, cell: Cell) -> tuple[Optional[Series], str]:
+        """Read a cell's series from disk or else the shared cache (blocking I/O)."""
+        if self.directory and os.path.exists(self.path_for(cell)):
+            with np.load(self.path_for(cell)) as stored:
+                return {name: stored[name] for name in stored.files}, "disk"
+        cached = shared_cache.get(self.shared_key(cell))
+        if cached is not None:
+            with np.load(io.BytesIO(cached)) as stored:
+                return {name: stored[name] for name in stored.files}, "shared"
+        return None, "miss"
+
+    def _load_with_tier(self, cell: Cell) -> tuple[Optional[Series], str]:
+        """Load whatever columns a cell has and name the tier ("memory", "disk", "shared" or "miss")."""
+        series, tier = self._memory.get(cell), "memory"
+        if series is None:
+            series, tier = self._read_stored(cell)
+        if series is not None:
+            self._remember(cell, series)
+        return series, tier
+
+    async def lookup(self, cell: Cell) -> tuple[Optional[Series], str]:
+        """
+        Load whatever columns a cell has without blocking the event loop.
+
+        Memory hits return at once; disk and shared cache reads run in a worker
+        thread. Pass the result to get() so the series is not loaded twice.
+
+        Args:
+            cell: Cell to load
+
+        Returns:
+            tuple: The series (None when not stored) and its tier ("memory", "disk", "shared" or "miss")
+        """
+        series, tier = self._memory.get(cell), "memory"
+        if series is None:
+            series, tier = await asyncio.to_thread(self._read_stored, cell)
+        if series is not None:
+            self._remember(cell, series)
+        return series, tier
+
+    def save(self, cell: Cell, series: Series, columns_added: bool = False) -> None:
+        """
+        Store a cell's series in memory and atomically on disk, or else in the shared cache.
+
+        Args:
+            cell: Cell of the series
+            series: The series
+            columns_added: Whether the series only gained columns over the stored one,
+                so sketches of the existing columns are still valid
+        """
+        self._replace_in_memory(cell, series, columns_added)
+        self._persist(cell, series, columns_added)
+
+    def _replace_in_memory(self, cell: Cell, series: Series, columns_added: bool) -> None:
+        self._remember(cell, series)
+        if not columns_added:
+            # Sketches derived from a previous version of the series are stale now
+            with self._sketch_lock:
+                for key in [key for key in self._sketch_memory if key[0] == cell]:
+                    del self._sketch_memory[key]
+
+    def _persist(self, cell: Cell, series: Series, columns_added: bool) -> None:
+        """Write a cell's series to disk, or else to the shared cache (blocking I/O)."""
+        if not self.directory or not config.LOCAL_STORE_WRITABLE:
+            buffer = io.BytesIO()
+            np.savez(buffer, **series)
+            shared_cache.set(self.shared_key(cell), buffer.getvalue())
+            return
+        self._write_npz(self.path_for(cell), series)
+        if not columns_added and os.path.exists(self.sketch_path_for(cell)):
+            os.unlink(self.sketch_path_for(cell))
+
+    def _write_npz(self, path: str, arrays: dict[str, np.ndarray]) -> None:
+        """Write arrays to a compressed .npz file atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                np.savez_compressed(tmp_file, **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def day_sketches(self, cell: Cell, series: Series, column: str) -> list[TDigest]:
+        """
+        Per-day-of-year quantile sketches of one column, stored alongside the series.
+
+        Sketches are built from the series on first use and persisted next to
+        it, so percentiles over many days or cells can be computed by merging
+        366 small partials per cell instead of re-reading raw values.
+
+        Args:
+            cell: Cell of the series
+            series: The cell's full daily series
+            column: Column to sketch
+
+        Returns:
+            list: 366 digests, one per leap-year day-of-year slot
+        """
+        key = (cell, column)
+        with self._sketch_lock:
+            if key in self._sketch_memory:
+                self._sketch_memory.move_to_end(key)
+                return self._sketch_memory[key]
+
+        sketches = None
+        sketch_path = self.sketch_path_for(cell) if self.directory else ""
+        if sketch_path and os.path.exists(sketch_path):
+            with np.load(sketch_path) as stored:
+                if f"{column}__offsets" in stored.files:
+                    sketches = self._unpack_sketches({name: stored[name] for name in stored.files}, column)
+
+        if sketches is None:
+            years = series["YEAR"].astype(int)
+            matrix = day_of_year_matrix_for_series(series, column, int(years.min()), int(years.max()))
+            sketches = [TDigest.from_values(matrix[:, slot], config.SKETCH_COMPRESSION) for slot in range(366)]
+            if sketch_path and config.LOCAL_STORE_WRITABLE:
+                stored = {}
+                if os.path.exists(sketch_path):
+                    with np.load(sketch_path) as existing:
+                        stored = {name: existing[name] for name in existing.files}
+                stored.update(self._pack_sketches(sketches, column))
+                self._write_npz(sketch_path, stored)
+
+        with self._sketch_lock:
+            self._sketch_memory[key] = sketches
+            while len(self._sketch_memory) > self.sketch_memory_size:
+                self._sketch_memory.popitem(last=False)
+        return sketches
+
+    @staticmethod
+    def _pack_sketches(sketches: list[TDigest], column: str) -> dict[str, np.ndarray]:
+        """Flatten per-day digests into concatenated centroid arrays plus offsets."""
+        counts = [len(sketch.means) for sketch in sketches]
+        return {
+            f"{column}__means": np.concatenate([sketch.means for sketch in sketches]),
+            f"{column}__weights": np.concatenate([sketch.weights for sketch in sketches]),
+            f"{column}__offsets": np.concatenate([[0], np.cumsum(counts)]),
+            f"{column}__bounds": np.array([[sketch.minimum, sketch.maximum] for sketch in sketches]),
+        }
+
+    @staticmethod
+    def _unpack_sketches(arrays: dict[str, np.ndarray], column: str) -> list[TDigest]:
+        """Rebuild per-day digests packed by _pack_sketches."""
+        means = arrays[f"{column}__means"]
+        weights = arrays[f"{column}__weights"]
+        offsets = arrays[f"{column}__offsets"]
+        bounds = arrays[f"{column}__bounds"]
+        return [
+            TDigest(means[start:end], weights[start:end], bounds[slot, 0], bounds[slot, 1],
+                    config.SKETCH_COMPRESSION)
+            for slot, (start, end) in enumerate(zip(offsets[:-1], offsets[1:]))
+        ]
+
+    async def get(self, cell: Cell, parameters: list[str],
+                  semaphore: Optional[asyncio.Semaphore] = None,
+                  priority: Priority = Priority.INTERACTIVE,
+                  loaded: Optional[tuple[Optional[Series], str]] = None) -> Series:
+        """
+        Return a cell's series, fetching it from NASA POWER when not stored.
+
+        When the cell is stored without some of the parameters, only those
+        columns are fetched and merged into the stored series. A stored series
+        that ends before the last complete year is replaced by a fresh fetch of
+        all its columns. Reads and writes of the disk store and shared cache run
+        in worker threads.
+
+        Args:
+            cell: Cell to load
+            parameters: NASA parameter names that must be present
+            semaphore: Optional semaphore capping concurrent upstream fetches
+            priority: Priority class of the upstream fetch
+            loaded: Result of an earlier lookup() of the cell, to avoid loading it again
+
+        Returns:
+            dict: The cell's series
+
+        Raises:
+            DataSourceError: If NASA POWER cannot be reached or returns no data
+        """
+        with span("series_store.get", cell=f"{cell.lat},{cell.lon}") as get_span:
+            stored, tier = loaded if loaded is not None else await self.lookup(cell)
+            if stored is not None and not self.is_current(stored):
+                get_span.set_attribute("stale_through", int(stored["YEAR"].max()))
+                parameters = list(dict.fromkeys([name for name in stored if name not in DATE_COLUMNS] + parameters))
+                stored = None
+            missing = [param for param in parameters if stored is None or param not in stored]
+            if not missing:
+                get_span.set_attribute("cache_tier", tier)
+                get_span.set_attribute("rows", len(stored["YEAR"]))
+                return stored
+
+            if stored is None:
+                # Fetch the base parameters too, so the stored series serves every endpoint
+                get_span.set_attribute("cache_tier", "upstream")
+                fetch_parameters = list(dict.fromkeys(config.NASA_PARAMETERS + parameters))
+            else:
+                get_span.set_attribute("cache_tier", f"{tier}+upstream")
+                fetch_parameters = list(dict.fromkeys(missing))
+            get_span.set_attribute("fetched_columns", ",".join(fetch_parameters))
+            if semaphore is not None:
+                async with semaphore:
+                    series = await get_full_daily_series(cell.lat, cell.lon, fetch_parameters, priority)
+            else:
+                series = await get_full_daily_series(cell.lat, cell.lon, fetch_parameters, priority)
+            if not series:
+                raise DataSourceError(f"Could not fetch NASA data for cell {cell.lat}, {cell.lon}")
+
+            if stored is not None:
+                # Merge into the latest in-process version, which may have gained
+                # other columns from a concurrent request meanwhile
+                series = merge_columns(self._memory.get(cell, stored), series)
+            get_span.set_attribute("rows", len(series["YEAR"]))
+            self._replace_in_memory(cell, series, columns_added=stored is not None)
+            await asyncio.to_thread(self._persist, cell, series, stored is not None)
+            return series
+
+
+# Shared store instance
+series_store = SeriesStore(config.LOCAL_STORE_DIR, config.SERIES_MEMORY_CACHE_SIZE, config.SKETCH_MEMORY_CACHE_SIZE)
@@ -0,0 +1,153 @@
+"""
+Second-tier cache shared by every worker process on a host.
+
+In-process caches are duplicated per worker (``uvicorn --workers N`` or
+several instances on one machine). This cache keeps fetched series and
+finished analyses in a single SQLite database in WAL mode, so readers never
+block the writer and one worker's fetch serves all of them. Every write is
+a single transaction that also evicts the least recently used entries
+beyond SHARED_CACHE_MAX_BYTES. Reads only write back the access time when
+it is older than SHARED_CACHE_TOUCH_SECONDS, so hot keys do not turn every
+hit into a write. The calls block (up to the 5 s busy timeout), so async
+code runs them with ``asyncio.to_thread``. Cache errors are logged and
+treated as misses; they never fail a request.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from config import config
+from responses import encode_json
+from tracing import log
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+# Deletes every entry past the most recently used ones that fit in the budget
+EVICT_SQL = """
+DELETE FROM entries WHERE key IN (
+    SELECT key FROM (
+        SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS running FROM entries
+    ) WHERE running > ?
+)
+"""
+
+
+class SharedCache:
+    """SQLite-backed byte cache with size-based LRU eviction and a TTL."""
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float, touch_seconds: float = 0.0):
+        """
+        Initialize the cache. The database is created on first use.
+
+        Args:
+            path: SQLite database file (empty to disable the cache)
+            max_bytes: Total size of stored values above which old entries are evicted
+            ttl_seconds: Age after which an entry is treated as missing
+            touch_seconds: Minimum age of an entry's access time before a read updates it
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.touch_seconds = touch_seconds
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a database path is configured."""
+        return bool(self.path)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, creating the database if needed."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Return a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            bytes or None: The value, or None if missing, expired or the cache is unavailable
+        """
+        if not self.enabled:
+            return None
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT value, created, accessed FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] > self.ttl_seconds:
+                connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            # LRU order only needs to be approximate; skip the write for recently touched keys
+            if now - row[2] >= self.touch_seconds:
+                connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            return row[0]
+        except sqlite3.Error as e:
+            log("WARNING", "Shared cache read failed", key=key, error=str(e))
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Store a value atomically and evict least recently used entries over the size budget.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        if not self.enabled or len(value) > self.max_bytes:
+            return
+        try:
+            connection = self._connection()
+            now = time.time()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value), now, now)
+                )
+                connection.execute(EVICT_SQL, (self.max_bytes,))
+        except sqlite3.Error as e:
+            log("WARNING", "Shared cache write failed", key=key, error=str(e))
+
+    def get_json(self, key: str) -> Optional[Any]:
+        """Return a cached JSON value, decoded."""
+        value = self.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set_json(self, key: str, payload: Any) -> None:
+        """Store a JSON-serializable value (NumPy scalars allowed)."""
+        self.set(key, encode_json(payload))
+
+
+# Shared cache instance
+shared_cache = SharedCache(
+    config.SHARED_CACHE_PATH, config.SHARED_CACHE_MAX_BYTES, config.SHARED_CACHE_TTL_SECONDS,
+    config.SHARED_CACHE_TOUCH_SECONDS
+)
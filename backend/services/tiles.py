@@ -0,0 +1,128 @@
+"""
+Precomputed z/x/y raster tiles for map overlays.
+
+Tiles are rendered offline by ``scripts/build_tiles.py`` from the local
+series store, one set per layer and day of year, and served as static PNG
+files. PNGs are encoded here with zlib so no imaging library is needed.
+"""
+import math
+import os
+import struct
+import zlib
+from typing import Optional
+
+import numpy as np
+
+from config import config
+
+# Overlay layers: value range and color ramp as (position, RGB) stops
+LAYERS = {
+    "rain_probability": {
+        "description": "Probability of a rainy day (%)",
+        "unit": "%",
+        "min": 0.0,
+        "max": 100.0,
+        "ramp": [(0.0, (255, 255, 204)), (0.5, (65, 182, 196)), (1.0, (37, 52, 148))],
+    },
+    "temperature_percentile": {
+        "description": f"{config.PERCENTILE_HOT}th percentile of the maximum temperature (°C)",
+        "unit": "°C",
+        "min": -10.0,
+        "max": 45.0,
+        "ramp": [(0.0, (49, 54, 149)), (0.5, (255, 255, 191)), (1.0, (165, 0, 38))],
+    },
+}
+
+METADATA_FILE = "metadata.json"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def tile_path(layer: str, day: int, z: int, x: int, y: int) -> str:
+    """Return the file path of a tile."""
+    return os.path.join(config.TILES_DIR, layer, str(day), str(z), str(x), f"{y}.png")
+
+
+def lon_to_tile_x(lon: float, z: int) -> int:
+    """Web Mercator tile column containing a longitude."""
+    return min(int((lon + 180) / 360 * 2 ** z), 2 ** z - 1)
+
+
+def lat_to_tile_y(lat: float, z: int) -> int:
+    """Web Mercator tile row containing a latitude."""
+    lat = max(min(lat, 85.0511), -85.0511)
+    lat_rad = math.radians(lat)
+    return min(int((1 - math.asinh(math.tan(lat_rad)) / math.pi) / 2 * 2 ** z), 2 ** z - 1)
+
+
+def tile_pixel_coordinates(z: int, x: int, y: int, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Latitudes of a tile's pixel rows and longitudes of its pixel columns.
+
+    Web Mercator is separable, so a tile's pixel centers form a lat x lon mesh.
+    """
+    scale = 2 ** z * size
+    columns = x * size + np.arange(size) + 0.5
+    rows = y * size + np.arange(size) + 0.5
+    lons = columns / scale * 360 - 180
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * rows / scale))))
+    return lats, lons
+
+
+def colorize(values: np.ndarray, layer: str) -> np.ndarray:
+    """Map values to RGBA pixels with a layer's color ramp; NaN becomes transparent."""
+    info = LAYERS[layer]
+    normalized = np.clip((values - info["min"]) / (info["max"] - info["min"]), 0, 1)
+    positions = [stop for stop, _ in info["ramp"]]
+    rgba = np.zeros(values.shape + (4,), dtype=np.uint8)
+    for channel in range(3):
+        colors = [color[channel] for _, color in info["ramp"]]
+        rgba[..., channel] = np.interp(np.nan_to_num(normalized), positions, colors).astype(np.uint8)
+    rgba[..., 3] = np.where(np.isnan(values), 0, 255)
+    return rgba
+
+
+def render_tile(field: np.ndarray, origin_lat: float, origin_lon: float, layer: str,
+                z: int, x: int, y: int) -> Optional[np.ndarray]:
+    """
+    Sample a cell-resolution field onto a tile's pixels.
+
+    Args:
+        field: (lat cells x lon cells) values, NaN where there is no data
+        origin_lat: Latitude of the field's first row of cell centers
+        origin_lon: Longitude of the field's first column of cell centers
+        layer: Layer whose color ramp is used
+        z: Zoom level
+        x: Tile column
+        y: Tile row
+
+    Returns:
+        np.ndarray or None: RGBA pixels, or None when the tile has no data
+    """
+    lats, lons = tile_pixel_coordinates(z, x, y, config.TILE_SIZE)
+    rows = np.rint((lats - origin_lat) / config.POWER_CELL_LAT_STEP).astype(int)
+    columns = np.rint((lons - origin_lon) / config.POWER_CELL_LON_STEP).astype(int)
+    valid_rows = (rows >= 0) & (rows < field.shape[0])
+    valid_columns = (columns >= 0) & (columns < field.shape[1])
+    if not valid_rows.any() or not valid_columns.any():
+        return None
+
+    values = np.full((len(rows), len(columns)), np.nan, dtype=np.float32)
+    values[np.ix_(valid_rows, valid_columns)] = field[np.ix_(rows[valid_rows], columns[valid_columns])]
+    if np.isnan(values).all():
+        return None
+    return colorize(values, layer)
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Encode an RGBA image as a zlib-compressed PNG."""
+    height, width, _ = rgba.shape
+    # Every scanline starts with filter type 0 (none)
+    scanlines = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    scanlines[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return (PNG_SIGNATURE + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(scanlines.tobytes(), 9)) + chunk(b"IEND", b""))
@@ -0,0 +1,280 @@
+"""
+Structured logging and request tracing.
+
+Spans follow the OpenTelemetry span model (trace and span IDs, parent span,
+start/end in Unix nanoseconds, attributes, events and status, with OTLP/JSON
+field names) and are exported as one JSON object per line to stdout or
+TRACE_FILE. The current span lives in a context variable, so it follows
+asyncio tasks (every coroutine in a gather gets its own child spans) and
+threads started with asyncio.to_thread.
+
+Spans of a trace are buffered until its root span ends, and the whole trace
+is exported only if it took at least TRACE_SLOW_MS or recorded an error, so
+fast requests cost no I/O. Log records are JSON lines that carry the current
+trace and span IDs, so logs and spans of a request can be joined. Lines are
+written by a background thread, so exporting never blocks the event loop;
+whatever is still queued is flushed at interpreter exit.
+"""
+import atexit
+import json
+import os
+import queue
+import re
+import secrets
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional
+
+from config import config
+
+# W3C Trace Context header: version-traceid-parentid-flags
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+LOG_LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+# (destination, lines) waiting for the writer thread
+_write_queue: "queue.Queue[tuple[str, str]]" = queue.Queue()
+_writer_lock = threading.Lock()
+_writer: Optional[threading.Thread] = None
+
+
+class _Trace:
+    """Spans of one trace, buffered until the root span ends."""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[dict] = []
+        self.finished = False
+        self.failed = False
+
+
+class Span:
+    """A timed operation with attributes, events and a status."""
+
+    def __init__(self, name: str, trace: _Trace, parent_id: str = "", attributes: Optional[dict] = None):
+        self.name = name
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.events: List[dict] = []
+        self.status = "UNSET"
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def traceparent(self) -> str:
+        """W3C traceparent header value pointing at this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes) -> None:
+        self.events.append({"name": name, "timeUnixNano": time.time_ns(), "attributes": attributes})
+
+    def record_exception(self, exc: BaseException) -> None:
+        """Mark the span as failed and attach the exception as an event."""
+        self.status = "ERROR"
+        self.status_message = str(exc)
+        self.trace.failed = True
+        self.add_event(
+            "exception",
+            **{
+                "exception.type": type(exc).__name__,
+                "exception.message": str(exc),
+                "exception.stacktrace": "".join(traceback.format_exception(type(exc), exc, exc.__traceback__)),
+            }
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "events": self.events,
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+def _write(destination: str, lines: str) -> None:
+    if destination == "file":
+        directory = os.path.dirname(config.TRACE_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(config.TRACE_FILE, "a", encoding="utf-8") as file:
+            file.write(lines)
+    else:
+        sys.stdout.write(lines)
+        sys.stdout.flush()
+
+
+def _writer_loop() -> None:
+    while True:
+        destination, lines = _write_queue.get()
+        try:
+            _write(destination, lines)
+        except OSError as e:
+            sys.stderr.write(f"Trace export to {destination} failed: {e}\n")
+        finally:
+            _write_queue.task_done()
+
+
+def _write_lines(records: List[dict], destination: str) -> None:
+    """Queue records as JSON lines for the writer thread, starting it on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_writer_loop, name="trace-writer", daemon=True)
+                _writer.start()
+    _write_queue.put((destination, "".join(json.dumps(record, default=str) + "\n" for record in records)))
+
+
+@atexit.register
+def flush() -> None:
+    """Wait until every queued log record and trace has been written."""
+    if _writer is not None:
+        _write_queue.join()
+
+
+def _finish(span: Span, is_root: bool) -> None:
+    span.end_ns = time.time_ns()
+    trace = span.trace
+    if config.TRACE_EXPORTER == "none":
+        return
+    if trace.finished:
+        # Work that outlived its request (e.g. a background fetch) is exported on its own
+        _write_lines([span.to_dict()], config.TRACE_EXPORTER)
+        return
+    trace.spans.append(span.to_dict())
+    if is_root:
+        trace.finished = True
+        slow = (span.end_ns - span.start_ns) / 1e6 >= config.TRACE_SLOW_MS
+        if slow or trace.failed:
+            _write_lines(trace.spans, config.TRACE_EXPORTER)
+        trace.spans = []
+
+
+@contextmanager
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes) -> Iterator[Span]:
+    """
+    Open the root span of a request, continuing the caller's trace when given a traceparent.
+
+    Args:
+        name: Span name
+        traceparent: Optional W3C traceparent header of the caller
+        **attributes: Initial span attributes
+
+    Yields:
+        Span: The root span
+    """
+    match = TRACEPARENT_PATTERN.match(traceparent or "")
+    trace = _Trace(match.group(1) if match else secrets.token_hex(16))
+    root = Span(name, trace, match.group(2) if match else "", attributes)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as exc:
+        root.record_exception(exc)
+        raise
+    finally:
+        _current_span.reset(token)
+        _finish(root, is_root=True)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Open a child of the current span (or a new trace when there is none).
+
+    Exceptions leaving the block are recorded on the span and re-raised.
+
+    Args:
+        name: Span name
+        **attributes: Initial span attributes
+
+    Yields:
+        Span: The new span
+    """
+    parent = _current_span.get()
+    if parent is None:
+        with start_trace(name, **attributes) as root:
+            yield root
+        return
+
+    child = Span(name, parent.trace, parent.span_id, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.record_exception(exc)
+        raise
+    finally:
+        _current_span.reset(token)
+        _finish(child, is_root=False)
+
+
+def current_span() -> Optional[Span]:
+    """The span of the running operation, if any."""
+    return _current_span.get()
+
+
+def set_attributes(**attributes) -> None:
+    """Set attributes on the current span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def log(level: str, message: str, **fields) -> None:
+    """
+    Write a structured log record, tagged with the current trace and span.
+
+    Args:
+        level: DEBUG, INFO, WARNING or ERROR
+        message: Human-readable message
+        **fields: Extra structured fields
+    """
+    if LOG_LEVELS[level] < LOG_LEVELS.get(config.LOG_LEVEL, 20):
+        return
+    record = {"timestamp": round(time.time(), 3), "level": level, "message": message, **fields}
+    current = _current_span.get()
+    if current is not None:
+        record["traceId"] = current.trace_id
+        record["spanId"] = current.span_id
+    _write_lines([record], "stdout")
+
+
+def log_exception(message: str, exc: BaseException, **fields) -> None:
+    """
+    Log an error with its traceback and record it on the current span.
+
+    Args:
+        message: What failed
+        exc: The exception
+        **fields: Extra structured fields
+    """
+    current = _current_span.get()
+    if current is not None:
+        current.record_exception(exc)
+    log(
+        "ERROR", message,
+        error_type=type(exc).__name__,
+        error=str(exc),
+        traceback="".join(traceback.format_exception(type(exc), exc, exc.__traceback__)),
+        **fields
+    )
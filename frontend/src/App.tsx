@@ -1,17 +1,28 @@
-import { useState } from 'react';
-import type { ClimateAnalysisResponse, UserPreferences } from './types/climate';
-import { climateService } from './services/climateService';
-import { downloadClimateData } from './utils/downloadData';
+import { lazy, Suspense, useEffect, useRef, useState } from 'react';
+import type { AnalysisProgress, ClimateAnalysisResponse, UserPreferences } from './types/climate';
+import { climateService, RequestSupersededError } from './services/climateService';
 import UserInputForm from './components/UserInputForm';
-import LocationPicker from './components/LocationPicker';
 import DatePicker from './components/DatePicker';
-import AdditionalParameterField from './components/AdditionalParameterField';
-import TemperatureField from './components/TemperatureField';
-import RainField from './components/RainField';
-import WindField from './components/WindField';
-import HumidityField from './components/HumidityField';
 import './App.css';
 
+// The map (Leaflet and its assets) and the result views are separate chunks,
+// so the form can paint before they are downloaded
+const loadClimateResults = () => import('./components/ClimateResults');
+const LocationPicker = lazy(() => import('./components/LocationPicker'));
+const ClimateResults = lazy(loadClimateResults);
+
+/**
+ * Fetch a chunk once the browser is idle, so it is cached before it is needed
+ */
+function prefetchWhenIdle(load: () => Promise<unknown>) {
+  const run = () => void load().catch(() => undefined);
+  if ('requestIdleCallback' in window) {
+    window.requestIdleCallback(run, { timeout: 3000 });
+  } else {
+    setTimeout(run, 1500);
+  }
+}
+
 function App() {
   const [preferences, setPreferences] = useState<UserPreferences>({
     idealTemperature: 25,
@@ -24,6 +35,8 @@ function App() {
   const [climateData, setClimateData] = useState<ClimateAnalysisResponse | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  // Years received while a streamed analysis is still running
+  const [progress, setProgress] = useState<Omit<AnalysisProgress, 'analysis'> | null>(null);
 
   // Location and date state - Default: Maceió, AL, Brazil on October 4th
   const [location, setLocation] = useState({
@@ -44,31 +57,57 @@ function App() {
     setDate({ day, month });
   };
 
+  // Only the latest submission may update the results
+  const latestRequest = useRef(0);
+
   const handleAnalyzeClimate = async () => {
+    const requestId = ++latestRequest.current;
+    // Download the result views while the analysis is computed, if not prefetched yet
+    void loadClimateResults().catch(() => undefined);
     setLoading(true);
     setError(null);
+    setProgress(null);
     
     try {
       const data = await climateService.getClimateAnalysis({
         ...location,
         ...date,
         additional_parameters: preferences.additionalParameters.filter(p => p !== 'none')
+      }, ({ analysis, ...received }) => {
+        // Show early estimates until the complete analysis arrives
+        if (requestId === latestRequest.current) {
+          setClimateData(analysis);
+          setProgress(received);
+        }
       });
-      setClimateData(data);
+      if (requestId === latestRequest.current) {
+        setClimateData(data);
+      }
     } catch (err) {
+      if (err instanceof RequestSupersededError || requestId !== latestRequest.current) {
+        return;
+      }
       setError(err instanceof Error ? err.message : 'Error fetching climate data');
       console.error('Error fetching climate data:', err);
     } finally {
-      setLoading(false);
+      if (requestId === latestRequest.current) {
+        setLoading(false);
+        setProgress(null);
+      }
     }
   };
 
-  const handleDownloadData = () => {
+  const handleDownloadData = async () => {
     if (climateData) {
+      const { downloadClimateData } = await import('./utils/downloadData');
       downloadClimateData(climateData, preferences, location, date);
     }
   };
 
+  useEffect(() => {
+    prefetchWhenIdle(loadClimateResults);
+  }, []);
+
   return (
     <div className="app">
       <header className="app-header">
@@ -85,11 +124,14 @@ function App() {
 
       <main className="app-main">
         <div className="location-date-container">
-          <LocationPicker
-            lat={location.lat}
-            lon={location.lon}
-            onLocationChange={handleLocationChange}
-          />
+          <Suspense fallback={<div className="location-picker location-picker-placeholder">Loading map...</div>}>
+            <LocationPicker
+              lat={location.lat}
+              lon={location.lon}
+              onLocationChange={handleLocationChange}
+              overlayDate={date}
+            />
+          </Suspense>
 
           <DatePicker
             day={date.day}
@@ -112,71 +154,14 @@ function App() {
         )}
 
         {climateData && (
-          <div className="climate-results">
-            <div className="results-header">
-              <div className="results-header-content">
-                <div>
-                  <h2>Climate Analysis Results</h2>
-                  <p className="analysis-period">
-                    Based on {climateData.analysis_period.total_years_analyzed} years of data 
-                    ({climateData.analysis_period.start_year} - {climateData.analysis_period.end_year})
-                  </p>
-                </div>
-                <div className="results-header-actions">
-                  <div className="confidence-badge">
-                    Confidence: {climateData.summary_statistics.confidence_level === 'high' ? 'High' : 
-                               climateData.summary_statistics.confidence_level === 'medium' ? 'Medium' : 'Low'}
-                  </div>
-                  <button 
-                    className="download-button"
-                    onClick={handleDownloadData}
-                    title="Download all data as JSON"
-                  >
-                    <svg xmlns="http://www.w3.org/2000/svg" width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" strokeWidth="2" strokeLinecap="round" strokeLinejoin="round">
-                      <path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"></path>
-                      <polyline points="7 10 12 15 17 10"></polyline>
-                      <line x1="12" y1="15" x2="12" y2="3"></line>
-                    </svg>
-                    Download JSON
-                  </button>
-                </div>
-              </div>
-            </div>
-
-            <TemperatureField
-              temperatureStats={climateData.temperature}
-              temperatureProbability={climateData.temperature_probability}
-              idealTemperature={preferences.idealTemperature}
-            />
-
-            <RainField
-              rainProbability={climateData.rain_probability}
-              idealRain={preferences.idealRain}
-            />
-
-            <WindField
-              windStats={climateData.wind}
-              idealWindSpeed={preferences.idealWindSpeed}
+          <Suspense fallback={<div className="climate-results-placeholder">Loading results...</div>}>
+            <ClimateResults
+              climateData={climateData}
+              preferences={preferences}
+              progress={progress}
+              onDownload={handleDownloadData}
             />
-
-            <HumidityField
-              humidityStats={climateData.humidity}
-              humidityProbability={climateData.humidity_probability}
-              idealHumidity={preferences.idealHumidity}
-            />
-
-            {/* Additional Parameter Fields - shown below main fields */}
-            {climateData.additional_parameters && climateData.additional_parameters.length > 0 && (
-              <div className="additional-parameters-section">
-                {climateData.additional_parameters.map((paramStats) => (
-                  <AdditionalParameterField
-                    key={paramStats.parameter_name}
-                    stats={paramStats}
-                  />
-                ))}
-              </div>
-            )}
-          </div>
+          </Suspense>
         )}
 
         {!climateData && !loading && !error && (
@@ -0,0 +1,94 @@
+import type { AnalysisProgress, ClimateAnalysisResponse, UserPreferences } from '../types/climate';
+import TemperatureField from './TemperatureField';
+import RainField from './RainField';
+import WindField from './WindField';
+import HumidityField from './HumidityField';
+import AdditionalParameterField from './AdditionalParameterField';
+
+interface ClimateResultsProps {
+  climateData: ClimateAnalysisResponse;
+  preferences: UserPreferences;
+  progress: Omit<AnalysisProgress, 'analysis'> | null;
+  onDownload: () => void;
+}
+
+/**
+ * Result views of an analysis. Loaded on demand, so the first paint does not
+ * wait for code that is only needed once a result is available.
+ */
+function ClimateResults({ climateData, preferences, progress, onDownload }: ClimateResultsProps) {
+  return (
+    <div className="climate-results">
+      <div className="results-header">
+        <div className="results-header-content">
+          <div>
+            <h2>Climate Analysis Results</h2>
+            <p className="analysis-period">
+              Based on {climateData.analysis_period.total_years_analyzed} years of data 
+              ({climateData.analysis_period.start_year} - {climateData.analysis_period.end_year})
+            </p>
+            {progress && (
+              <p className="analysis-progress">
+                Preliminary: received {progress.years_received} of {progress.years_requested} years...
+              </p>
+            )}
+          </div>
+          <div className="results-header-actions">
+            <div className="confidence-badge">
+              Confidence: {climateData.summary_statistics.confidence_level === 'high' ? 'High' : 
+                         climateData.summary_statistics.confidence_level === 'medium' ? 'Medium' : 'Low'}
+            </div>
+            <button 
+              className="download-button"
+              onClick={onDownload}
+              title="Download all data as JSON"
+            >
+              <svg xmlns="http://www.w3.org/2000/svg" width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" strokeWidth="2" strokeLinecap="round" strokeLinejoin="round">
+                <path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"></path>
+                <polyline points="7 10 12 15 17 10"></polyline>
+                <line x1="12" y1="15" x2="12" y2="3"></line>
+              </svg>
+              Download JSON
+            </button>
+          </div>
+        </div>
+      </div>
+
+      <TemperatureField
+        temperatureStats={climateData.temperature}
+        temperatureProbability={climateData.temperature_probability}
+        idealTemperature={preferences.idealTemperature}
+      />
+
+      <RainField
+        rainProbability={climateData.rain_probability}
+        idealRain={preferences.idealRain}
+      />
+
+      <WindField
+        windStats={climateData.wind}
+        idealWindSpeed={preferences.idealWindSpeed}
+      />
+
+      <HumidityField
+        humidityStats={climateData.humidity}
+        humidityProbability={climateData.humidity_probability}
+        idealHumidity={preferences.idealHumidity}
+      />
+
+      {/* Additional Parameter Fields - shown below main fields */}
+      {climateData.additional_parameters && climateData.additional_parameters.length > 0 && (
+        <div className="additional-parameters-section">
+          {climateData.additional_parameters.map((paramStats) => (
+            <AdditionalParameterField
+              key={paramStats.parameter_name}
+              stats={paramStats}
+            />
+          ))}
+        </div>
+      )}
+    </div>
+  );
+}
+
+export default ClimateResults;
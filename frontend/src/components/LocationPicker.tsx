@@ -3,6 +3,7 @@ import { MapContainer, TileLayer, Marker, useMapEvents, useMap } from 'react-lea
 import type { LatLngExpression } from 'leaflet';
 import 'leaflet/dist/leaflet.css';
 import './LocationPicker.css';
+import { climateService } from '../services/climateService';
 
 // Fix for default marker icon in react-leaflet
 import L from 'leaflet';
@@ -24,6 +25,7 @@ interface LocationPickerProps {
   lat: number;
   lon: number;
   onLocationChange: (lat: number, lon: number) => void;
+  overlayDate?: { day: number; month: number };
 }
 
 // Component to handle map view updates
@@ -54,9 +56,11 @@ function LocationMarker({ position, setPosition }: {
 const LocationPicker: React.FC<LocationPickerProps> = ({
   lat,
   lon,
-  onLocationChange
+  onLocationChange,
+  overlayDate
 }) => {
   const [position, setPosition] = useState<LatLngExpression>([lat, lon]);
+  const [showRainOverlay, setShowRainOverlay] = useState(false);
   const [address, setAddress] = useState('');
   const [isSearching, setIsSearching] = useState(false);
   const [searchError, setSearchError] = useState('');
@@ -143,6 +147,17 @@ const LocationPicker: React.FC<LocationPickerProps> = ({
       <p className="location-instruction">
         Or click on the map to choose the location
       </p>
+
+      {overlayDate && (
+        <label className="overlay-toggle">
+          <input
+            type="checkbox"
+            checked={showRainOverlay}
+            onChange={(e) => setShowRainOverlay(e.target.checked)}
+          />
+          Show historical rain probability for the selected date
+        </label>
+      )}
       
       <div className="map-container">
         <MapContainer
@@ -154,6 +169,15 @@ const LocationPicker: React.FC<LocationPickerProps> = ({
             attribution='&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
             url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
           />
+          {overlayDate && showRainOverlay && (
+            <TileLayer
+              key={`${overlayDate.month}-${overlayDate.day}`}
+              url={climateService.getOverlayTileUrl('rain_probability', overlayDate.day, overlayDate.month)}
+              opacity={0.6}
+              maxNativeZoom={7}
+              attribution="Rain probability from NASA POWER"
+            />
+          )}
           <MapViewController center={position} />
           <LocationMarker position={position} setPosition={handlePositionChange} />
         </MapContainer>
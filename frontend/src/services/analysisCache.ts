@@ -0,0 +1,116 @@
+/**
+ * Client-side cache of climate analyses.
+ *
+ * NASA POWER data is the same for every point inside a grid cell
+ * (0.5° lat x 0.625° lon), so analyses are keyed by the cell center, the date
+ * and the requested parameters. Entries live in memory for the session and in
+ * IndexedDB across reloads, and expire after CACHE_TTL_MS.
+ */
+import type { ClimateAnalysisResponse } from '../types/climate';
+
+const DB_NAME = 'cascao-cache';
+const STORE_NAME = 'analyses';
+const CACHE_TTL_MS = 7 * 24 * 60 * 60 * 1000;
+
+// NASA POWER grid resolution (degrees), as configured on the backend
+const CELL_LAT_STEP = 0.5;
+const CELL_LON_STEP = 0.625;
+
+interface CacheEntry {
+  key: string;
+  storedAt: number;
+  data: ClimateAnalysisResponse;
+}
+
+const memory = new Map<string, CacheEntry>();
+let dbPromise: Promise<IDBDatabase | null> | null = null;
+
+/**
+ * Snap a coordinate to the center of the NASA POWER cell containing it
+ */
+export function snapToCell(lat: number, lon: number): { lat: number; lon: number } {
+  const cellLat = Math.round((lat + 90) / CELL_LAT_STEP) * CELL_LAT_STEP - 90;
+  const cellLon = Math.round((lon + 180) / CELL_LON_STEP) * CELL_LON_STEP - 180;
+  return {
+    lat: Number(Math.min(Math.max(cellLat, -90), 90).toFixed(4)),
+    lon: Number((((cellLon + 180) % 360 + 360) % 360 - 180).toFixed(4))
+  };
+}
+
+/**
+ * Cache key of an analysis request: cell, date and sorted parameters
+ */
+export function analysisCacheKey(lat: number, lon: number, day: number, month: number, parameters: string[] = []): string {
+  const cell = snapToCell(lat, lon);
+  return `${cell.lat},${cell.lon}:${month}-${day}:${[...parameters].sort().join(',')}`;
+}
+
+function openDatabase(): Promise<IDBDatabase | null> {
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve) => {
+      if (typeof indexedDB === 'undefined') {
+        resolve(null);
+        return;
+      }
+      const request = indexedDB.open(DB_NAME, 1);
+      request.onupgradeneeded = () => {
+        request.result.createObjectStore(STORE_NAME, { keyPath: 'key' });
+      };
+      request.onsuccess = () => resolve(request.result);
+      // Private browsing or blocked storage: fall back to the memory cache only
+      request.onerror = () => resolve(null);
+      request.onblocked = () => resolve(null);
+    });
+  }
+  return dbPromise;
+}
+
+function isFresh(entry: CacheEntry): boolean {
+  return Date.now() - entry.storedAt < CACHE_TTL_MS;
+}
+
+/**
+ * Return a cached analysis, or null when missing or expired
+ */
+export async function getCachedAnalysis(key: string): Promise<ClimateAnalysisResponse | null> {
+  const cached = memory.get(key);
+  if (cached) {
+    if (isFresh(cached)) return cached.data;
+    memory.delete(key);
+  }
+
+  const db = await openDatabase();
+  if (!db) return null;
+  return new Promise((resolve) => {
+    const store = db.transaction(STORE_NAME, 'readwrite').objectStore(STORE_NAME);
+    const request = store.get(key);
+    request.onsuccess = () => {
+      const entry = request.result as CacheEntry | undefined;
+      if (entry && isFresh(entry)) {
+        memory.set(key, entry);
+        resolve(entry.data);
+      } else {
+        if (entry) store.delete(key);
+        resolve(null);
+      }
+    };
+    request.onerror = () => resolve(null);
+  });
+}
+
+/**
+ * Store an analysis in memory and IndexedDB
+ */
+export async function putCachedAnalysis(key: string, data: ClimateAnalysisResponse): Promise<void> {
+  const entry: CacheEntry = { key, storedAt: Date.now(), data };
+  memory.set(key, entry);
+
+  const db = await openDatabase();
+  if (!db) return;
+  await new Promise<void>((resolve) => {
+    const transaction = db.transaction(STORE_NAME, 'readwrite');
+    transaction.objectStore(STORE_NAME).put(entry);
+    transaction.oncomplete = () => resolve();
+    transaction.onerror = () => resolve();
+  });
+}
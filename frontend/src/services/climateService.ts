@@ -1,8 +1,9 @@
 import axios from 'axios';
-import type { ClimateAnalysisResponse, AdditionalParameterType } from '../types/climate';
+import type { AnalysisProgress, ClimateAnalysisResponse, AdditionalParameterType } from '../types/climate';
+import { analysisCacheKey, getCachedAnalysis, putCachedAnalysis } from './analysisCache';
 
 // Use environment variable or default to production
-const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'https://cascao-backend-880627998185.us-central1.run.app';
+export const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'https://cascao-backend-880627998185.us-central1.run.app';
 
 export interface ClimateQueryParams {
   lat: number;
@@ -12,50 +13,187 @@ export interface ClimateQueryParams {
   additional_parameters?: AdditionalParameterType[];
 }
 
+export type OverlayLayer = 'rain_probability' | 'temperature_percentile';
+
+// Days before each month in a leap year; overlay tiles use these fixed day-of-year slots
+const LEAP_YEAR_DAYS_BEFORE_MONTH = [0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335];
+
+/**
+ * Rejection of a request cancelled because a newer one replaced it
+ */
+export class RequestSupersededError extends Error {
+  constructor() {
+    super('Request superseded by a newer one');
+    this.name = 'RequestSupersededError';
+  }
+}
+
+// Backend calls in flight by cache key, and the latest one (cancelled when superseded)
+const inFlight = new Map<string, Promise<ClimateAnalysisResponse>>();
+let currentRequest: { key: string; controller: AbortController } | null = null;
+
+async function requestClimateAnalysis(
+  queryParams: Record<string, string | number>,
+  signal: AbortSignal
+): Promise<ClimateAnalysisResponse> {
+  console.log('Fetching climate data for:', queryParams);
+
+  try {
+    const response = await axios.get<ClimateAnalysisResponse>(
+      `${API_BASE_URL}/v1/climate-analysis`,
+      { params: queryParams, signal }
+    );
+    console.log('Climate data received:', response.data);
+    return response.data;
+  } catch (error) {
+    if (axios.isCancel(error)) {
+      throw new RequestSupersededError();
+    }
+    console.error('Error fetching climate data:', error);
+    
+    if (axios.isAxiosError(error)) {
+      if (error.response) {
+        // Server responded with error status
+        const detail = error.response.data?.detail || error.message;
+        console.error('Server error response:', error.response.data);
+        throw new Error(`Server error: ${detail}`);
+      } else if (error.request) {
+        // Request was made but no response received
+        console.error('No response from server. Request:', error.request);
+        throw new Error('Could not connect to server. Please check if backend is running.');
+      } else {
+        throw new Error(`Request error: ${error.message}`);
+      }
+    }
+    throw new Error('Unknown error fetching climate data');
+  }
+}
+
+/**
+ * Stream an analysis over Server-Sent Events, reporting estimates as the years arrive.
+ * Resolves with the analysis of the final `complete` event.
+ */
+function streamClimateAnalysis(
+  queryParams: Record<string, string | number>,
+  signal: AbortSignal,
+  onProgress: (progress: AnalysisProgress) => void
+): Promise<ClimateAnalysisResponse> {
+  const query = new URLSearchParams(Object.entries(queryParams).map(([name, value]) => [name, String(value)]));
+  console.log('Streaming climate data for:', queryParams);
+
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE_URL}/v1/climate-analysis/stream?${query.toString()}`);
+    const close = () => {
+      source.close();
+      signal.removeEventListener('abort', onAbort);
+    };
+    const onAbort = () => {
+      close();
+      reject(new RequestSupersededError());
+    };
+    signal.addEventListener('abort', onAbort);
+
+    source.addEventListener('partial', (event) => {
+      onProgress(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener('complete', (event) => {
+      close();
+      const progress: AnalysisProgress = JSON.parse((event as MessageEvent).data);
+      console.log('Climate data received:', progress.analysis);
+      resolve(progress.analysis);
+    });
+    // Server errors arrive as `error` events with a payload; connection failures carry none
+    source.addEventListener('error', (event) => {
+      close();
+      if (event instanceof MessageEvent && event.data) {
+        const { detail } = JSON.parse(event.data);
+        reject(new Error(`Server error: ${detail}`));
+      } else {
+        reject(new Error('Could not connect to server. Please check if backend is running.'));
+      }
+    });
+  });
+}
+
 export const climateService = {
   /**
-   * Fetch climate analysis data from the backend API
+   * Leaflet URL template for the precomputed overlay tiles of a calendar day
    */
-  async getClimateAnalysis(params: ClimateQueryParams): Promise<ClimateAnalysisResponse> {
-    console.log('Fetching climate data for:', params);
-    
-    // Convert array of additional parameters to comma-separated string
-    const queryParams: any = {
-      lat: params.lat,
-      lon: params.lon,
-      day: params.day,
-      month: params.month
+  getOverlayTileUrl(layer: OverlayLayer, day: number, month: number): string {
+    const dayOfYear = LEAP_YEAR_DAYS_BEFORE_MONTH[month - 1] + day;
+    return `${API_BASE_URL}/v1/tiles/${layer}/${dayOfYear}/{z}/{x}/{y}.png`;
+  },
+
+
+  /**
+   * Fetch climate analysis data, from the client cache when possible.
+   *
+   * Identical requests in flight share one backend call, and a request for a
+   * different cell/date/parameters cancels the one it supersedes (which then
+   * rejects with RequestSupersededError). With onProgress, the analysis is
+   * streamed and onProgress receives estimates from the years fetched so far.
+   */
+  async getClimateAnalysis(
+    params: ClimateQueryParams,
+    onProgress?: (progress: AnalysisProgress) => void
+  ): Promise<ClimateAnalysisResponse> {
+    const parameters = params.additional_parameters ?? [];
+    const key = analysisCacheKey(params.lat, params.lon, params.day, params.month, parameters);
+    // Cached analyses are per cell; report the point that was actually asked for
+    const forLocation = (data: ClimateAnalysisResponse): ClimateAnalysisResponse => ({
+      ...data,
+      location: { lat: params.lat, lon: params.lon }
+    });
+
+    // Claim the current slot before any await, so a newer call always sees (and cancels) this one
+    if (currentRequest?.key !== key) {
+      currentRequest?.controller.abort();
+      currentRequest = { key, controller: new AbortController() };
+    }
+    const { controller } = currentRequest;
+    const release = () => {
+      if (currentRequest?.controller === controller) currentRequest = null;
     };
-    
-    if (params.additional_parameters && params.additional_parameters.length > 0) {
-      queryParams.additional_parameters = params.additional_parameters.join(',');
+
+    const cached = await getCachedAnalysis(key);
+    if (controller.signal.aborted) {
+      throw new RequestSupersededError();
     }
-    
-    try {
-      const response = await axios.get<ClimateAnalysisResponse>(
-        `${API_BASE_URL}/v1/climate-analysis`,
-        { params: queryParams }
-      );
-      console.log('Climate data received:', response.data);
-      return response.data;
-    } catch (error) {
-      console.error('Error fetching climate data:', error);
-      
-      if (axios.isAxiosError(error)) {
-        if (error.response) {
-          // Server responded with error status
-          const detail = error.response.data?.detail || error.message;
-          console.error('Server error response:', error.response.data);
-          throw new Error(`Server error: ${detail}`);
-        } else if (error.request) {
-          // Request was made but no response received
-          console.error('No response from server. Request:', error.request);
-          throw new Error('Could not connect to server. Please check if backend is running.');
-        } else {
-          throw new Error(`Request error: ${error.message}`);
-        }
+    if (cached) {
+      console.log('Climate data served from cache for:', key);
+      if (!inFlight.has(key)) release();
+      return forLocation(cached);
+    }
+
+    let pending = inFlight.get(key);
+    if (!pending) {
+      // Convert array of additional parameters to comma-separated string
+      const queryParams: Record<string, string | number> = {
+        lat: params.lat,
+        lon: params.lon,
+        day: params.day,
+        month: params.month
+      };
+      if (parameters.length > 0) {
+        queryParams.additional_parameters = parameters.join(',');
       }
-      throw new Error('Unknown error fetching climate data');
+
+      const request = onProgress && typeof EventSource !== 'undefined'
+        ? streamClimateAnalysis(queryParams, controller.signal, (progress) =>
+            onProgress({ ...progress, analysis: forLocation(progress.analysis) }))
+        : requestClimateAnalysis(queryParams, controller.signal);
+      pending = request
+        .then((data) => {
+          void putCachedAnalysis(key, data);
+          return data;
+        })
+        .finally(() => {
+          inFlight.delete(key);
+          release();
+        });
+      inFlight.set(key, pending);
     }
+
+    return forLocation(await pending);
   }
 };
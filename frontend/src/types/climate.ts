@@ -114,6 +114,32 @@ export interface ClimateAnalysisResponse {
   humidity: HumidityStats;
   summary_statistics: SummaryStatistics;
   additional_parameters?: AdditionalParameterStats[];
+  confidence_intervals?: ProbabilityConfidenceIntervals;
+}
+
+/**
+ * Event of /v1/climate-analysis/stream: the analysis of the years received so far
+ */
+export interface AnalysisProgress {
+  years_received: number;
+  years_requested: number;
+  analysis: ClimateAnalysisResponse;
+}
+
+export interface ConfidenceInterval {
+  lower_percent: number;
+  upper_percent: number;
+}
+
+export interface ProbabilityConfidenceIntervals {
+  confidence_level_percent: number;
+  resamples: number;
+  method: string;
+  rain_probability: ConfidenceInterval;
+  hot_probability: ConfidenceInterval;
+  cold_probability: ConfidenceInterval;
+  humid_probability: ConfidenceInterval;
+  dry_probability: ConfidenceInterval;
 }
 
 // Additional parameter types
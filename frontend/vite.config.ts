@@ -1,7 +1,67 @@
-import { defineConfig } from 'vite'
+import { defineConfig, type Plugin } from 'vite'
 import react from '@vitejs/plugin-react'
+import { gzipSync } from 'node:zlib'
+
+// Gzipped size limits in kB. The defaults leave headroom over React, React DOM and
+// axios plus the app shell (initial load), and over Leaflet with react-leaflet (the
+// largest lazy chunk); lower them to a build's reported sizes plus ~10%
+const budgetKb = (value: string | undefined, fallback: number) => (value ? Number(value) : fallback)
+const BUNDLE_BUDGET_INITIAL_KB = budgetKb(process.env.BUNDLE_BUDGET_INITIAL_KB, 100)
+const BUNDLE_BUDGET_CHUNK_KB = budgetKb(process.env.BUNDLE_BUDGET_CHUNK_KB, 60)
+
+/**
+ * Report the gzipped size of the initial load (entry chunks, their static
+ * imports and CSS) and of every lazily loaded chunk, and fail the build when
+ * one exceeds its configured budget.
+ */
+function bundleBudget(): Plugin {
+  return {
+    name: 'bundle-budget',
+    apply: 'build',
+    generateBundle(_options, bundle) {
+      const budgetNote = (budget: number) => ` (budget ${budget} kB)`
+      const gzippedKb = (fileName: string) => {
+        const file = bundle[fileName]
+        const source = file.type === 'chunk' ? file.code : file.source
+        return gzipSync(source).length / 1024
+      }
+
+      // Everything the entry pulls in before the first paint
+      const initial = new Set<string>()
+      const visit = (fileName: string) => {
+        const file = bundle[fileName]
+        if (initial.has(fileName) || file?.type !== 'chunk') return
+        initial.add(fileName)
+        file.viteMetadata?.importedCss.forEach((css) => initial.add(css))
+        file.imports.forEach(visit)
+      }
+      Object.values(bundle).forEach((file) => {
+        if (file.type === 'chunk' && file.isEntry) visit(file.fileName)
+      })
+
+      const failures: string[] = []
+      const initialKb = [...initial].reduce((total, fileName) => total + gzippedKb(fileName), 0)
+      console.log(`\nInitial load: ${initialKb.toFixed(1)} kB gzipped${budgetNote(BUNDLE_BUDGET_INITIAL_KB)}`)
+      if (initialKb > BUNDLE_BUDGET_INITIAL_KB) {
+        failures.push(`initial load is ${initialKb.toFixed(1)} kB, budget ${BUNDLE_BUDGET_INITIAL_KB} kB`)
+      }
+      Object.values(bundle).forEach((file) => {
+        if (file.type !== 'chunk' || initial.has(file.fileName)) return
+        const chunkKb = gzippedKb(file.fileName)
+        console.log(`Lazy chunk ${file.fileName}: ${chunkKb.toFixed(1)} kB gzipped${budgetNote(BUNDLE_BUDGET_CHUNK_KB)}`)
+        if (chunkKb > BUNDLE_BUDGET_CHUNK_KB) {
+          failures.push(`${file.fileName} is ${chunkKb.toFixed(1)} kB, budget ${BUNDLE_BUDGET_CHUNK_KB} kB`)
+        }
+      })
+
+      if (failures.length > 0) {
+        this.error(`Bundle size budget exceeded:\n  ${failures.join('\n  ')}`)
+      }
+    },
+  }
+}
 
 // https://vite.dev/config/
 export default defineConfig({
-  plugins: [react()],
+  plugins: [react(), bundleBudget()],
 })